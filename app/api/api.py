@@ -1,10 +1,29 @@
+import asyncio
 import datetime
+import functools
+import inspect
+import json
+import time
 from contextlib import asynccontextmanager
-from typing import List
+from typing import List, Literal, Optional
 
-from fastapi import Depends, FastAPI, HTTPException, Query
+from fastapi import (
+    Body,
+    Depends,
+    FastAPI,
+    HTTPException,
+    Query,
+    Request,
+    Response,
+    WebSocket,
+    WebSocketDisconnect,
+)
 from fastapi.middleware.cors import CORSMiddleware
-from sqlalchemy.orm import Session
+from fastapi.responses import StreamingResponse
+from fastapi.routing import APIRoute
+from prometheus_client import CONTENT_TYPE_LATEST
+from sqlalchemy.ext.asyncio import AsyncSession
+from starlette.concurrency import run_in_threadpool
 
 from app.__version__ import (
     __author__,
@@ -13,31 +32,75 @@ from app.__version__ import (
     __url__,
     __version__,
 )
-from app.db import repository
-from app.db.database import get_db, init_db
-from app.models.exchange_rate import CurrencyRateResponse
-
-BANKS = [
-    "ArigBank",
-    "BogdBank",
-    "CapitronBank",
-    "CKBank",
-    "GolomtBank",
-    "KhanBank",
-    "MBank",
-    "MongolBank",
-    "NIBank",
-    "StateBank",
-    "TDBM",
-    "TransBank",
-    "XacBank",
-]
+from app.config import config
+from app.crawlers import registry
+from app.db import async_repository
+from app.db.database import get_async_db, init_db, optimize
+from app.models.exchange_rate import (
+    BatchRateQuery,
+    BatchRateResult,
+    ConversionResponse,
+    CurrencyRateResponse,
+    RateMatrixResponse,
+    RateTickResponse,
+)
+from app.services.conversion import latest_matrix
+from app.services.stream import broadcaster, fetch_ticks
+from app.utils import metrics
+
+MAX_BATCH_ITEMS = 5000
+
+
+def supported_banks() -> List[str]:
+    return sorted(registry.names(), key=str.lower)
+
+
+def registered_bank(name: str) -> str:
+    """Registered spelling of a bank name (any case); 404 if unknown."""
+    try:
+        return registry.get(name).name
+    except KeyError:
+        raise HTTPException(404, f"'{name}' нэртэй банк бүртгэлгүй")
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     init_db()
     yield
+    broadcaster.close()
+    optimize()
+
+
+def _mark_endpoint_done():
+    timings = metrics.request_timings.get()
+    if timings is not None:
+        timings["endpoint_done"] = time.perf_counter()
+
+
+class InstrumentedRoute(APIRoute):
+    """Route that records when the endpoint returns, so the middleware can
+    split handler time from response validation and serialization."""
+
+    def __init__(self, path: str, endpoint, **kwargs):
+        if inspect.iscoroutinefunction(endpoint):
+
+            @functools.wraps(endpoint)
+            async def wrapped(*args, **kw):
+                try:
+                    return await endpoint(*args, **kw)
+                finally:
+                    _mark_endpoint_done()
+
+        else:
+
+            @functools.wraps(endpoint)
+            def wrapped(*args, **kw):
+                try:
+                    return endpoint(*args, **kw)
+                finally:
+                    _mark_endpoint_done()
+
+        super().__init__(path, wrapped, **kwargs)
 
 
 app = FastAPI(
@@ -61,17 +124,43 @@ app = FastAPI(
     ],
 )
 
+app.router.route_class = InstrumentedRoute
+
 app.add_middleware(
     CORSMiddleware,
     allow_origins=["*"],
     allow_credentials=True,
-    allow_methods=["GET"],
+    allow_methods=["GET", "POST"],
     allow_headers=["*"],
 )
 
 
+@app.middleware("http")
+async def record_metrics(request: Request, call_next):
+    timings = {"db": 0.0}
+    token = metrics.request_timings.set(timings)
+    start = time.perf_counter()
+    try:
+        response = await call_next(request)
+    finally:
+        metrics.request_timings.reset(token)
+    done = time.perf_counter()
+
+    route = request.scope.get("route")
+    path = route.path if route else "unmatched"
+    metrics.API_REQUEST_DURATION.labels(
+        method=request.method, route=path, status=response.status_code
+    ).observe(done - start)
+    metrics.API_DB_DURATION.labels(route=path).observe(timings["db"])
+    if "endpoint_done" in timings:
+        metrics.API_SERIALIZATION_DURATION.labels(route=path).observe(
+            done - timings["endpoint_done"]
+        )
+    return response
+
+
 @app.get("/", tags=["Ерөнхий"])
-def root():
+async def root():
     """API-н ерөнхий мэдээлэл, дэмждэг банкууд, endpoints."""
     return {
         "name": "Монголын Банкуудын Валютын Ханш API",
@@ -79,39 +168,52 @@ def root():
         "documentation": "/docs",
         "github": __url__,
         "donation": __donation__,
-        "supported_banks": BANKS,
+        "supported_banks": supported_banks(),
         "endpoints": {
             "/rates": "Бүх ханш (pagination-тай)",
             "/rates/latest": "Банк бүрийн хамгийн сүүлийн ханш",
             "/rates/bank/{bank_name}": "Тодорхой банкны ханш",
             "/rates/date/{date}": "Тодорхой өдрийн бүх банкны ханш",
             "/rates/bank/{bank_name}/date/{date}": "Банк + өдрөөр ханш",
+            "/rates/bank/{bank_name}/intraday": "Өдөр доторх өөрчлөлт",
+            "/rates/batch": "Олон (банк, өдөр)-ийн ханш нэг хүсэлтээр (POST)",
+            "/rates/matrix/{bank_name}": "Банкны cross-rate matrix",
+            "/convert": "Валют хөрвүүлэх (MNT-ээр дамжуулан)",
+            "/rates/stream": "Ханшийн өөрчлөлтийн SSE stream",
+            "/rates/ws": "Ханшийн өөрчлөлтийн WebSocket stream",
             "/health": "API health check",
+            "/metrics": "Prometheus metrics",
         },
         "example_currencies": ["usd", "eur", "cny", "rub", "jpy"],
     }
 
 
 @app.get("/health", tags=["Ерөнхий"])
-def health():
+async def health():
     """API health check - monitoring-д ашиглана."""
     return {"status": "healthy", "version": __version__}
 
 
+@app.get("/metrics", tags=["Ерөнхий"], include_in_schema=False)
+async def prometheus_metrics():
+    """Prometheus scrape endpoint."""
+    return Response(metrics.latest(), media_type=CONTENT_TYPE_LATEST)
+
+
 @app.get(
     "/rates",
     response_model=List[CurrencyRateResponse],
     tags=["Ханш"],
     summary="Бүх ханш авах",
 )
-def get_all_rates(
+async def get_all_rates(
     skip: int = Query(
         0, ge=0, description="Алгасах өгөгдлийн тоо (pagination)"
     ),
     limit: int = Query(
         100, ge=1, le=1000, description="Буцаах өгөгдлийн тоо (1-1000)"
     ),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
 ):
     """
     Бүх банкны бүх ханшийг авах (pagination-тай).
@@ -119,7 +221,7 @@ def get_all_rates(
     - **skip**: Эхнээс хэдийг алгасах (default: 0)
     - **limit**: Хэдэн бичлэг буцаах (default: 100, max: 1000)
     """
-    return repository.get_all_rates(db, skip=skip, limit=limit)
+    return await async_repository.get_all_rates(db, skip=skip, limit=limit)
 
 
 @app.get(
@@ -128,13 +230,13 @@ def get_all_rates(
     tags=["Ханш"],
     summary="Хамгийн сүүлийн ханш",
 )
-def get_latest_rates(db: Session = Depends(get_db)):
+async def get_latest_rates(db: AsyncSession = Depends(get_async_db)):
     """
     Банк бүрийн хамгийн сүүлд бүртгэгдсэн ханшийг буцаана.
 
-    Энэ endpoint нь банк бүрээс зөвхөн 1 өгөгдөл буцаана (нийт 13).
+    Энэ endpoint нь банк бүрээс зөвхөн 1 өгөгдөл буцаана.
     """
-    return repository.get_latest_rates(db)
+    return await async_repository.get_latest_rates(db)
 
 
 @app.get(
@@ -143,20 +245,23 @@ def get_latest_rates(db: Session = Depends(get_db)):
     tags=["Ханш"],
     summary="Банкаар ханш авах",
 )
-def get_rates_by_bank(
+async def get_rates_by_bank(
     bank_name: str,
     skip: int = Query(0, ge=0, description="Алгасах өгөгдлийн тоо"),
     limit: int = Query(100, ge=1, le=1000, description="Буцаах өгөгдлийн тоо"),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
 ):
     """
     Тодорхой банкны бүх ханшийг авах.
 
     **bank_name жишээ**: KhanBank, GolomtBank, TDBM, XacBank
 
-    Банкны нэрийг яг зөв бичих шаардлагатай (case-sensitive).
+    Банкны нэр том, жижиг үсэг ялгахгүй; бүртгэлгүй банк 404.
     """
-    rates = repository.get_rates_by_bank(db, bank_name, skip=skip, limit=limit)
+    bank_name = registered_bank(bank_name)
+    rates = await async_repository.get_rates_by_bank(
+        db, bank_name, skip=skip, limit=limit
+    )
     if not rates:
         raise HTTPException(404, f"'{bank_name}' банкны ханш олдсонгүй")
     return rates
@@ -168,16 +273,22 @@ def get_rates_by_bank(
     tags=["Ханш"],
     summary="Өдрөөр ханш авах",
 )
-def get_rates_by_date(
+async def get_rates_by_date(
     date: str,
     skip: int = Query(0, ge=0, description="Алгасах бичлэгийн тоо"),
     limit: int = Query(100, ge=1, le=1000, description="Буцаах бичлэгийн тоо"),
-    db: Session = Depends(get_db),
+    as_of: bool = Query(
+        False, description="Тухайн өдөр байхгүй бол өмнөх хамгийн ойр өдөр"
+    ),
+    db: AsyncSession = Depends(get_async_db),
 ):
     """
     Тодорхой өдрийн бүх банкны ханшийг авах.
 
     **date формат**: YYYY-MM-DD (жишээ: 2026-02-06)
+
+    `as_of=true` үед банк бүрийн тухайн өдөр эсвэл түүнээс өмнөх хамгийн
+    сүүлийн ханш буцна (амралтын өдөр, баяр). Бодит огноо нь `date`-д.
     """
     try:
         date_obj = datetime.date.fromisoformat(date)
@@ -186,7 +297,13 @@ def get_rates_by_date(
             400, "Огнооны формат буруу. YYYY-MM-DD ашиглана уу"
         )
 
-    rates = repository.get_rates_by_date(db, date_obj, skip=skip, limit=limit)
+    if as_of:
+        rates = await async_repository.get_rates_as_of(db, date_obj)
+        rates = rates[skip : skip + limit]
+    else:
+        rates = await async_repository.get_rates_by_date(
+            db, date_obj, skip=skip, limit=limit
+        )
     if not rates:
         raise HTTPException(404, f"'{date}' өдрийн ханш олдсонгүй")
     return rates
@@ -198,19 +315,25 @@ def get_rates_by_date(
     tags=["Ханш"],
     summary="Банк + өдрөөр ханш авах",
 )
-def get_rate_by_bank_and_date(
+async def get_rate_by_bank_and_date(
     bank_name: str,
     date: str,
-    db: Session = Depends(get_db),
+    as_of: bool = Query(
+        False, description="Тухайн өдөр байхгүй бол өмнөх хамгийн ойр өдөр"
+    ),
+    db: AsyncSession = Depends(get_async_db),
 ):
     """
     Тодорхой банкны тодорхой өдрийн ханшийг авах.
 
     - **bank_name**: Банкны нэр (жишээ: KhanBank)
     - **date**: Огноо YYYY-MM-DD форматаар
+    - **as_of**: `true` бол тухайн өдөр эсвэл түүнээс өмнөх хамгийн
+      сүүлийн ханш (хариуны `date` нь бодит огноо)
 
     Зөвхөн 1 өгөгдөл буцаана.
     """
+    bank_name = registered_bank(bank_name)
     try:
         date_obj = datetime.date.fromisoformat(date)
     except ValueError:
@@ -218,9 +341,273 @@ def get_rate_by_bank_and_date(
             400, "Огнооны формат буруу. YYYY-MM-DD ашиглана уу"
         )
 
-    rate = repository.get_rates_by_bank_and_date(db, bank_name, date_obj)
+    if as_of:
+        rate = await async_repository.get_rate_as_of(db, bank_name, date_obj)
+    else:
+        rate = await async_repository.get_rates_by_bank_and_date(
+            db, bank_name, date_obj
+        )
     if not rate:
         raise HTTPException(
             404, f"'{bank_name}' банкны '{date}' өдрийн ханш олдсонгүй"
         )
     return rate
+
+
+@app.get(
+    "/rates/bank/{bank_name}/intraday",
+    response_model=List[RateTickResponse],
+    tags=["Ханш"],
+    summary="Өдөр доторх ханшийн өөрчлөлт",
+)
+async def get_intraday_rates(
+    bank_name: str,
+    date: Optional[str] = Query(
+        None, description="Огноо YYYY-MM-DD (default: өнөөдөр)"
+    ),
+    db: AsyncSession = Depends(get_async_db),
+):
+    """
+    Тодорхой банкны өдөр доторх ханшийн өөрчлөлтүүд (валют бүрээр).
+
+    - **bank_name**: Банкны нэр (жишээ: KhanBank)
+    - **date**: Огноо YYYY-MM-DD форматаар
+
+    Өөрчлөгдсөн валют бүр цагийн дарааллаар буцна.
+    """
+    bank_name = registered_bank(bank_name)
+    try:
+        date_obj = (
+            datetime.date.fromisoformat(date)
+            if date
+            else datetime.date.today()
+        )
+    except ValueError:
+        raise HTTPException(
+            400, "Огнооны формат буруу. YYYY-MM-DD ашиглана уу"
+        )
+
+    ticks = await async_repository.get_intraday_ticks(db, bank_name, date_obj)
+    if not ticks:
+        raise HTTPException(
+            404, f"'{bank_name}' банкны '{date_obj}' өдрийн өөрчлөлт олдсонгүй"
+        )
+    return ticks
+
+
+def _batch_result(query: BatchRateQuery, rate) -> dict:
+    result = {
+        "bank": query.bank,
+        "date": query.date,
+        "currency": query.currency,
+        "found": False,
+    }
+    if rate is None:
+        return result
+    rates = rate.rates or {}
+    if query.currency:
+        code = query.currency.lower()
+        if code not in rates:
+            return result
+        rates = {code: rates[code]}
+    result.update(
+        found=True, id=rate.id, rates=rates, timestamp=rate.timestamp
+    )
+    return result
+
+
+@app.post(
+    "/rates/batch",
+    response_model=List[BatchRateResult],
+    tags=["Ханш"],
+    summary="Олон банк, өдрийн ханш нэг дор",
+)
+async def get_rates_batch(
+    queries: List[BatchRateQuery] = Body(
+        ..., min_length=1, max_length=MAX_BATCH_ITEMS
+    ),
+    db: AsyncSession = Depends(get_async_db),
+):
+    """
+    `(bank, date[, currency])` жагсаалтын ханшийг нэг query-ээр авна.
+
+    Хариу нь хүсэлтийн дарааллаар буцна; олдоогүй мөр `found: false`.
+    Банкны нэр том, жижиг үсэг ялгахгүй; бүртгэлгүй банк байвал 404.
+    Нэг удаад дээд тал нь 5000 мөр.
+
+    Жишээ: `[{"bank": "KhanBank", "date": "2026-02-06", "currency": "usd"}]`
+    """
+    banks = {q.bank: registered_bank(q.bank) for q in queries}
+    queries = [q.model_copy(update={"bank": banks[q.bank]}) for q in queries]
+    pairs = [(q.bank, q.date) for q in queries]
+    found = await async_repository.get_rates_for_pairs(db, pairs)
+    return [_batch_result(q, found.get((q.bank, q.date))) for q in queries]
+
+
+@app.get(
+    "/rates/matrix/{bank_name}",
+    response_model=RateMatrixResponse,
+    tags=["Ханш"],
+    summary="Банкны cross-rate matrix",
+)
+async def get_rate_matrix(
+    bank_name: str,
+    kind: Literal["cash", "noncash"] = Query(
+        "cash", description="cash эсвэл noncash"
+    ),
+    db: AsyncSession = Depends(get_async_db),
+):
+    """
+    Банкны хамгийн сүүлийн ханшаар бүх валютын хоорондох хөрвүүлэлтийн
+    хүснэгт. `matrix[i][j]` нь 1 нэгж `currencies[i]`-г банкинд зарж
+    (авах ханшаар), `currencies[j]`-г худалдан авах (зарах ханшаар) үеийн
+    хэмжээ. Ханш байхгүй бол `null`.
+    """
+    matrix = await latest_matrix(db, registered_bank(bank_name))
+    if matrix is None:
+        raise HTTPException(404, f"'{bank_name}' банкны ханш олдсонгүй")
+    return {
+        "bank": matrix.bank,
+        "date": matrix.date,
+        "kind": kind,
+        "currencies": matrix.currencies,
+        "matrix": matrix.as_lists(kind),
+    }
+
+
+@app.get(
+    "/convert",
+    response_model=ConversionResponse,
+    tags=["Ханш"],
+    summary="Валют хөрвүүлэх",
+)
+async def convert(
+    bank: str = Query(..., description="Банкны нэр (жишээ: KhanBank)"),
+    source: str = Query(..., alias="from", description="Зарах валют"),
+    target: str = Query(..., alias="to", description="Авах валют"),
+    amount: float = Query(1.0, gt=0, description="Дүн"),
+    kind: Literal["cash", "noncash"] = Query(
+        "cash", description="cash эсвэл noncash"
+    ),
+    db: AsyncSession = Depends(get_async_db),
+):
+    """
+    Банкны авах/зарах ханшаар MNT-ээр дамжуулан хөрвүүлнэ.
+
+    Жишээ: `/convert?bank=KhanBank&from=eur&to=cny&amount=100`
+    """
+    matrix = await latest_matrix(db, registered_bank(bank))
+    if matrix is None:
+        raise HTTPException(404, f"'{bank}' банкны ханш олдсонгүй")
+    source, target = source.lower(), target.lower()
+    rate = matrix.rate(kind, source, target)
+    if rate is None:
+        raise HTTPException(
+            404, f"'{bank}' банкинд {source}→{target} {kind} ханш алга"
+        )
+    return {
+        "bank": matrix.bank,
+        "date": matrix.date,
+        "kind": kind,
+        "from": source,
+        "to": target,
+        "amount": amount,
+        "rate": rate,
+        "result": amount * rate,
+    }
+
+
+def _matches(event: dict, bank: Optional[str], currency: Optional[str]):
+    return (not bank or event["bank"].lower() == bank.lower()) and (
+        not currency or event["currency"] == currency.lower()
+    )
+
+
+def _sse(event: dict) -> str:
+    data = json.dumps(event, ensure_ascii=False)
+    return f"id: {event['id']}\nevent: rate\ndata: {data}\n\n"
+
+
+@app.get(
+    "/rates/stream",
+    tags=["Ханш"],
+    summary="Ханшийн өөрчлөлтийн stream (SSE)",
+    response_class=StreamingResponse,
+)
+async def stream_rates(
+    request: Request,
+    bank: Optional[str] = Query(None, description="Банкаар шүүх"),
+    currency: Optional[str] = Query(None, description="Валютаар шүүх"),
+):
+    """
+    Банк/валют бүрийн ханш өөрчлөгдөх бүрт Server-Sent Events-ээр
+    мэдэгдэнэ. `/rates/latest`-ийг polling хийх шаардлагагүй.
+
+    Тасарсан үед `Last-Event-ID` header-ээр алгассан өөрчлөлтүүдээ авна.
+    """
+    last_id = request.headers.get("last-event-id", "")
+    queue = broadcaster.subscribe()
+
+    async def events():
+        try:
+            yield f"retry: {config.STREAM_POLL_INTERVAL * 1000}\n\n"
+            if last_id.isdigit():
+                missed = await run_in_threadpool(
+                    fetch_ticks, broadcaster.session_factory, int(last_id)
+                )
+                for event in missed:
+                    if _matches(event, bank, currency):
+                        yield _sse(event)
+            while not await request.is_disconnected():
+                try:
+                    event = await asyncio.wait_for(
+                        queue.get(), timeout=config.STREAM_HEARTBEAT
+                    )
+                except asyncio.TimeoutError:
+                    yield ": ping\n\n"
+                    continue
+                if _matches(event, bank, currency):
+                    yield _sse(event)
+        finally:
+            broadcaster.unsubscribe(queue)
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@app.websocket("/rates/ws")
+async def rates_websocket(
+    websocket: WebSocket,
+    bank: Optional[str] = None,
+    currency: Optional[str] = None,
+):
+    """Ханшийн өөрчлөлтийг WebSocket-оор JSON мессеж болгон илгээнэ."""
+    await websocket.accept()
+    queue = broadcaster.subscribe()
+
+    async def closed():
+        # Clients send nothing; a read returns once they disconnect
+        while (await websocket.receive())["type"] != "websocket.disconnect":
+            pass
+
+    reader = asyncio.create_task(closed())
+    try:
+        while True:
+            getter = asyncio.create_task(queue.get())
+            await asyncio.wait(
+                {getter, reader}, return_when=asyncio.FIRST_COMPLETED
+            )
+            if reader.done():
+                getter.cancel()
+                break
+            event = getter.result()
+            if _matches(event, bank, currency):
+                await websocket.send_json(event)
+    except WebSocketDisconnect:
+        pass
+    finally:
+        reader.cancel()
+        broadcaster.unsubscribe(queue)
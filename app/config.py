@@ -17,8 +17,43 @@ def _env_int(key: str, default: int = 0) -> int:
     return int(_env(key, str(default)))
 
 
-def _database_url() -> str:
-    url = _env("DATABASE_URL", "sqlite:///./exchange_rates.db")
+def _env_float(key: str, default: float = 0.0) -> float:
+    return float(_env(key, str(default)))
+
+
+def _env_list(key: str) -> list:
+    return [v.strip() for v in _env(key).split(",") if v.strip()]
+
+
+# Replay mode: point every bank URI (by Config attribute) at a local
+# fake-bank server (python -m benchmarks.fakebank).
+CRAWL_REPLAY = _env("CRAWL_REPLAY").rstrip("/")
+
+REPLAY_PATHS = {
+    "KHANBANK_URI": "/khanbank",
+    "GOLOMT_URI": "/golomtbank",
+    "XACBANK_URI": "/xacbank",
+    "ARIGBANK_API_URL": "/arigbank",
+    "STATEBANK_URI": "/statebank",
+    "MONGOLBANK_URI": "/mongolbank",
+    "CAPITRONBANK_API_URL": "/capitronbank",
+    "TDBM_URI": "/tdbm",
+    "BOGDBANK_URI": "/bogdbank",
+    "CKBANK_URI": "/ckbank",
+    "NIBANK_URI": "/nibank",
+    "TRANSBANK_URI": "/transbank",
+    "MBANK_URI": "/mbank/",
+}
+
+
+def _bank_uri(attr: str, default: str, env_key: str = "") -> str:
+    if CRAWL_REPLAY:
+        return CRAWL_REPLAY + REPLAY_PATHS[attr]
+    return _env(env_key or attr, default)
+
+
+def _database_url(key: str, default: str = "") -> str:
+    url = _env(key, default)
     if url.startswith("postgres://"):
         return url.replace("postgres://", "postgresql://", 1)
     return url
@@ -26,50 +61,140 @@ def _database_url() -> str:
 
 class Config:
     # Database
-    DATABASE_URL = _database_url()
+    DATABASE_URL = _database_url(
+        "DATABASE_URL", "sqlite:///./exchange_rates.db"
+    )
+    # Optional replica for API reads; writes always go to DATABASE_URL
+    DATABASE_READ_URL = _database_url("DATABASE_READ_URL")
+    DB_POOL_SIZE = _env_int("DB_POOL_SIZE", 5)
+    DB_MAX_OVERFLOW = _env_int("DB_MAX_OVERFLOW", 10)
+    DB_POOL_TIMEOUT = _env_int("DB_POOL_TIMEOUT", 30)
+    DB_POOL_RECYCLE = _env_int("DB_POOL_RECYCLE", 1800)
+    DB_POOL_PRE_PING = _env_bool("DB_POOL_PRE_PING", True)
+    # Seconds to keep reads on the primary after the replica fails
+    DB_REPLICA_RETRY = _env_int("DB_REPLICA_RETRY", 30)
+    # SQLite profile: WAL so API reads do not wait on crawl commits
+    SQLITE_BUSY_TIMEOUT = _env_int("SQLITE_BUSY_TIMEOUT", 5000)
+    SQLITE_CACHE_SIZE = _env_int("SQLITE_CACHE_SIZE", -65536)
+    SQLITE_MMAP_SIZE = _env_int("SQLITE_MMAP_SIZE", 268435456)
+    SQLITE_OPTIMIZE_ON_SHUTDOWN = _env_bool(
+        "SQLITE_OPTIMIZE_ON_SHUTDOWN", True
+    )
 
     # Scheduler
     CRON_SCHEDULE = _env("CRON_SCHEDULE", "0 9 * * *")
+    POLL_INTERVAL = _env_int("POLL_INTERVAL", 300)
+
+    # Retention (scripts/compact.py)
+    RETENTION_INTRADAY_DAYS = _env_int("RETENTION_INTRADAY_DAYS", 90)
+    RETENTION_HOT_YEARS = _env_int("RETENTION_HOT_YEARS", 2)
+
+    # Rate change stream (/rates/stream)
+    STREAM_POLL_INTERVAL = _env_int("STREAM_POLL_INTERVAL", 2)
+    STREAM_HEARTBEAT = _env_int("STREAM_HEARTBEAT", 15)
+    # How far behind the newest tick an id skipped by a later commit is
+    # still looked for
+    STREAM_GAP_WINDOW = _env_int("STREAM_GAP_WINDOW", 1000)
 
     # HTTP settings
     SSL_VERIFY = _env_bool("SSL_VERIFY", False)
     REQUEST_TIMEOUT = _env_int("REQUEST_TIMEOUT", 30)
     PLAYWRIGHT_TIMEOUT = _env_int("PLAYWRIGHT_TIMEOUT", 60000)
+    # Browser readiness marker (default: next to the Playwright browsers)
+    PLAYWRIGHT_READY_MARKER = _env("PLAYWRIGHT_READY_MARKER")
 
     # Parallel execution
     ENABLE_PARALLEL = _env_bool("ENABLE_PARALLEL", True)
     MAX_WORKERS = _env_int("MAX_WORKERS", 8)
     PLAYWRIGHT_MAX_WORKERS = _env_int("PLAYWRIGHT_MAX_WORKERS", 3)
+    # Browser banks in worker processes (services/browser_pool); 0 = threads
+    PLAYWRIGHT_PROCESSES = _env_int("PLAYWRIGHT_PROCESSES", 0)
+    PLAYWRIGHT_PROCESS_MAX_TASKS = _env_int("PLAYWRIGHT_PROCESS_MAX_TASKS", 50)
+    PLAYWRIGHT_PROCESS_MAX_MB = _env_int("PLAYWRIGHT_PROCESS_MAX_MB", 1024)
+
+    # Rate validation before saving (app/services/validation.py); the
+    # limits are relative deviations, e.g. 0.25 = 25%
+    VALIDATE_RATES = _env_bool("VALIDATE_RATES", True)
+    RATE_MAX_OFFICIAL_DEVIATION = _env_float(
+        "RATE_MAX_OFFICIAL_DEVIATION", 0.25
+    )
+    RATE_MAX_DAY_CHANGE = _env_float("RATE_MAX_DAY_CHANGE", 0.2)
+    # Accept a rate held only for its day change once this many crawls in
+    # a row agree on it (0 = never)
+    RATE_RELEASE_AFTER = _env_int("RATE_RELEASE_AFTER", 3)
+
+    # Per-host politeness (app/utils/politeness.py); RPM 0 = no rate limit
+    CRAWL_HOST_RPM = _env_int("CRAWL_HOST_RPM", 60)
+    CRAWL_HOST_BURST = _env_int("CRAWL_HOST_BURST", 5)
+    CRAWL_HOST_MAX_IN_FLIGHT = _env_int("CRAWL_HOST_MAX_IN_FLIGHT", 2)
+    CRAWL_MAX_IN_FLIGHT = _env_int("CRAWL_MAX_IN_FLIGHT", 16)
+    CRAWL_CIRCUIT_FAILURES = _env_int("CRAWL_CIRCUIT_FAILURES", 3)
+    CRAWL_CIRCUIT_COOLDOWN = _env_int("CRAWL_CIRCUIT_COOLDOWN", 300)
+    CRAWL_MAX_WAIT = _env_int("CRAWL_MAX_WAIT", 60)
+
+    # Crawl leases for several workers (app/services/coordination.py)
+    CRAWL_LEASES = _env_bool("CRAWL_LEASES", False)
+    CRAWL_SLOT_SECONDS = _env_int("CRAWL_SLOT_SECONDS", 3600)
+    CRAWL_LEASE_TTL = _env_int("CRAWL_LEASE_TTL", 600)
+    CRAWL_WORKER_ID = _env("CRAWL_WORKER_ID", _env("DYNO"))
+
+    # Crawl job queue (app/services/jobs.py, scripts/worker.py)
+    CRAWL_QUEUE = _env_bool("CRAWL_QUEUE", False)
+    CRAWL_QUEUE_WORKERS = _env_int("CRAWL_QUEUE_WORKERS", 2)
+    CRAWL_QUEUE_POLL = _env_int("CRAWL_QUEUE_POLL", 5)
+    CRAWL_JOB_MAX_ATTEMPTS = _env_int("CRAWL_JOB_MAX_ATTEMPTS", 3)
+    CRAWL_JOB_RETRY_DELAY = _env_int("CRAWL_JOB_RETRY_DELAY", 60)
+    CRAWL_JOB_TIMEOUT = _env_int("CRAWL_JOB_TIMEOUT", 900)
+    CRAWL_REPLAY = CRAWL_REPLAY
+    # Comma-separated bank names to crawl (default: every registered bank)
+    CRAWL_BANKS = _env_list("CRAWL_BANKS")
+
+    # Raw response archive (disabled when empty)
+    ARCHIVE_DIR = _env("ARCHIVE_DIR")
+
+    # Metrics
+    PUSHGATEWAY_URL = _env("PUSHGATEWAY_URL")
 
     # Bank API endpoints
-    KHANBANK_URI = _env(
+    KHANBANK_URI = _bank_uri(
         "KHANBANK_URI", "https://www.khanbank.com/api/back/rates"
     )
-    GOLOMT_URI = _env("GOLOMT_URI", "https://www.golomtbank.com/api/exchange")
-    XACBANK_URI = _env("XACBANK_URI", "https://xacbank.mn/api/currencies")
-    ARIGBANK_API_URL = _env(
+    GOLOMT_URI = _bank_uri(
+        "GOLOMT_URI", "https://www.golomtbank.com/api/exchange"
+    )
+    XACBANK_URI = _bank_uri("XACBANK_URI", "https://xacbank.mn/api/currencies")
+    ARIGBANK_API_URL = _bank_uri(
         "ARIGBANK_API_URL", "https://www.arigbank.mn/exchange/getRate"
     )
-    ARIGBANK_BEARER_TOKEN = _env("ARIGBANK_BEARER_TOKEN")
-    STATEBANK_URI = _env(
+    ARIGBANK_BEARER_TOKEN = _env(
+        "ARIGBANK_BEARER_TOKEN", "replay" if CRAWL_REPLAY else ""
+    )
+    STATEBANK_URI = _bank_uri(
         "STATEBANK_URI", "https://www.statebank.mn/back/api/fetchrate"
     )
-    MONGOLBANK_URI = _env(
+    MONGOLBANK_URI = _bank_uri(
         "MONGOLBANK_URI",
         "https://www.mongolbank.mn/en/currency-rate-movement/data",
     )
-    CAPITRONBANK_API_URL = _env(
-        "CAPITRONBANK_URI",
+    CAPITRONBANK_API_URL = _bank_uri(
+        "CAPITRONBANK_API_URL",
         "https://www.capitronbank.mn/admin/en/wp-json/bank/rates/capitronbank",
+        env_key="CAPITRONBANK_URI",
     )
 
     # Playwright-based bank URLs
-    TDBM_URI = _env("TDBM_URI", "https://www.tdbm.mn/en/exchange-rates")
-    BOGDBANK_URI = _env("BOGDBANK_URI", "https://www.bogdbank.com/exchange")
-    CKBANK_URI = _env("CKBANK_URI", "https://www.ckbank.mn/currency-rates")
-    NIBANK_URI = _env("NIBANK_URI", "https://www.nibank.mn/en/rate")
-    TRANSBANK_URI = _env("TRANSBANK_URI", "https://transbank.mn/en/exchange")
-    MBANK_URI = _env("MBANK_URI", "https://m-bank.mn/")
+    TDBM_URI = _bank_uri("TDBM_URI", "https://www.tdbm.mn/en/exchange-rates")
+    BOGDBANK_URI = _bank_uri(
+        "BOGDBANK_URI", "https://www.bogdbank.com/exchange"
+    )
+    CKBANK_URI = _bank_uri(
+        "CKBANK_URI", "https://www.ckbank.mn/currency-rates"
+    )
+    NIBANK_URI = _bank_uri("NIBANK_URI", "https://www.nibank.mn/en/rate")
+    TRANSBANK_URI = _bank_uri(
+        "TRANSBANK_URI", "https://transbank.mn/en/exchange"
+    )
+    MBANK_URI = _bank_uri("MBANK_URI", "https://m-bank.mn/")
 
 
 config = Config()
@@ -1,49 +1,49 @@
-"""Bank crawlers for Mongolian exchange rates."""
-
-from app.crawlers.arigbank import ArigBank
-from app.crawlers.bogdbank import BogdBank
-from app.crawlers.capitronbank import CapitronBank
-from app.crawlers.ckbank import CKBank
-from app.crawlers.golomt import GolomtBank
-from app.crawlers.khanbank import KhanBank
-from app.crawlers.mbank import MBank
-from app.crawlers.mongolbank import MongolBank
-from app.crawlers.nibank import NIBank
-from app.crawlers.statebank import StateBank
-from app.crawlers.tdbm import TDBM
-from app.crawlers.transbank import TransBank
-from app.crawlers.xacbank import XacBank
-
-HTTP_CRAWLERS = [
-    KhanBank,
-    GolomtBank,
-    XacBank,
-    ArigBank,
-    StateBank,
-    MongolBank,
-    CapitronBank,
-]
-PLAYWRIGHT_CRAWLERS = [TDBM, BogdBank, CKBank, NIBank, TransBank, MBank]
-ALL_CRAWLERS = HTTP_CRAWLERS + PLAYWRIGHT_CRAWLERS
-
-CRAWLER_MAP = {c.BANK_NAME.lower(): c for c in ALL_CRAWLERS}
-
-__all__ = [
-    "KhanBank",
-    "GolomtBank",
-    "XacBank",
-    "ArigBank",
-    "StateBank",
-    "MongolBank",
-    "CapitronBank",
-    "TDBM",
-    "BogdBank",
-    "CKBank",
-    "NIBank",
-    "TransBank",
-    "MBank",
-    "HTTP_CRAWLERS",
-    "PLAYWRIGHT_CRAWLERS",
-    "ALL_CRAWLERS",
-    "CRAWLER_MAP",
-]
+"""Bank crawlers for Mongolian exchange rates.
+
+Banks are declared in :mod:`app.crawlers.registry`; crawler modules are
+imported on first use, so importing this package (or anything that only
+needs bank names) does not load ``requests``, ``lxml`` or Playwright.
+``from app.crawlers import KhanBank``, the ``*_BANKS`` names and the
+``*_CRAWLERS`` lists keep working; they resolve through ``__getattr__``.
+"""
+
+from typing import List
+
+from app.crawlers import registry
+
+
+def load(name: str):
+    """Crawler class by bank name (case-insensitive), importing its module."""
+    return registry.get(name).load()
+
+
+def _names(transport=None) -> List[str]:
+    return [spec.name for spec in registry.select(transport=transport)]
+
+
+_LISTS = {
+    "HTTP_BANKS": lambda: _names(registry.HTTP),
+    "PLAYWRIGHT_BANKS": lambda: _names(registry.BROWSER),
+    "ALL_BANKS": registry.names,
+    "HTTP_CRAWLERS": lambda: [load(n) for n in _names(registry.HTTP)],
+    "PLAYWRIGHT_CRAWLERS": lambda: [load(n) for n in _names(registry.BROWSER)],
+    "ALL_CRAWLERS": lambda: [load(n) for n in registry.names()],
+    "CRAWLER_MAP": lambda: {n.lower(): load(n) for n in registry.names()},
+}
+
+
+def __getattr__(name: str):
+    if name in _LISTS:
+        return _LISTS[name]()
+    if name == "__all__":
+        # Computed on demand: listing plugins scans installed packages
+        return [*registry.names(), *_LISTS, "load", "registry"]
+    # Exact class names only: "khanbank" must fall through to the module
+    spec = registry.specs().get(name.lower())
+    if spec is None or spec.name != name:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    return spec.load()
+
+
+def __dir__():
+    return sorted(list(globals()) + registry.names() + list(_LISTS))
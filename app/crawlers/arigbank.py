@@ -2,14 +2,14 @@ from typing import Dict
 
 from app.config import config
 from app.crawlers.base import BaseCrawler
-from app.models.exchange_rate import CurrencyDetail
+from app.models.exchange_rate import RateRecord
 from app.utils.logger import logger
 
 
 class ArigBank(BaseCrawler):
     BANK_NAME = "ArigBank"
 
-    def crawl(self) -> Dict[str, CurrencyDetail]:
+    def crawl(self) -> Dict[str, RateRecord]:
         token = (config.ARIGBANK_BEARER_TOKEN or "").strip()
         if not token:
             logger.warning("ArigBank: ARIGBANK_BEARER_TOKEN not configured")
@@ -31,19 +31,20 @@ class ArigBank(BaseCrawler):
             logger.warning(f"ArigBank API error: {data.get('message')}")
             return {}
 
-        return self._parse(data.get("data", []))
+        return self.parse(data)
 
-    def _parse(self, data: list) -> Dict[str, CurrencyDetail]:
-        rates = {}
-        for item in data:
+    def _parse(self, data: dict) -> Dict[str, RateRecord]:
+        rows = []
+        for item in data.get("data") or []:
             code = item.get("curCode", "").strip().lower()
             if code:
-                rates[code] = self.make_rate(
-                    cash_buy=self.parse_float(item.get("belenBuyRate")),
-                    cash_sell=self.parse_float(item.get("belenSellRate")),
-                    noncash_buy=self.parse_float(item.get("belenBusBuyRate")),
-                    noncash_sell=self.parse_float(
-                        item.get("belenBusSellRate")
-                    ),
+                rows.append(
+                    (
+                        code,
+                        item.get("belenBuyRate"),
+                        item.get("belenSellRate"),
+                        item.get("belenBusBuyRate"),
+                        item.get("belenBusSellRate"),
+                    )
                 )
-        return rates
+        return self.make_rates(rows)
@@ -1,21 +1,39 @@
+import json
+import re
 from abc import ABC, abstractmethod
-from typing import Dict, Optional
+from typing import Dict, Iterable, List, Optional, Tuple
 
 import requests
 import urllib3
-from playwright.sync_api import sync_playwright
 
 from app.config import config
-from app.models.exchange_rate import CurrencyDetail, Rate
+from app.crawlers import registry
+from app.models.exchange_rate import RatePair, RateRecord
+from app.utils import archive, metrics, playwright_setup, politeness
+from app.utils.logger import logger
 
 if not config.SSL_VERIFY:
     urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
 
+# Cell values that mean "no rate"
+MISSING = frozenset(("", "-", "\u2013", "\u2014"))
+
+# Elements that start a new line in ``inner_text`` and ones never rendered
+BLOCK_TAGS = frozenset("""
+    address article aside blockquote dd div dl dt figcaption figure footer
+    form h1 h2 h3 h4 h5 h6 header hr li main nav ol p pre section table
+    tbody tfoot thead tr ul
+    """.split())
+HIDDEN_TAGS = frozenset(("head", "noscript", "script", "style", "template"))
+WHITESPACE = re.compile(r"[ \t\r\n\f]+")
+
 
 class BaseCrawler(ABC):
     """Base class for HTTP API crawlers."""
 
     BANK_NAME: str = ""
+    # Raw response format, used to decode archived payloads
+    PAYLOAD_FORMAT: str = "json"
 
     def __init__(self, date: str):
         self.date = date
@@ -23,70 +41,267 @@ class BaseCrawler(ABC):
         self.ssl_verify = config.SSL_VERIFY
 
     @abstractmethod
-    def crawl(self) -> Dict[str, CurrencyDetail]:
+    def crawl(self) -> Dict[str, RateRecord]:
         pass
 
-    def get(self, url: str, **kwargs) -> requests.Response:
-        return requests.get(
-            url, verify=self.ssl_verify, timeout=self.timeout, **kwargs
+    def timed(self, phase: str):
+        """Record the duration of a crawl phase for this bank."""
+        return metrics.timed(
+            metrics.CRAWL_PHASE_DURATION, bank=self.BANK_NAME, phase=phase
         )
 
+    def get(self, url: str, **kwargs) -> requests.Response:
+        return self._request(requests.get, url, **kwargs)
+
     def post(self, url: str, **kwargs) -> requests.Response:
-        return requests.post(
-            url, verify=self.ssl_verify, timeout=self.timeout, **kwargs
+        return self._request(requests.post, url, **kwargs)
+
+    def _request(
+        self, method, url: str, store: bool = True, **kwargs
+    ) -> requests.Response:
+        """Send a request through the host's politeness slot.
+
+        ``method`` is ``requests.get``/``post`` or the same method of a
+        ``requests.Session``; ``store=False`` keeps an auxiliary response
+        (a login) out of the archive.
+        """
+        with politeness.scheduler.slot(url), self.timed("fetch"):
+            try:
+                resp = method(
+                    url, verify=self.ssl_verify, timeout=self.timeout, **kwargs
+                )
+            except requests.RequestException:
+                politeness.scheduler.record(url)
+                raise
+        politeness.scheduler.record(
+            url, resp.status_code, resp.headers.get("Retry-After")
         )
+        self.observe_connect(resp)
+        if resp.ok and store:
+            self.archive(resp.content)
+        return resp
 
-    @staticmethod
-    def parse_float(value) -> Optional[float]:
-        if value is None:
-            return None
+    def observe_connect(self, resp: requests.Response):
+        # Time until response headers arrived (connect + server latency)
+        metrics.CRAWL_PHASE_DURATION.labels(
+            bank=self.BANK_NAME, phase="connect"
+        ).observe(resp.elapsed.total_seconds())
+
+    def archive(self, raw: bytes):
+        """Keep the raw response so it can be re-parsed later."""
+        if not config.ARCHIVE_DIR:
+            return
         try:
-            if isinstance(value, (int, float)):
-                return float(value) if value != 0 else None
-            cleaned = (
-                str(value)
-                .strip()
-                .replace(",", "")
-                .replace(" ", "")
-                .replace("\xa0", "")
+            archive.store(
+                config.ARCHIVE_DIR,
+                self.BANK_NAME,
+                self.date,
+                raw,
+                self.PAYLOAD_FORMAT,
             )
-            if not cleaned or cleaned == "-" or cleaned == "0":
-                return None
-            return float(cleaned)
-        except (ValueError, TypeError):
-            return None
+        except Exception as e:
+            logger.warning(f"{self.BANK_NAME}: failed to archive - {e}")
+
+    def parse(self, data) -> Dict[str, RateRecord]:
+        with self.timed("parse"):
+            return self._parse(data)
+
+    def parse_payload(self, raw: bytes) -> Dict[str, RateRecord]:
+        """Parse an archived raw response."""
+        if self.PAYLOAD_FORMAT == "json":
+            return self._parse(json.loads(raw))
+        return self._parse(raw.decode("utf-8"))
+
+    def _parse(self, data) -> Dict[str, RateRecord]:
+        """Extract rates from a fetched response; the hook crawlers override.
+
+        ``data`` is the decoded JSON for ``PAYLOAD_FORMAT = "json"`` and
+        the body text (rendered HTML for Playwright crawlers) otherwise,
+        live or read back from the archive by :meth:`parse_payload`. Not
+        abstract, so plugin crawlers that only override ``crawl`` still
+        load; they just cannot reparse archived payloads.
+        """
+        raise NotImplementedError(
+            f"{type(self).__name__} does not parse raw payloads"
+        )
+
+    @staticmethod
+    def parse_floats(values: Iterable) -> List[Optional[float]]:
+        """Parse a column of raw cells into floats.
+
+        Thousands separators, spaces and NBSPs are dropped; empty cells,
+        dashes, zero and anything unparseable become None. One loop over
+        the column instead of a call per cell.
+        """
+        parsed = []
+        append = parsed.append
+        for value in values:
+            if isinstance(value, str):
+                # Chained str.replace beats translate() with a non-ASCII
+                # table, which falls back to a per-character lookup;
+                # float() ignores any other surrounding whitespace
+                cleaned = (
+                    value.replace(",", "").replace(" ", "").replace("\xa0", "")
+                )
+                if cleaned in MISSING:
+                    append(None)
+                    continue
+                try:
+                    append(float(cleaned) or None)
+                except ValueError:
+                    append(None)
+            elif value is None:
+                append(None)
+            else:
+                try:
+                    append(float(value) or None)
+                except (TypeError, ValueError):
+                    append(None)
+        return parsed
+
+    @classmethod
+    def parse_float(cls, value) -> Optional[float]:
+        return cls.parse_floats((value,))[0]
+
+    @classmethod
+    def make_rates(cls, rows: Iterable[Tuple]) -> Dict[str, RateRecord]:
+        """Rates from ``(code, cash_buy, cash_sell, noncash_buy,
+        noncash_sell)`` rows of raw cells.
+
+        The numbers of all rows go through one :meth:`parse_floats`
+        call; a later row for a code replaces an earlier one.
+        """
+        rows = list(rows)
+        numbers = iter(cls.parse_floats([v for row in rows for v in row[1:]]))
+        return {
+            row[0]: RateRecord(
+                RatePair(next(numbers), next(numbers)),
+                RatePair(next(numbers), next(numbers)),
+            )
+            for row in rows
+        }
 
     @staticmethod
     def make_rate(
         cash_buy=None, cash_sell=None, noncash_buy=None, noncash_sell=None
-    ) -> CurrencyDetail:
-        return CurrencyDetail(
-            cash=Rate(buy=cash_buy, sell=cash_sell),
-            noncash=Rate(buy=noncash_buy, sell=noncash_sell),
+    ) -> RateRecord:
+        return RateRecord(
+            RatePair(cash_buy, cash_sell), RatePair(noncash_buy, noncash_sell)
         )
 
 
 class PlaywrightCrawler(BaseCrawler):
-    """Base class for Playwright-based crawlers."""
+    """Base class for Playwright-based crawlers.
+
+    ``_crawl_page`` drives the browser and returns the rendered HTML;
+    ``_parse`` extracts rates from that HTML so it can run offline.
+    """
+
+    PAYLOAD_FORMAT = "html"
 
     def __init__(self, date: str):
         super().__init__(date)
         self.timeout = config.PLAYWRIGHT_TIMEOUT
 
-    def crawl(self) -> Dict[str, CurrencyDetail]:
+    def crawl(self, browser=None) -> Dict[str, RateRecord]:
+        """Render the bank's page and parse it.
+
+        ``browser`` is a running browser to open a context in (see
+        ``app.services.browser_pool``); without one, a browser is
+        launched for this crawl only.
+        """
+        if browser is not None:
+            return self._render(browser)
+
+        # Imported here: offline parsing and the API never need Playwright
+        from playwright.sync_api import sync_playwright
+
         with sync_playwright() as p:
-            browser = p.chromium.launch(headless=True)
-            context = browser.new_context(
-                ignore_https_errors=not self.ssl_verify
-            )
-            context.set_default_timeout(self.timeout)
-            page = context.new_page()
+            with self.timed("browser_launch"):
+                browser = playwright_setup.launch(p.chromium)
             try:
-                rates = self._crawl_page(page)
+                return self._render(browser)
             finally:
                 browser.close()
-        return rates
+
+    def _render(self, browser) -> Dict[str, RateRecord]:
+        # One page load counts as one request to the bank's host
+        url = registry.get(self.BANK_NAME).url
+        context = browser.new_context(ignore_https_errors=not self.ssl_verify)
+        try:
+            context.set_default_timeout(self.timeout)
+            page = context.new_page()
+            with politeness.scheduler.slot(url), self.timed("fetch"):
+                try:
+                    content = self._crawl_page(page)
+                except Exception:
+                    politeness.scheduler.record(url)
+                    raise
+            politeness.scheduler.record(url, 200)
+        finally:
+            context.close()
+        self.archive(content.encode("utf-8"))
+        return self.parse(content)
 
     @abstractmethod
-    def _crawl_page(self, page) -> Dict[str, CurrencyDetail]:
+    def _crawl_page(self, page) -> str:
         pass
+
+    @staticmethod
+    def document(content: str):
+        from lxml import html
+
+        return html.fromstring(content)
+
+    @staticmethod
+    def text(element) -> str:
+        """Element text with whitespace collapsed, like ``inner_text``."""
+        return " ".join(element.text_content().split())
+
+    @classmethod
+    def inner_text(cls, element) -> str:
+        """Rendered text of ``element``, one line per block, like
+        Playwright's ``inner_text``.
+
+        Inline elements run together on their line, so a value split
+        over several spans stays one line; ``hidden`` and ``display:
+        none`` elements are skipped. CSS-driven layout is not applied.
+        """
+        parts: List[str] = []
+        cls._render_text(element, parts)
+        lines = (line.strip(" ") for line in "".join(parts).split("\n"))
+        return "\n".join(line for line in lines if line)
+
+    @classmethod
+    def _render_text(cls, element, parts: List[str]):
+        if element.tag == "br":
+            parts.append("\n")
+            return
+        style = (element.get("style") or "").replace(" ", "")
+        if (
+            element.tag in HIDDEN_TAGS
+            or element.get("hidden") is not None
+            or "display:none" in style
+        ):
+            return
+        block = element.tag in BLOCK_TAGS
+        if block:
+            parts.append("\n")
+        if element.text:
+            parts.append(WHITESPACE.sub(" ", element.text))
+        for child in element:
+            # Comments and processing instructions have no str tag
+            if isinstance(child.tag, str):
+                cls._render_text(child, parts)
+            if child.tail:
+                parts.append(WHITESPACE.sub(" ", child.tail))
+        if block:
+            parts.append("\n")
+
+    @staticmethod
+    def has_class(name: str) -> str:
+        """XPath predicate matching a CSS class."""
+        return (
+            "contains(concat(' ', normalize-space(@class), ' '), "
+            f"' {name} ')"
+        )
@@ -2,30 +2,22 @@ from typing import Dict
 
 from app.config import config
 from app.crawlers.base import BaseCrawler
-from app.models.exchange_rate import CurrencyDetail
+from app.models.exchange_rate import RateRecord
 
 
 class GolomtBank(BaseCrawler):
     BANK_NAME = "GolomtBank"
 
-    def crawl(self) -> Dict[str, CurrencyDetail]:
+    def crawl(self) -> Dict[str, RateRecord]:
         date_fmt = self.date.replace("-", "")
         resp = self.get(f"{config.GOLOMT_URI}?date={date_fmt}")
         resp.raise_for_status()
-        return self._parse(resp.json().get("result", {}))
+        return self.parse(resp.json())
 
-    def _parse(self, data: dict) -> Dict[str, CurrencyDetail]:
-        rates = {}
-        for code, v in data.items():
-            if isinstance(v, dict):
-                cash_buy = v.get("cash_buy", {})
-                cash_sell = v.get("cash_sell", {})
-                noncash_buy = v.get("non_cash_buy", {})
-                noncash_sell = v.get("non_cash_sell", {})
-                rates[code.lower()] = self.make_rate(
-                    cash_buy=self.parse_float(cash_buy.get("cvalue")),
-                    cash_sell=self.parse_float(cash_sell.get("cvalue")),
-                    noncash_buy=self.parse_float(noncash_buy.get("cvalue")),
-                    noncash_sell=self.parse_float(noncash_sell.get("cvalue")),
-                )
-        return rates
+    def _parse(self, data: dict) -> Dict[str, RateRecord]:
+        columns = ("cash_buy", "cash_sell", "non_cash_buy", "non_cash_sell")
+        return self.make_rates(
+            (code.lower(), *(v.get(c, {}).get("cvalue") for c in columns))
+            for code, v in data.get("result", {}).items()
+            if isinstance(v, dict)
+        )
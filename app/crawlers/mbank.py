@@ -4,7 +4,7 @@ import requests
 
 from app.config import config
 from app.crawlers.base import BaseCrawler
-from app.models.exchange_rate import CurrencyDetail
+from app.models.exchange_rate import RateRecord
 
 
 class MBank(BaseCrawler):
@@ -20,33 +20,31 @@ class MBank(BaseCrawler):
         "Origin": "https://m-bank.mn",
     }
 
-    def crawl(self) -> Dict[str, CurrencyDetail]:
+    def crawl(self) -> Dict[str, RateRecord]:
+        # The rate list needs the cookies set by the login
         session = requests.Session()
-        session.verify = self.ssl_verify
-
-        session.post(
+        self._request(
+            session.post,
             f"{config.MBANK_URI}api/login",
+            store=False,
             headers=self.HEADERS,
-            timeout=self.timeout,
         )
-
-        resp = session.get(
+        resp = self._request(
+            session.get,
             f"{config.MBANK_URI}api",
             params={"name": "getCurrencyList"},
             headers=self.HEADERS,
-            timeout=self.timeout,
         )
         resp.raise_for_status()
-        return self._parse(resp.json())
+        return self.parse(resp.json())
 
-    def _parse(self, data: dict) -> Dict[str, CurrencyDetail]:
-        rates = {}
+    def _parse(self, data: dict) -> Dict[str, RateRecord]:
         if not data.get("success"):
-            return rates
+            return {}
+        rows = []
         for item in data.get("data", []):
             code = (item.get("fxd_crncy_code") or "").lower()
             if code:
-                buy = self.parse_float(item.get("buy_rate"))
-                sell = self.parse_float(item.get("sale_rate"))
-                rates[code] = self.make_rate(buy, sell, buy, sell)
-        return rates
+                buy, sell = item.get("buy_rate"), item.get("sale_rate")
+                rows.append((code, buy, sell, buy, sell))
+        return self.make_rates(rows)
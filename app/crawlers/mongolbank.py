@@ -4,27 +4,28 @@ from lxml import etree
 
 from app.config import config
 from app.crawlers.base import BaseCrawler
-from app.models.exchange_rate import CurrencyDetail
+from app.models.exchange_rate import RateRecord
 
 
 class MongolBank(BaseCrawler):
     BANK_NAME = "MongolBank"
+    PAYLOAD_FORMAT = "xml"
 
-    def crawl(self) -> Dict[str, CurrencyDetail]:
+    def crawl(self) -> Dict[str, RateRecord]:
         url = (
             f"{config.MONGOLBANK_URI}"
             f"?startdate={self.date}&enddate={self.date}"
         )
         resp = self.get(url)
         resp.raise_for_status()
-        return self._parse(resp.text)
+        return self.parse(resp.text)
 
-    def _parse(self, xml_text: str) -> Dict[str, CurrencyDetail]:
-        rates = {}
+    def _parse(self, xml_text: str) -> Dict[str, RateRecord]:
+        rows = []
         root = etree.fromstring(xml_text.encode("utf-8"))
         for row in root.xpath("//Ccy"):
             code = row.find("CcyNm_EN").text.lower()
-            rate = self.parse_float(row.find("Rate").text)
+            rate = row.find("Rate").text
             # MongolBank provides official central bank rate
-            rates[code] = self.make_rate(noncash_buy=rate, noncash_sell=rate)
-        return rates
+            rows.append((code, None, None, rate, rate))
+        return self.make_rates(rows)
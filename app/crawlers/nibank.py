@@ -5,24 +5,26 @@ from typing import Dict
 
 from app.config import config
 from app.crawlers.base import PlaywrightCrawler
-from app.models.exchange_rate import CurrencyDetail
+from app.models.exchange_rate import RateRecord
 
 
 class NIBank(PlaywrightCrawler):
     BANK_NAME = "NIBank"
 
-    def _crawl_page(self, page) -> Dict[str, CurrencyDetail]:
+    def _crawl_page(self, page) -> str:
         page.goto(
             config.NIBANK_URI,
             timeout=self.timeout,
             wait_until="networkidle",
         )
         page.wait_for_selector(".exchange-block", timeout=self.timeout)
+        return page.content()
 
-        rates = {}
-        for block in page.locator(".exchange-block").all():
-            text = block.inner_text()
-            lines = [line.strip() for line in text.split("\n") if line.strip()]
+    def _parse(self, content: str) -> Dict[str, RateRecord]:
+        rows = []
+        doc = self.document(content)
+        for block in doc.xpath(f"//*[{self.has_class('exchange-block')}]"):
+            lines = self.inner_text(block).split("\n")
             if len(lines) < 6:
                 continue
 
@@ -36,15 +38,13 @@ class NIBank(PlaywrightCrawler):
             for i, line in enumerate(lines):
                 if i + 1 < len(lines):
                     if "Бэлэн авах" in line:
-                        cash_buy = self.parse_float(lines[i + 1])
+                        cash_buy = lines[i + 1]
                     elif "Бэлэн зарах" in line:
-                        cash_sell = self.parse_float(lines[i + 1])
+                        cash_sell = lines[i + 1]
                     elif "Бэлэн бус авах" in line:
-                        noncash_buy = self.parse_float(lines[i + 1])
+                        noncash_buy = lines[i + 1]
                     elif "Бэлэн бус за" in line:
-                        noncash_sell = self.parse_float(lines[i + 1])
+                        noncash_sell = lines[i + 1]
 
-            rates[code] = self.make_rate(
-                cash_buy, cash_sell, noncash_buy, noncash_sell
-            )
-        return rates
+            rows.append((code, cash_buy, cash_sell, noncash_buy, noncash_sell))
+        return self.make_rates(rows)
@@ -0,0 +1,201 @@
+"""Declarative registry of bank crawlers.
+
+Every bank is described by a :class:`CrawlerSpec`: its name, the module
+holding the crawler class, how it is fetched and scheduled. Specs are
+plain data, so listing banks, validating API input or planning a crawl
+never imports a crawler module; :meth:`CrawlerSpec.load` does that when
+the bank is actually crawled.
+
+Banks outside this package are added by installing a distribution that
+registers a ``CrawlerSpec`` under the ``mongolian_bank_rates.crawlers``
+entry point group, e.g. in its ``pyproject.toml``::
+
+    [project.entry-points."mongolian_bank_rates.crawlers"]
+    SomeMFI = "some_mfi.spec:SPEC"
+"""
+
+import importlib
+from dataclasses import dataclass
+from datetime import date
+from functools import lru_cache
+from importlib.metadata import entry_points
+from typing import Dict, List, Optional
+
+from app.config import config
+from app.utils.logger import logger
+
+ENTRY_POINT_GROUP = "mongolian_bank_rates.crawlers"
+
+HTTP = "http"
+BROWSER = "browser"
+
+
+@dataclass(frozen=True)
+class CrawlerSpec:
+    name: str
+    module: str
+    # "http" (requests) or "browser" (Playwright)
+    transport: str = HTTP
+    # Config attribute holding the bank URL (env override, CRAWL_REPLAY)
+    url_setting: str = ""
+    # Whether the source can return rates for a past date
+    dated: bool = False
+    # "intraday": polled by scripts/poll.py; "daily": hourly cron only
+    freshness: str = "intraday"
+    # Worker pool the crawl runs in; defaults to the transport
+    concurrency: str = ""
+
+    @property
+    def url(self) -> str:
+        return getattr(config, self.url_setting, "")
+
+    @property
+    def pool(self) -> str:
+        return self.concurrency or self.transport
+
+    def serves(self, day: Optional[str] = None) -> bool:
+        """Whether the bank can return rates for ``day`` (None: today)."""
+        return self.dated or day is None or day >= date.today().isoformat()
+
+    def load(self):
+        """Import the crawler module and return the crawler class."""
+        return getattr(importlib.import_module(self.module), self.name)
+
+
+# Built-in banks, in crawl order
+BUILTIN = (
+    CrawlerSpec(
+        "KhanBank",
+        "app.crawlers.khanbank",
+        url_setting="KHANBANK_URI",
+        dated=True,
+    ),
+    CrawlerSpec(
+        "GolomtBank",
+        "app.crawlers.golomt",
+        url_setting="GOLOMT_URI",
+        dated=True,
+    ),
+    CrawlerSpec(
+        "XacBank",
+        "app.crawlers.xacbank",
+        url_setting="XACBANK_URI",
+        dated=True,
+    ),
+    CrawlerSpec(
+        "ArigBank",
+        "app.crawlers.arigbank",
+        url_setting="ARIGBANK_API_URL",
+        dated=True,
+    ),
+    CrawlerSpec(
+        "StateBank", "app.crawlers.statebank", url_setting="STATEBANK_URI"
+    ),
+    # Official rate, published once a day
+    CrawlerSpec(
+        "MongolBank",
+        "app.crawlers.mongolbank",
+        url_setting="MONGOLBANK_URI",
+        dated=True,
+        freshness="daily",
+    ),
+    CrawlerSpec(
+        "CapitronBank",
+        "app.crawlers.capitronbank",
+        url_setting="CAPITRONBANK_API_URL",
+    ),
+    CrawlerSpec(
+        "TDBM", "app.crawlers.tdbm", transport=BROWSER, url_setting="TDBM_URI"
+    ),
+    CrawlerSpec(
+        "BogdBank",
+        "app.crawlers.bogdbank",
+        transport=BROWSER,
+        url_setting="BOGDBANK_URI",
+    ),
+    CrawlerSpec(
+        "CKBank",
+        "app.crawlers.ckbank",
+        transport=BROWSER,
+        url_setting="CKBANK_URI",
+    ),
+    CrawlerSpec(
+        "NIBank",
+        "app.crawlers.nibank",
+        transport=BROWSER,
+        url_setting="NIBANK_URI",
+    ),
+    CrawlerSpec(
+        "TransBank",
+        "app.crawlers.transbank",
+        transport=BROWSER,
+        url_setting="TRANSBANK_URI",
+        dated=True,
+    ),
+    # Plain requests behind a login; kept off the intraday poller
+    CrawlerSpec(
+        "MBank",
+        "app.crawlers.mbank",
+        url_setting="MBANK_URI",
+        freshness="daily",
+    ),
+)
+
+
+def _plugins() -> List[CrawlerSpec]:
+    found = []
+    for ep in entry_points(group=ENTRY_POINT_GROUP):
+        try:
+            spec = ep.load()
+        except Exception as e:
+            logger.error(f"Crawler plugin {ep.name} failed to load - {e}")
+            continue
+        if not isinstance(spec, CrawlerSpec):
+            logger.error(f"Crawler plugin {ep.name} is not a CrawlerSpec")
+            continue
+        found.append(spec)
+    return found
+
+
+@lru_cache(maxsize=1)
+def specs() -> Dict[str, CrawlerSpec]:
+    """All registered banks by lowercase name, built-ins first."""
+    registered = {}
+    for spec in (*BUILTIN, *_plugins()):
+        key = spec.name.lower()
+        if key in registered:
+            logger.warning(f"Crawler {spec.name} registered twice, ignored")
+            continue
+        registered[key] = spec
+    return registered
+
+
+def get(name: str) -> CrawlerSpec:
+    """Spec by bank name (case-insensitive); KeyError if unknown."""
+    return specs()[name.lower()]
+
+
+def names() -> List[str]:
+    return [spec.name for spec in specs().values()]
+
+
+def select(
+    transport: Optional[str] = None,
+    freshness: Optional[str] = None,
+    day: Optional[str] = None,
+) -> List[CrawlerSpec]:
+    """Enabled specs matching the filters, in crawl order.
+
+    ``CRAWL_BANKS`` limits the enabled banks. With ``day`` in the past,
+    banks that can only return today's rates are left out so they are
+    not stored under the wrong date.
+    """
+    enabled = {b.lower() for b in config.CRAWL_BANKS}
+    return [
+        spec
+        for key, spec in specs().items()
+        if (not enabled or key in enabled)
+        and (transport is None or spec.transport == transport)
+        and (freshness is None or spec.freshness == freshness)
+        and spec.serves(day)
+    ]
@@ -5,13 +5,13 @@ from typing import Dict
 
 from app.config import config
 from app.crawlers.base import PlaywrightCrawler
-from app.models.exchange_rate import CurrencyDetail
+from app.models.exchange_rate import RateRecord
 
 
 class TDBM(PlaywrightCrawler):
     BANK_NAME = "TDBM"
 
-    def _crawl_page(self, page) -> Dict[str, CurrencyDetail]:
+    def _crawl_page(self, page) -> str:
         page.goto(
             config.TDBM_URI,
             timeout=self.timeout,
@@ -34,8 +34,8 @@ class TDBM(PlaywrightCrawler):
                     timeout=self.timeout,
                 )
 
-        rates = self._parse_table(page)
-        if not rates and date_inputs:
+        content = page.content()
+        if date_inputs and not self._parse(content):
             yesterday = datetime.now() - timedelta(days=1)
             date_inputs[0].fill(yesterday.strftime("%Y-%m-%d"))
             if buttons:
@@ -45,21 +45,17 @@ class TDBM(PlaywrightCrawler):
                     state="visible",
                     timeout=self.timeout,
                 )
-            rates = self._parse_table(page)
+            content = page.content()
 
-        return rates
+        return content
 
-    def _parse_table(self, page) -> Dict[str, CurrencyDetail]:
-        rates = {}
-        for row in page.locator("table.table-hover tbody tr").all():
-            cells = row.locator("td").all()
+    def _parse(self, content: str) -> Dict[str, RateRecord]:
+        rows = []
+        xpath = f"//table[{self.has_class('table-hover')}]//tbody//tr"
+        for row in self.document(content).xpath(xpath):
+            cells = [self.text(td) for td in row.xpath(".//td")]
             if len(cells) >= 8:
-                code = cells[1].inner_text().strip().lower()
+                code = cells[1].lower()
                 if code and len(code) == 3:
-                    rates[code] = self.make_rate(
-                        cash_buy=self.parse_float(cells[6].inner_text()),
-                        cash_sell=self.parse_float(cells[7].inner_text()),
-                        noncash_buy=self.parse_float(cells[4].inner_text()),
-                        noncash_sell=self.parse_float(cells[5].inner_text()),
-                    )
-        return rates
+                    rows.append((code, cells[6], cells[7], cells[4], cells[5]))
+        return self.make_rates(rows)
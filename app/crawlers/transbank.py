@@ -5,25 +5,27 @@ from typing import Dict
 
 from app.config import config
 from app.crawlers.base import PlaywrightCrawler
-from app.models.exchange_rate import CurrencyDetail
+from app.models.exchange_rate import RateRecord
 
 
 class TransBank(PlaywrightCrawler):
     BANK_NAME = "TransBank"
 
-    def _crawl_page(self, page) -> Dict[str, CurrencyDetail]:
+    def _crawl_page(self, page) -> str:
         url = f"{config.TRANSBANK_URI}?startdate={self.date}"
         page.goto(url, timeout=self.timeout, wait_until="networkidle")
         page.wait_for_selector("table", timeout=self.timeout)
+        return page.content()
 
-        script = page.locator("script#__NEXT_DATA__").first
-        if script.count():
-            data = json.loads(script.inner_text())
-            return self._parse_next_data(data)
-        return self._parse_table(page)
+    def _parse(self, content: str) -> Dict[str, RateRecord]:
+        doc = self.document(content)
+        scripts = doc.xpath("//script[@id='__NEXT_DATA__']")
+        if scripts:
+            return self._parse_next_data(json.loads(scripts[0].text))
+        return self._parse_table(doc)
 
-    def _parse_next_data(self, data: dict) -> Dict[str, CurrencyDetail]:
-        rates = {}
+    def _parse_next_data(self, data: dict) -> Dict[str, RateRecord]:
+        rows = []
         props = data.get("props", {})
         page_props = props.get("pageProps", {})
         rate_data = page_props.get("rateData", {})
@@ -33,25 +35,23 @@ class TransBank(PlaywrightCrawler):
                     continue
                 cash = v.get("2", {})
                 noncash = v.get("3", {})
-                rates[code.strip().lower()] = self.make_rate(
-                    cash_buy=self.parse_float(cash.get("BUY_RATE")),
-                    cash_sell=self.parse_float(cash.get("SELL_RATE")),
-                    noncash_buy=self.parse_float(noncash.get("BUY_RATE")),
-                    noncash_sell=self.parse_float(noncash.get("SELL_RATE")),
+                rows.append(
+                    (
+                        code.strip().lower(),
+                        cash.get("BUY_RATE"),
+                        cash.get("SELL_RATE"),
+                        noncash.get("BUY_RATE"),
+                        noncash.get("SELL_RATE"),
+                    )
                 )
-        return rates
-
-    def _parse_table(self, page) -> Dict[str, CurrencyDetail]:
-        rates = {}
-        for row in page.locator("table tbody tr").all():
-            cells = row.locator("td").all()
-            if len(cells) >= 7:
-                code = cells[0].inner_text().strip().split()[0].lower()
+        return self.make_rates(rows)
+
+    def _parse_table(self, doc) -> Dict[str, RateRecord]:
+        rows = []
+        for row in doc.xpath("//table//tbody//tr"):
+            cells = [self.text(td) for td in row.xpath(".//td")]
+            if len(cells) >= 7 and cells[0]:
+                code = cells[0].split()[0].lower()
                 if code and len(code) <= 10:
-                    rates[code] = self.make_rate(
-                        cash_buy=self.parse_float(cells[3].inner_text()),
-                        cash_sell=self.parse_float(cells[4].inner_text()),
-                        noncash_buy=self.parse_float(cells[5].inner_text()),
-                        noncash_sell=self.parse_float(cells[6].inner_text()),
-                    )
-        return rates
+                    rows.append((code, *cells[3:7]))
+        return self.make_rates(rows)
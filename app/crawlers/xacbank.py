@@ -4,13 +4,13 @@ from urllib.parse import quote
 
 from app.config import config
 from app.crawlers.base import BaseCrawler
-from app.models.exchange_rate import CurrencyDetail
+from app.models.exchange_rate import RateRecord
 
 
 class XacBank(BaseCrawler):
     BANK_NAME = "XacBank"
 
-    def crawl(self) -> Dict[str, CurrencyDetail]:
+    def crawl(self) -> Dict[str, RateRecord]:
         if self.date:
             target = datetime.strptime(self.date, "%Y-%m-%d")
         else:
@@ -20,7 +20,7 @@ class XacBank(BaseCrawler):
         if not data.get("docs"):
             data = self._fetch(target - timedelta(days=1))
 
-        return self._parse(data.get("docs", []))
+        return self.parse(data)
 
     def _fetch(self, dt: datetime) -> dict:
         base_dt = dt.replace(hour=0, minute=0, second=0)
@@ -38,15 +38,15 @@ class XacBank(BaseCrawler):
         resp.raise_for_status()
         return resp.json()
 
-    def _parse(self, docs: list) -> Dict[str, CurrencyDetail]:
-        rates = {}
-        for item in docs:
-            code = item.get("code", "").lower()
-            if code:
-                rates[code] = self.make_rate(
-                    cash_buy=self.parse_float(item.get("buyCash")),
-                    cash_sell=self.parse_float(item.get("sellCash")),
-                    noncash_buy=self.parse_float(item.get("buy")),
-                    noncash_sell=self.parse_float(item.get("sell")),
-                )
-        return rates
+    def _parse(self, data: dict) -> Dict[str, RateRecord]:
+        return self.make_rates(
+            (
+                item.get("code", "").lower(),
+                item.get("buyCash"),
+                item.get("sellCash"),
+                item.get("buy"),
+                item.get("sell"),
+            )
+            for item in data.get("docs", [])
+            if item.get("code")
+        )
@@ -0,0 +1,104 @@
+"""Async counterparts of the read functions in ``repository``.
+
+Used by the API so requests wait on the database without holding a
+threadpool thread. Writes stay in ``repository`` on the sync engine.
+"""
+
+from datetime import date
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.db import repository
+from app.models.currency import CurrencyRate, RateTick
+
+
+async def get_all_rates(
+    db: AsyncSession, skip: int = 0, limit: int = 100
+) -> List[CurrencyRate]:
+    stmt = repository.select_all_rates(skip, limit)
+    return list(await db.scalars(stmt))
+
+
+async def get_rates_by_bank(
+    db: AsyncSession, bank_name: str, skip: int = 0, limit: int = 100
+) -> List[CurrencyRate]:
+    stmt = repository.select_rates_by_bank(bank_name, skip, limit)
+    return list(await db.scalars(stmt))
+
+
+async def get_rates_by_date(
+    db: AsyncSession, target_date: date, skip: int = 0, limit: int = 100
+) -> List[CurrencyRate]:
+    stmt = repository.select_rates_by_date(target_date, skip, limit)
+    rates = list(await db.scalars(stmt))
+    if not rates and skip == 0:
+        archives = await db.scalars(repository.select_archived(target_date))
+        rates = repository.from_archive(list(archives), target_date)[:limit]
+    return rates
+
+
+async def get_rates_by_bank_and_date(
+    db: AsyncSession, bank_name: str, target_date: date
+) -> Optional[CurrencyRate]:
+    stmt = repository.select_rate_by_bank_and_date(bank_name, target_date)
+    rate = await db.scalar(stmt)
+    if rate is None:
+        stmt = repository.select_archived(target_date, bank_name)
+        archives = list(await db.scalars(stmt))
+        rate = next(iter(repository.from_archive(archives, target_date)), None)
+    return rate
+
+
+async def get_rate_as_of(
+    db: AsyncSession, bank_name: str, target_date: date
+) -> Optional[CurrencyRate]:
+    rate = await db.scalar(
+        repository.select_rate_as_of(bank_name, target_date)
+    )
+    if rate is None:
+        stmt = repository.select_archived_as_of(target_date, bank_name)
+        archives = list(await db.scalars(stmt))
+        archived = repository.from_archive_as_of(archives, target_date)
+        rate = archived.get(bank_name)
+    return rate
+
+
+async def get_rates_as_of(
+    db: AsyncSession, target_date: date
+) -> List[CurrencyRate]:
+    stmt = repository.select_rates_as_of(target_date)
+    rates = list(await db.scalars(stmt))
+    stmt = repository.select_archived_as_of(target_date)
+    archives = list(await db.scalars(stmt))
+    archived = repository.from_archive_as_of(archives, target_date)
+    return repository.merge_as_of(rates, archived)
+
+
+async def get_rates_for_pairs(
+    db: AsyncSession, pairs: List[Tuple[str, date]]
+) -> Dict[Tuple[str, date], CurrencyRate]:
+    found = {}
+    for chunk in repository.chunks(list(set(pairs))):
+        rows = await db.scalars(repository.select_rates_for_pairs(chunk))
+        found.update({(r.bank_name, r.date): r for r in rows})
+    missing = set(pairs) - found.keys()
+    if missing:
+        stmt = repository.select_archived_for_pairs(list(missing))
+        archives = list(await db.scalars(stmt))
+        found.update(repository.from_archive_pairs(archives, missing))
+    return found
+
+
+async def get_intraday_ticks(
+    db: AsyncSession, bank_name: str, target_date: date
+) -> List[RateTick]:
+    stmt = repository.select_intraday_ticks(bank_name, target_date)
+    return list(await db.scalars(stmt))
+
+
+async def get_latest_rates(db: AsyncSession) -> List[CurrencyRate]:
+    rates = list(await db.scalars(repository.select_latest_rates()))
+    if not rates:
+        rates = list(await db.scalars(repository.select_latest_rates_scan()))
+    return rates
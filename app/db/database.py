@@ -1,17 +1,220 @@
-from sqlalchemy import create_engine
+import time
+
+from sqlalchemy import (
+    create_engine,
+    event,
+    inspect,
+    make_url,
+    select,
+    text,
+)
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import QueuePool
 
 from app.config import config
-from app.models.currency import Base
+from app.db import repository
+from app.models.currency import Base, LatestRate
+from app.utils import metrics
+from app.utils.logger import logger
+
+ASYNC_DRIVERS = {
+    "sqlite": "sqlite+aiosqlite",
+    "postgresql": "postgresql+asyncpg",
+}
+
+
+def async_url(url: str):
+    """Same database as ``url``, addressed through its asyncio driver.
+
+    A URL that already names an asyncio driver is used as is; other
+    backends without a known driver raise ValueError.
+    """
+    parsed = make_url(url)
+    backend = parsed.get_backend_name()
+    if backend in ASYNC_DRIVERS:
+        parsed = parsed.set(drivername=ASYNC_DRIVERS[backend])
+    elif not parsed.get_dialect().is_async:
+        raise ValueError(
+            f"No asyncio driver for {parsed.drivername} URLs; use one of "
+            f"{', '.join(ASYNC_DRIVERS)} or name an async driver, "
+            f"e.g. {backend}+<driver>://"
+        )
+    if "sslmode" in parsed.query:
+        # asyncpg takes ``ssl`` instead of libpq's ``sslmode``
+        ssl = parsed.query["sslmode"]
+        parsed = parsed.difference_update_query(["sslmode"])
+        parsed = parsed.update_query_dict({"ssl": ssl})
+    return parsed
+
+
+def _engine_options(url: str) -> dict:
+    if url.startswith("sqlite"):
+        return {"connect_args": {"check_same_thread": False}}
+    return {
+        "pool_size": config.DB_POOL_SIZE,
+        "max_overflow": config.DB_MAX_OVERFLOW,
+        "pool_timeout": config.DB_POOL_TIMEOUT,
+        "pool_recycle": config.DB_POOL_RECYCLE,
+        "pool_pre_ping": config.DB_POOL_PRE_PING,
+    }
+
+
+def _configure_sqlite(engine, read_only: bool = False):
+    """Apply the SQLite profile to every new connection of ``engine``.
+
+    WAL lets the API read while the crawler commits; ``query_only``
+    marks the API's connections read-only.
+    """
+    if engine.dialect.name != "sqlite":
+        return
+    in_memory = engine.url.database in (None, "", ":memory:")
 
-_is_sqlite = config.DATABASE_URL.startswith("sqlite")
-_connect_args = {"check_same_thread": False} if _is_sqlite else {}
-engine = create_engine(config.DATABASE_URL, connect_args=_connect_args)
+    @event.listens_for(engine, "connect")
+    def on_connect(dbapi_conn, record):
+        cursor = dbapi_conn.cursor()
+        if not in_memory:
+            cursor.execute("PRAGMA journal_mode=WAL")
+            cursor.execute(f"PRAGMA mmap_size={config.SQLITE_MMAP_SIZE}")
+        cursor.execute("PRAGMA synchronous=NORMAL")
+        cursor.execute(f"PRAGMA busy_timeout={config.SQLITE_BUSY_TIMEOUT}")
+        cursor.execute(f"PRAGMA cache_size={config.SQLITE_CACHE_SIZE}")
+        cursor.execute("PRAGMA temp_store=MEMORY")
+        if read_only:
+            cursor.execute("PRAGMA query_only=ON")
+        cursor.close()
+
+
+def _async_engine(url: str, name: str):
+    options = _engine_options(url)
+    options.pop("connect_args", None)
+    async_engine = create_async_engine(async_url(url), **options)
+    _configure_sqlite(async_engine.sync_engine, read_only=True)
+    _watch(name, async_engine.pool)
+    return async_engine
+
+
+def _watch(name: str, pool):
+    if isinstance(pool, QueuePool):
+        metrics.watch_pool(name, pool)
+
+
+# Writes (crawler, schema setup) use the synchronous primary engine
+engine = create_engine(
+    config.DATABASE_URL, **_engine_options(config.DATABASE_URL)
+)
+_configure_sqlite(engine)
+_watch("primary", engine.pool)
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# API reads go through asyncio engines, to the replica when configured.
+# They are created on the first read, so the crawler and scripts never
+# need an asyncio driver.
+AsyncSessionLocal = None
+AsyncReadSessionLocal = None
+
+
+def _async_sessionmaker(url: str, name: str):
+    return async_sessionmaker(
+        bind=_async_engine(url, name), autoflush=False, expire_on_commit=False
+    )
+
+
+def async_sessions():
+    """The primary and replica (or None) async session factories."""
+    global AsyncSessionLocal, AsyncReadSessionLocal
+    if AsyncSessionLocal is None:
+        if config.DATABASE_READ_URL and AsyncReadSessionLocal is None:
+            AsyncReadSessionLocal = _async_sessionmaker(
+                config.DATABASE_READ_URL, "replica_async"
+            )
+        AsyncSessionLocal = _async_sessionmaker(
+            config.DATABASE_URL, "primary_async"
+        )
+    return AsyncSessionLocal, AsyncReadSessionLocal
+
+
+class ReplicaHealth:
+    """Keeps reads off the replica for ``retry`` seconds after a failure."""
+
+    def __init__(self, retry: float):
+        self.retry = retry
+        self._down_until = 0.0
+
+    @property
+    def available(self) -> bool:
+        return time.monotonic() >= self._down_until
+
+    def mark_down(self, error: Exception):
+        self._down_until = time.monotonic() + self.retry
+        metrics.DB_REPLICA_FALLBACKS.inc()
+        logger.warning(f"Read replica unavailable, using primary - {error}")
+
+
+replica_health = ReplicaHealth(config.DB_REPLICA_RETRY)
+
 
 def init_db():
     Base.metadata.create_all(bind=engine)
+    _upgrade_schema()
+    _backfill_latest()
+
+
+def _backfill_latest():
+    """Fill ``latest_rates`` for databases created before it existed."""
+    with SessionLocal() as db:
+        if db.scalar(select(LatestRate.bank_name).limit(1)) is None:
+            repository.rebuild_latest(db)
+            db.commit()
+
+
+def optimize():
+    """Let SQLite refresh its query planner statistics (on shutdown)."""
+    if (
+        engine.dialect.name != "sqlite"
+        or not config.SQLITE_OPTIMIZE_ON_SHUTDOWN
+    ):
+        return
+    with engine.connect() as conn:
+        conn.execute(text("PRAGMA optimize"))
+
+
+# Added to tables that existed before them; create_all makes new tables
+ADDED_COLUMNS = (("currency_rates", "rates_hash"),)
+ADDED_INDEXES = (("currency_rates", "ix_currency_rates_bank_date"),)
+
+
+def _upgrade_schema():
+    """Add ``ADDED_COLUMNS`` and ``ADDED_INDEXES`` where they are missing.
+
+    ``create_all`` only creates missing tables. The added columns are
+    nullable, so they can be added in place on SQLite and PostgreSQL.
+    Anything already present is left alone, so this runs on every start.
+    """
+    inspector = inspect(engine)
+    tables = Base.metadata.tables
+    with engine.begin() as conn:
+        for table, name in ADDED_COLUMNS:
+            if not inspector.has_table(table):
+                continue
+            if name in {c["name"] for c in inspector.get_columns(table)}:
+                continue
+            col_type = (
+                tables[table].c[name].type.compile(dialect=engine.dialect)
+            )
+            logger.info(f"Schema upgrade: adding column {table}.{name}")
+            conn.execute(
+                text(f"ALTER TABLE {table} ADD COLUMN {name} {col_type}")
+            )
+        for table, name in ADDED_INDEXES:
+            if not inspector.has_table(table):
+                continue
+            if name in {i["name"] for i in inspector.get_indexes(table)}:
+                continue
+            (index,) = [i for i in tables[table].indexes if i.name == name]
+            logger.info(f"Schema upgrade: creating index {name}")
+            index.create(conn, checkfirst=True)
 
 
 def get_db():
@@ -20,3 +223,21 @@ def get_db():
         yield db
     finally:
         db.close()
+
+
+async def get_async_db():
+    """Read-only session: the replica if it is configured and healthy,
+    otherwise the primary."""
+    primary, replica = async_sessions()
+    if replica is not None and replica_health.available:
+        async with replica() as db:
+            try:
+                # Checks out (and pre-pings) a replica connection up front
+                await db.connection()
+            except (DBAPIError, OSError) as e:
+                replica_health.mark_down(e)
+            else:
+                yield db
+                return
+    async with primary() as db:
+        yield db
@@ -1,15 +1,167 @@
+import json
+from collections import defaultdict
 from datetime import date, datetime, timezone
-from typing import List, Optional
+from typing import Dict, Iterator, List, Optional, Set, Tuple, Union
 
-from sqlalchemy import func
-from sqlalchemy.orm import Session
+from sqlalchemy import (
+    Select,
+    and_,
+    delete,
+    func,
+    insert,
+    or_,
+    select,
+    text,
+    tuple_,
+)
+from sqlalchemy.orm import Session, aliased
 
-from app.models.currency import CurrencyRate
-from app.models.exchange_rate import ExchangeRate
+from app.models.currency import (
+    CurrencyRate,
+    CurrencyRateArchive,
+    CurrencyRateHistory,
+    LatestRate,
+    RateTick,
+)
+from app.models.exchange_rate import (
+    BankRates,
+    ExchangeRate,
+    plain_rates,
+    rates_hash,
+)
+from app.utils.archive import compress, decompress
 
+# Pairs per IN (...) clause, to stay well below bound-parameter limits
+IN_CHUNK = 500
 
-def save_rates(db: Session, data: ExchangeRate) -> CurrencyRate:
-    """Save or update exchange rates (upsert)."""
+
+def _upsert(
+    db: Session,
+    existing: Optional[CurrencyRate],
+    bank_name: str,
+    rate_date: date,
+    rates: dict,
+    now: datetime,
+    ticks: bool = False,
+) -> Tuple[CurrencyRate, bool]:
+    """Insert or update one row; unchanged content is left untouched.
+
+    With ``ticks``, every currency that differs from the stored row is
+    also appended to ``rate_ticks``. Returns the row and whether anything
+    was written.
+    """
+    digest = rates_hash(rates)
+    if ticks:
+        old = (existing.rates or {}) if existing else {}
+        for code, detail in rates.items():
+            if old.get(code) != detail:
+                db.add(
+                    RateTick(
+                        bank_name=bank_name,
+                        date=rate_date,
+                        currency=code,
+                        rates=detail,
+                        timestamp=now,
+                    )
+                )
+
+    if existing is None:
+        row = CurrencyRate(
+            bank_name=bank_name,
+            date=rate_date,
+            rates=rates,
+            rates_hash=digest,
+            timestamp=now,
+        )
+        db.add(row)
+        return row, True
+
+    old_hash = existing.rates_hash or rates_hash(existing.rates or {})
+    if old_hash == digest:
+        return existing, False
+
+    db.add(
+        CurrencyRateHistory(
+            bank_name=existing.bank_name,
+            date=existing.date,
+            rates=existing.rates,
+            rates_hash=old_hash,
+            timestamp=existing.timestamp,
+            replaced_at=now,
+        )
+    )
+    existing.rates = rates
+    existing.rates_hash = digest
+    existing.timestamp = now
+    return existing, True
+
+
+def _advance_latest(db: Session, rows: List[CurrencyRate]):
+    """Point ``latest_rates`` at ``rows`` that are at least as recent as
+    each bank's current row. Call after a flush, so new rows have ids."""
+    banks = {row.bank_name for row in rows}
+    pointers = {
+        p.bank_name: p
+        for p in db.scalars(
+            select(LatestRate)
+            .where(LatestRate.bank_name.in_(banks))
+            .with_for_update()
+        )
+    }
+    for row in rows:
+        pointer = pointers.get(row.bank_name)
+        if pointer is None:
+            pointer = pointers[row.bank_name] = LatestRate(
+                bank_name=row.bank_name
+            )
+            db.add(pointer)
+        elif pointer.date > row.date:
+            continue
+        pointer.rate_id = row.id
+        pointer.date = row.date
+        pointer.rates_hash = row.rates_hash
+        pointer.timestamp = row.timestamp
+
+
+def rebuild_latest(db: Session):
+    """Recompute every ``latest_rates`` pointer from ``currency_rates``."""
+    ranked = select(
+        CurrencyRate.bank_name,
+        CurrencyRate.id.label("rate_id"),
+        CurrencyRate.date,
+        CurrencyRate.rates_hash,
+        CurrencyRate.timestamp,
+        func.row_number()
+        .over(
+            partition_by=CurrencyRate.bank_name,
+            order_by=(
+                CurrencyRate.date.desc(),
+                CurrencyRate.timestamp.desc(),
+                CurrencyRate.id.desc(),
+            ),
+        )
+        .label("rank"),
+    ).subquery()
+    columns = ["bank_name", "rate_id", "date", "rates_hash", "timestamp"]
+    db.execute(delete(LatestRate))
+    db.execute(
+        insert(LatestRate).from_select(
+            columns,
+            select(*(ranked.c[name] for name in columns)).where(
+                ranked.c.rank == 1
+            ),
+        )
+    )
+
+
+def save_rates(
+    db: Session, data: Union[BankRates, ExchangeRate]
+) -> CurrencyRate:
+    """Save or update exchange rates (upsert).
+
+    Rows whose content hash matches the crawl are not rewritten; replaced
+    intraday values go to ``currency_rate_history``.
+    """
     rate_date = date.fromisoformat(data.date)
     existing = (
         db.query(CurrencyRate)
@@ -20,89 +172,396 @@ def save_rates(db: Session, data: ExchangeRate) -> CurrencyRate:
         .first()
     )
 
-    if existing:
-        existing.rates = data.model_dump()["rates"]
-        existing.timestamp = datetime.now(timezone.utc)
-    else:
-        existing = CurrencyRate(
-            bank_name=data.bank,
-            date=rate_date,
-            rates=data.model_dump()["rates"],
+    row, changed = _upsert(
+        db,
+        existing,
+        data.bank,
+        rate_date,
+        plain_rates(data.rates),
+        datetime.now(timezone.utc),
+        ticks=True,
+    )
+    if changed:
+        db.flush()
+        _advance_latest(db, [row])
+        if db.bind.dialect.name == "postgresql":
+            # Delivered on commit; wakes the API's rate stream listeners
+            db.execute(text("NOTIFY rate_ticks"))
+        db.commit()
+        db.refresh(row)
+    return row
+
+
+def save_rates_bulk(
+    db: Session, items: List[Union[BankRates, ExchangeRate]]
+) -> int:
+    """Upsert many (bank, date) results in a single transaction.
+
+    Returns the number of rows actually written.
+    """
+    by_key = {(i.bank, date.fromisoformat(i.date)): i for i in items}
+    existing = {}
+    for chunk in chunks(list(by_key)):
+        rows = db.scalars(select_rates_for_pairs(chunk))
+        existing.update({(r.bank_name, r.date): r for r in rows})
+
+    now = datetime.now(timezone.utc)
+    written = []
+    for key, data in by_key.items():
+        row, changed = _upsert(
+            db, existing.get(key), *key, plain_rates(data.rates), now
         )
-        db.add(existing)
+        if changed:
+            written.append(row)
 
+    if written:
+        db.flush()
+        _advance_latest(db, written)
     db.commit()
-    db.refresh(existing)
-    return existing
+    return len(written)
 
 
-def get_all_rates(
-    db: Session, skip: int = 0, limit: int = 100
-) -> List[CurrencyRate]:
+# Read queries are built once and shared with the API's async path in
+# ``async_repository``. Lookups by date fall back to the cold-year archive
+# (see ``app.services.retention``); listings only cover hot rows.
+
+
+def select_all_rates(skip: int = 0, limit: int = 100) -> Select:
     return (
-        db.query(CurrencyRate)
+        select(CurrencyRate)
         .order_by(CurrencyRate.timestamp.desc())
         .offset(skip)
         .limit(limit)
-        .all()
     )
 
 
-def get_rates_by_bank(
-    db: Session, bank_name: str, skip: int = 0, limit: int = 100
-) -> List[CurrencyRate]:
+def select_rates_by_bank(
+    bank_name: str, skip: int = 0, limit: int = 100
+) -> Select:
     return (
-        db.query(CurrencyRate)
-        .filter(CurrencyRate.bank_name == bank_name)
+        select(CurrencyRate)
+        .where(CurrencyRate.bank_name == bank_name)
         .order_by(CurrencyRate.timestamp.desc())
         .offset(skip)
         .limit(limit)
-        .all()
     )
 
 
-def get_rates_by_date(
-    db: Session, target_date: date, skip: int = 0, limit: int = 100
-) -> List[CurrencyRate]:
+def select_rates_by_date(
+    target_date: date, skip: int = 0, limit: int = 100
+) -> Select:
     return (
-        db.query(CurrencyRate)
-        .filter(CurrencyRate.date == target_date)
+        select(CurrencyRate)
+        .where(CurrencyRate.date == target_date)
         .order_by(CurrencyRate.timestamp.desc())
         .offset(skip)
         .limit(limit)
-        .all()
     )
 
 
-def get_rates_by_bank_and_date(
-    db: Session, bank_name: str, target_date: date
-) -> Optional[CurrencyRate]:
+def select_rate_by_bank_and_date(bank_name: str, target_date: date) -> Select:
     return (
-        db.query(CurrencyRate)
-        .filter(
+        select(CurrencyRate)
+        .where(
             CurrencyRate.bank_name == bank_name,
             CurrencyRate.date == target_date,
         )
-        .first()
+        .limit(1)
     )
 
 
-def get_latest_rates(db: Session) -> List[CurrencyRate]:
+def select_intraday_ticks(bank_name: str, target_date: date) -> Select:
+    return (
+        select(RateTick)
+        .where(RateTick.bank_name == bank_name, RateTick.date == target_date)
+        .order_by(RateTick.timestamp, RateTick.id)
+    )
+
+
+def select_latest_rates() -> Select:
+    return (
+        select(CurrencyRate)
+        .join(LatestRate, LatestRate.rate_id == CurrencyRate.id)
+        .order_by(CurrencyRate.bank_name)
+    )
+
+
+def select_latest_rates_scan() -> Select:
+    """Aggregate fallback for rows written outside the save path."""
     subq = (
-        db.query(
+        select(
             CurrencyRate.bank_name,
             func.max(CurrencyRate.timestamp).label("max_ts"),
         )
         .group_by(CurrencyRate.bank_name)
         .subquery()
     )
+    return select(CurrencyRate).join(
+        subq,
+        (CurrencyRate.bank_name == subq.c.bank_name)
+        & (CurrencyRate.timestamp == subq.c.max_ts),
+    )
+
+
+def select_archived(
+    target_date: date, bank_name: Optional[str] = None
+) -> Select:
+    stmt = select(CurrencyRateArchive).where(
+        CurrencyRateArchive.year == target_date.year
+    )
+    if bank_name is not None:
+        stmt = stmt.where(CurrencyRateArchive.bank_name == bank_name)
+    return stmt.order_by(CurrencyRateArchive.bank_name)
+
+
+def pack_archive(rows: List[Dict]) -> bytes:
+    return compress(json.dumps(rows, separators=(",", ":")).encode())
+
+
+def unpack_archive(payload: bytes) -> List[Dict]:
+    return json.loads(decompress(payload))
+
+
+def _archived_rate(archive: CurrencyRateArchive, row: Dict) -> CurrencyRate:
+    stamp = row["timestamp"]
+    return CurrencyRate(
+        id=row["id"],
+        bank_name=archive.bank_name,
+        date=date.fromisoformat(row["date"]),
+        rates=row["rates"],
+        rates_hash=row["rates_hash"],
+        timestamp=datetime.fromisoformat(stamp) if stamp else None,
+    )
+
+
+def from_archive(
+    archives: List[CurrencyRateArchive], target_date: date
+) -> List[CurrencyRate]:
+    """Rebuild ``target_date``'s rows from cold storage (not persisted)."""
+    day = target_date.isoformat()
+    found = []
+    for archive in archives:
+        for row in unpack_archive(archive.payload):
+            if row["date"] == day:
+                found.append(_archived_rate(archive, row))
+                break
+    return found
+
 
+def from_archive_pairs(
+    archives: List[CurrencyRateArchive], pairs: Set[Tuple[str, date]]
+) -> Dict[Tuple[str, date], CurrencyRate]:
+    """Rebuild the archived rows for many (bank, date) pairs."""
+    found = {}
+    for archive in archives:
+        for row in unpack_archive(archive.payload):
+            key = (archive.bank_name, date.fromisoformat(row["date"]))
+            if key in pairs:
+                found[key] = _archived_rate(archive, row)
+    return found
+
+
+def select_rates_for_pairs(pairs: List[Tuple[str, date]]) -> Select:
+    # One "bank = ? AND date IN (...)" term per bank, so both SQLite and
+    # PostgreSQL probe the (bank_name, date) index; SQLite scans the table
+    # for a row-value IN.
+    by_bank = defaultdict(set)
+    for bank_name, day in pairs:
+        by_bank[bank_name].add(day)
+    return select(CurrencyRate).where(
+        or_(
+            *(
+                and_(
+                    CurrencyRate.bank_name == bank_name,
+                    CurrencyRate.date.in_(sorted(days)),
+                )
+                for bank_name, days in by_bank.items()
+            )
+        )
+    )
+
+
+def select_archived_for_pairs(pairs: List[Tuple[str, date]]) -> Select:
+    years = {(bank_name, day.year) for bank_name, day in pairs}
+    return select(CurrencyRateArchive).where(
+        tuple_(CurrencyRateArchive.bank_name, CurrencyRateArchive.year).in_(
+            years
+        )
+    )
+
+
+def select_rate_as_of(bank_name: str, target_date: date) -> Select:
+    """Nearest row on or before ``target_date`` (weekends, holidays)."""
     return (
-        db.query(CurrencyRate)
-        .join(
-            subq,
-            (CurrencyRate.bank_name == subq.c.bank_name)
-            & (CurrencyRate.timestamp == subq.c.max_ts),
+        select(CurrencyRate)
+        .where(
+            CurrencyRate.bank_name == bank_name,
+            CurrencyRate.date <= target_date,
         )
-        .all()
+        .order_by(
+            CurrencyRate.date.desc(),
+            CurrencyRate.timestamp.desc(),
+            CurrencyRate.id.desc(),
+        )
+        .limit(1)
+    )
+
+
+def _bank_names():
+    """Every bank in ``currency_rates``, as a recursive CTE.
+
+    A skip scan: each step seeks the next bank name on the (bank_name,
+    date) index, so the cost grows with the number of banks rather than
+    rows. Unlike ``latest_rates`` it includes rows that were never
+    written through :func:`save_rates`. The last row is NULL.
+    """
+    banks = select(func.min(CurrencyRate.bank_name).label("bank_name")).cte(
+        "banks", recursive=True
+    )
+    following = aliased(CurrencyRate)
+    after = (
+        select(func.min(following.bank_name))
+        .where(following.bank_name > banks.c.bank_name)
+        .scalar_subquery()
+    )
+    return banks.union_all(select(after).where(banks.c.bank_name.is_not(None)))
+
+
+def select_rates_as_of(target_date: date) -> Select:
+    """Each bank's nearest row on or before ``target_date``.
+
+    The correlated LIMIT 1 per bank is an index probe on (bank_name,
+    date), i.e. a lateral join.
+    """
+    banks = _bank_names()
+    inner = aliased(CurrencyRate)
+    nearest = (
+        select(inner.id)
+        .where(inner.bank_name == banks.c.bank_name, inner.date <= target_date)
+        .order_by(inner.date.desc(), inner.timestamp.desc(), inner.id.desc())
+        .limit(1)
+        .scalar_subquery()
+    )
+    return (
+        select(CurrencyRate)
+        .select_from(banks)
+        .join(CurrencyRate, CurrencyRate.id == nearest)
+        .order_by(CurrencyRate.bank_name)
+    )
+
+
+def select_archived_as_of(
+    target_date: date, bank_name: Optional[str] = None
+) -> Select:
+    # A gap longer than a year is not looked for
+    stmt = select(CurrencyRateArchive).where(
+        CurrencyRateArchive.year.in_([target_date.year, target_date.year - 1])
+    )
+    if bank_name is not None:
+        stmt = stmt.where(CurrencyRateArchive.bank_name == bank_name)
+    return stmt
+
+
+def from_archive_as_of(
+    archives: List[CurrencyRateArchive], target_date: date
+) -> Dict[str, CurrencyRate]:
+    """Each archived bank's nearest row on or before ``target_date``."""
+    day = target_date.isoformat()
+    best = {}
+    for archive in archives:
+        for row in unpack_archive(archive.payload):
+            current = best.get(archive.bank_name)
+            if row["date"] <= day and (
+                current is None or row["date"] > current[1]["date"]
+            ):
+                best[archive.bank_name] = (archive, row)
+    return {bank: _archived_rate(*entry) for bank, entry in best.items()}
+
+
+def merge_as_of(
+    rates: List[CurrencyRate], archived: Dict[str, CurrencyRate]
+) -> List[CurrencyRate]:
+    """Add archived rows for banks without a hot row, sorted by bank."""
+    found = {rate.bank_name for rate in rates}
+    rates += [r for bank, r in archived.items() if bank not in found]
+    return sorted(rates, key=lambda rate: rate.bank_name)
+
+
+def chunks(items: List, size: int = IN_CHUNK) -> Iterator[List]:
+    for offset in range(0, len(items), size):
+        yield items[offset : offset + size]
+
+
+def get_all_rates(
+    db: Session, skip: int = 0, limit: int = 100
+) -> List[CurrencyRate]:
+    return list(db.scalars(select_all_rates(skip, limit)))
+
+
+def get_rates_by_bank(
+    db: Session, bank_name: str, skip: int = 0, limit: int = 100
+) -> List[CurrencyRate]:
+    return list(db.scalars(select_rates_by_bank(bank_name, skip, limit)))
+
+
+def get_rates_by_date(
+    db: Session, target_date: date, skip: int = 0, limit: int = 100
+) -> List[CurrencyRate]:
+    rates = list(db.scalars(select_rates_by_date(target_date, skip, limit)))
+    if not rates and skip == 0:
+        archives = db.scalars(select_archived(target_date))
+        rates = from_archive(list(archives), target_date)[:limit]
+    return rates
+
+
+def get_rates_by_bank_and_date(
+    db: Session, bank_name: str, target_date: date
+) -> Optional[CurrencyRate]:
+    rate = db.scalar(select_rate_by_bank_and_date(bank_name, target_date))
+    if rate is None:
+        archives = db.scalars(select_archived(target_date, bank_name))
+        rate = next(iter(from_archive(list(archives), target_date)), None)
+    return rate
+
+
+def get_rate_as_of(
+    db: Session, bank_name: str, target_date: date
+) -> Optional[CurrencyRate]:
+    rate = db.scalar(select_rate_as_of(bank_name, target_date))
+    if rate is None:
+        archives = db.scalars(select_archived_as_of(target_date, bank_name))
+        rate = from_archive_as_of(list(archives), target_date).get(bank_name)
+    return rate
+
+
+def get_rates_as_of(db: Session, target_date: date) -> List[CurrencyRate]:
+    rates = list(db.scalars(select_rates_as_of(target_date)))
+    archives = db.scalars(select_archived_as_of(target_date))
+    return merge_as_of(rates, from_archive_as_of(list(archives), target_date))
+
+
+def get_rates_for_pairs(
+    db: Session, pairs: List[Tuple[str, date]]
+) -> Dict[Tuple[str, date], CurrencyRate]:
+    """Rows for many (bank, date) pairs, keyed by pair; misses are absent."""
+    found = {}
+    for chunk in chunks(list(set(pairs))):
+        rows = db.scalars(select_rates_for_pairs(chunk))
+        found.update({(r.bank_name, r.date): r for r in rows})
+    missing = set(pairs) - found.keys()
+    if missing:
+        archives = db.scalars(select_archived_for_pairs(list(missing)))
+        found.update(from_archive_pairs(list(archives), missing))
+    return found
+
+
+def get_intraday_ticks(
+    db: Session, bank_name: str, target_date: date
+) -> List[RateTick]:
+    return list(db.scalars(select_intraday_ticks(bank_name, target_date)))
+
+
+def get_latest_rates(db: Session) -> List[CurrencyRate]:
+    return list(db.scalars(select_latest_rates())) or list(
+        db.scalars(select_latest_rates_scan())
     )
@@ -1,6 +1,17 @@
 from datetime import datetime, timezone
 
-from sqlalchemy import JSON, Column, Date, DateTime, Integer, String
+from sqlalchemy import (
+    JSON,
+    Boolean,
+    Column,
+    Date,
+    DateTime,
+    Index,
+    Integer,
+    LargeBinary,
+    String,
+    UniqueConstraint,
+)
 from sqlalchemy.orm import declarative_base
 
 Base = declarative_base()
@@ -12,9 +23,133 @@ def utc_now():
 
 class CurrencyRate(Base):
     __tablename__ = "currency_rates"
+    __table_args__ = (
+        Index("ix_currency_rates_bank_date", "bank_name", "date"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     bank_name = Column(String, index=True)
     date = Column(Date, index=True)
     rates = Column(JSON)
+    rates_hash = Column(String(64))
     timestamp = Column(DateTime, default=utc_now)
+
+
+class LatestRate(Base):
+    """Pointer to each bank's current ``currency_rates`` row, maintained by
+    the save path so ``/rates/latest`` is a primary-key read."""
+
+    __tablename__ = "latest_rates"
+
+    bank_name = Column(String, primary_key=True)
+    rate_id = Column(Integer, nullable=False)
+    date = Column(Date, nullable=False)
+    rates_hash = Column(String(64))
+    timestamp = Column(DateTime)
+
+
+class CurrencyRateHistory(Base):
+    """Intraday snapshots superseded by a later crawl of the same day."""
+
+    __tablename__ = "currency_rate_history"
+
+    id = Column(Integer, primary_key=True, index=True)
+    bank_name = Column(String, index=True)
+    date = Column(Date, index=True)
+    rates = Column(JSON)
+    rates_hash = Column(String(64))
+    timestamp = Column(DateTime)
+    replaced_at = Column(DateTime, default=utc_now)
+
+
+class CurrencyRateArchive(Base):
+    """Cold years of ``currency_rates``: one row per bank and year holding
+    the zstd-compressed JSON list of that year's daily rows."""
+
+    __tablename__ = "currency_rate_archive"
+    __table_args__ = (UniqueConstraint("bank_name", "year"),)
+
+    id = Column(Integer, primary_key=True)
+    bank_name = Column(String, nullable=False)
+    year = Column(Integer, nullable=False)
+    rows = Column(Integer, nullable=False)
+    payload = Column(LargeBinary, nullable=False)
+    archived_at = Column(DateTime, default=utc_now)
+
+
+class RateTick(Base):
+    """Append-only per-currency rate changes, for intraday movements."""
+
+    __tablename__ = "rate_ticks"
+    __table_args__ = (
+        Index("ix_rate_ticks_bank_date_ts", "bank_name", "date", "timestamp"),
+    )
+
+    id = Column(Integer, primary_key=True)
+    bank_name = Column(String, nullable=False)
+    date = Column(Date, nullable=False)
+    currency = Column(String, nullable=False)
+    rates = Column(JSON)
+    timestamp = Column(DateTime, default=utc_now, nullable=False)
+
+
+class CrawlLease(Base):
+    """Claim by one worker on crawling a bank for a date in a time slot.
+
+    ``slot`` is the slot's start in epoch seconds. A lease that expires
+    before it is ``done`` can be taken over by another worker.
+    """
+
+    __tablename__ = "crawl_leases"
+
+    bank_name = Column(String, primary_key=True)
+    date = Column(Date, primary_key=True)
+    slot = Column(Integer, primary_key=True)
+    owner = Column(String, nullable=False)
+    expires_at = Column(DateTime, nullable=False)
+    done = Column(Boolean, default=False, nullable=False)
+
+
+class CrawlJob(Base):
+    """One attempt at crawling a bank for a date (the ``crawl_jobs`` queue).
+
+    ``status`` moves queued -> running -> done/failed; a failed attempt
+    may be followed by a new row with ``attempt + 1`` and a later
+    ``run_after``.
+    """
+
+    __tablename__ = "crawl_jobs"
+    __table_args__ = (
+        Index("ix_crawl_jobs_status_run_after", "status", "run_after"),
+        Index("ix_crawl_jobs_bank_date", "bank_name", "date"),
+    )
+
+    id = Column(Integer, primary_key=True)
+    bank_name = Column(String, nullable=False)
+    date = Column(Date, nullable=False)
+    attempt = Column(Integer, default=1, nullable=False)
+    status = Column(String(16), default="queued", nullable=False)
+    worker = Column(String)
+    enqueued_at = Column(DateTime, default=utc_now, nullable=False)
+    run_after = Column(DateTime, default=utc_now, nullable=False)
+    started_at = Column(DateTime)
+    finished_at = Column(DateTime)
+    currencies = Column(Integer)
+    error = Column(String)
+
+
+class QuarantinedRate(Base):
+    """Crawled currencies held back by validation, with the reasons."""
+
+    __tablename__ = "rate_quarantine"
+    __table_args__ = (
+        Index("ix_rate_quarantine_bank_date", "bank_name", "date"),
+    )
+
+    id = Column(Integer, primary_key=True)
+    bank_name = Column(String, nullable=False)
+    date = Column(Date, nullable=False)
+    # {currency: rates} and {currency: [reason, ...]}
+    rates = Column(JSON, nullable=False)
+    reasons = Column(JSON, nullable=False)
+    timestamp = Column(DateTime, default=utc_now, nullable=False)
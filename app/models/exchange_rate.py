@@ -1,9 +1,89 @@
 import datetime
-from typing import Dict, Optional
+import hashlib
+import json
+from typing import Dict, List, Literal, NamedTuple, Optional
 
 from pydantic import BaseModel, Field
 
 
+def rates_hash(rates: dict) -> str:
+    """Canonical sha256 of a rates dict, independent of key order."""
+    canonical = json.dumps(rates, sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+class RatePair(NamedTuple):
+    buy: Optional[float] = None
+    sell: Optional[float] = None
+
+
+class RateRecord:
+    """One currency's rates as crawlers produce them.
+
+    A slotted stand-in for :class:`CurrencyDetail` that is neither
+    validated nor copied on the way from parser to database;
+    ``rates["usd"].cash.buy`` reads the same. Pydantic models are only
+    built at the API boundary.
+    """
+
+    __slots__ = ("cash", "noncash")
+
+    def __init__(
+        self, cash: RatePair = RatePair(), noncash: RatePair = RatePair()
+    ):
+        self.cash = cash
+        self.noncash = noncash
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "RateRecord":
+        return cls(
+            RatePair(**(data.get("cash") or {})),
+            RatePair(**(data.get("noncash") or {})),
+        )
+
+    def to_dict(self) -> dict:
+        """Same shape as ``CurrencyDetail.model_dump()``."""
+        return {
+            "cash": {"buy": self.cash.buy, "sell": self.cash.sell},
+            "noncash": {"buy": self.noncash.buy, "sell": self.noncash.sell},
+        }
+
+    def __eq__(self, other) -> bool:
+        if not isinstance(other, RateRecord):
+            return NotImplemented
+        return self.cash == other.cash and self.noncash == other.noncash
+
+    def __repr__(self) -> str:
+        return f"RateRecord(cash={self.cash}, noncash={self.noncash})"
+
+
+def plain_rates(rates: dict) -> Dict[str, dict]:
+    """Rates keyed by currency as JSON-ready dicts.
+
+    Accepts records, ``CurrencyDetail`` models or dicts already plain.
+    """
+    plain = {}
+    for code, detail in rates.items():
+        if isinstance(detail, RateRecord):
+            plain[code] = detail.to_dict()
+        elif isinstance(detail, BaseModel):
+            plain[code] = detail.model_dump()
+        else:
+            plain[code] = detail
+    return plain
+
+
+class BankRates:
+    """One bank's rates for a date, as crawls and re-parses save them."""
+
+    __slots__ = ("date", "bank", "rates")
+
+    def __init__(self, date: str, bank: str, rates: dict):
+        self.date = date
+        self.bank = bank
+        self.rates = rates
+
+
 class Rate(BaseModel):
     buy: Optional[float] = Field(
         default=None,
@@ -82,3 +162,95 @@ class CurrencyRateResponse(BaseModel):
     )
 
     model_config = {"from_attributes": True}
+
+
+class RateTickResponse(BaseModel):
+    currency: str = Field(
+        description="Валютын код",
+        examples=["usd"],
+    )
+    rates: CurrencyDetail = Field(
+        description="Өөрчлөгдсөн ханш",
+        examples=[
+            {
+                "cash": {"buy": 3430.5, "sell": 3450.0},
+                "noncash": {"buy": 3435.0, "sell": 3445.0},
+            }
+        ],
+    )
+    timestamp: datetime.datetime = Field(
+        description="Өөрчлөлт бүртгэгдсэн хугацаа",
+        examples=["2024-01-15T10:30:00Z"],
+    )
+
+    model_config = {"from_attributes": True}
+
+
+class ConversionResponse(BaseModel):
+    bank: str = Field(description="Банкны нэр", examples=["KhanBank"])
+    date: datetime.date = Field(
+        description="Ханшийн огноо", examples=["2024-01-15"]
+    )
+    kind: Literal["cash", "noncash"] = Field(
+        description="Бэлэн/бэлэн бус ханш", examples=["cash"]
+    )
+    from_currency: str = Field(
+        alias="from", description="Зарах валют", examples=["eur"]
+    )
+    to_currency: str = Field(
+        alias="to", description="Авах валют", examples=["cny"]
+    )
+    amount: float = Field(description="Дүн", examples=[100.0])
+    rate: float = Field(
+        description="1 нэгж `from`-оор авах `to`-ийн хэмжээ",
+        examples=[7.62],
+    )
+    result: float = Field(description="Хөрвүүлсэн дүн", examples=[762.0])
+
+    model_config = {"populate_by_name": True}
+
+
+class RateMatrixResponse(BaseModel):
+    bank: str = Field(description="Банкны нэр", examples=["KhanBank"])
+    date: datetime.date = Field(
+        description="Ханшийн огноо", examples=["2024-01-15"]
+    )
+    kind: Literal["cash", "noncash"] = Field(
+        description="Бэлэн/бэлэн бус ханш", examples=["cash"]
+    )
+    currencies: List[str] = Field(
+        description="Мөр, баганын валютууд (MNT эхэнд)",
+        examples=[["mnt", "eur", "usd"]],
+    )
+    matrix: List[List[Optional[float]]] = Field(
+        description="matrix[i][j]: 1 нэгж i-г зарж авах j-ийн хэмжээ",
+        examples=[[[1.0, 0.00026, 0.00028], [3720.0, 1.0, 1.08]]],
+    )
+
+
+class BatchRateQuery(BaseModel):
+    bank: str = Field(description="Банкны нэр", examples=["KhanBank"])
+    date: datetime.date = Field(
+        description="Огноо (YYYY-MM-DD)", examples=["2024-01-15"]
+    )
+    currency: Optional[str] = Field(
+        default=None, description="Зөвхөн энэ валют", examples=["usd"]
+    )
+
+
+class BatchRateResult(BaseModel):
+    bank: str = Field(description="Банкны нэр", examples=["KhanBank"])
+    date: datetime.date = Field(
+        description="Асуусан огноо", examples=["2024-01-15"]
+    )
+    currency: Optional[str] = Field(
+        default=None, description="Асуусан валют", examples=["usd"]
+    )
+    found: bool = Field(description="Ханш олдсон эсэх", examples=[True])
+    id: Optional[int] = Field(default=None, description="Ханшийн Id")
+    rates: Optional[Dict[str, CurrencyDetail]] = Field(
+        default=None, description="Валютын кодоор ангилагдсан ханш"
+    )
+    timestamp: Optional[datetime.datetime] = Field(
+        default=None, description="Бүртгэгдсэн хугацаа"
+    )
@@ -0,0 +1,152 @@
+"""Run Playwright crawlers in worker processes, one browser each.
+
+With ``PLAYWRIGHT_PROCESSES`` above zero the browser banks are crawled
+in a process pool instead of scraper threads. Each worker launches
+Chromium once and opens a fresh context per crawl, so the launch is
+paid per process rather than per bank, and page handling, parsing and
+model building run outside the scraper's GIL. Rates come back as plain
+dicts.
+
+A worker relaunches its browser once the worker and its Chromium
+processes hold more than ``PLAYWRIGHT_PROCESS_MAX_MB`` resident, and is
+replaced after ``PLAYWRIGHT_PROCESS_MAX_TASKS`` crawls, so browser leaks
+stay bounded. A worker that crashes fails only the crawls it had; the
+pool is rebuilt for the next ones.
+
+Crawl phase metrics and the per-host limits of a worker stay in that
+process; the scraper still records each bank's duration and outcome.
+"""
+
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from multiprocessing.util import Finalize
+from typing import Dict, Optional
+
+from app.config import config
+from app.models.exchange_rate import RateRecord, plain_rates
+from app.utils import playwright_setup
+from app.utils.logger import logger
+
+_executor: Optional[ProcessPoolExecutor] = None
+_lock = threading.Lock()
+
+# Worker process state
+_playwright = None
+_browser = None
+
+
+def rss_mb(pid: Optional[int] = None) -> float:
+    """Resident memory of ``pid`` and its descendants, in MiB.
+
+    Chromium runs as children of the Playwright driver, so the whole
+    process tree counts; shared pages are counted in every process, so
+    this overstates a little. Reads ``/proc`` and returns 0 without it.
+    """
+    try:
+        entries = [e for e in os.listdir("/proc") if e.isdigit()]
+    except OSError:
+        return 0.0
+    stats = {}
+    for entry in entries:
+        try:
+            with open(f"/proc/{entry}/stat") as f:
+                # The command name may contain spaces; fields follow ")"
+                fields = f.read().rsplit(")", 1)[1].split()
+        except (OSError, IndexError):
+            continue
+        stats[int(entry)] = (int(fields[1]), int(fields[21]))
+
+    children: Dict[int, list] = {}
+    for child, (parent, _) in stats.items():
+        children.setdefault(parent, []).append(child)
+    pages = 0
+    pending = [pid or os.getpid()]
+    while pending:
+        current = pending.pop()
+        pages += stats.get(current, (0, 0))[1]
+        pending.extend(children.get(current, ()))
+    return pages * os.sysconf("SC_PAGE_SIZE") / 2**20
+
+
+def _stop():
+    global _playwright, _browser
+    try:
+        if _browser is not None:
+            _browser.close()
+        if _playwright is not None:
+            _playwright.stop()
+    except Exception as e:
+        logger.warning(f"Browser worker {os.getpid()}: stop failed - {e}")
+    _playwright = _browser = None
+
+
+def _launch():
+    global _playwright, _browser
+    from playwright.sync_api import sync_playwright
+
+    if _playwright is None:
+        _playwright = sync_playwright().start()
+        # Worker processes skip atexit; multiprocessing runs finalizers
+        Finalize(None, _stop, exitpriority=10)
+    _browser = playwright_setup.launch(_playwright.chromium)
+
+
+def _crawl(bank_name: str, day: str) -> Dict[str, dict]:
+    """Worker side: crawl one bank with the process's browser."""
+    global _browser
+    from app.crawlers import registry
+
+    if _browser is None or not _browser.is_connected():
+        _launch()
+    try:
+        crawler = registry.get(bank_name).load()(day)
+        rates = crawler.crawl(browser=_browser)
+    finally:
+        used = rss_mb()
+        if used > config.PLAYWRIGHT_PROCESS_MAX_MB:
+            logger.info(
+                f"Browser worker {os.getpid()}: {used:.0f} MiB, relaunching"
+            )
+            _browser.close()
+            _browser = None
+    return plain_rates(rates or {})
+
+
+def executor() -> ProcessPoolExecutor:
+    """The shared pool, started on first use."""
+    global _executor
+    with _lock:
+        if _executor is None:
+            _executor = ProcessPoolExecutor(
+                max_workers=config.PLAYWRIGHT_PROCESSES,
+                # Playwright's driver and threads do not survive fork
+                mp_context=multiprocessing.get_context("spawn"),
+                max_tasks_per_child=config.PLAYWRIGHT_PROCESS_MAX_TASKS
+                or None,
+            )
+        return _executor
+
+
+def _discard(pool: ProcessPoolExecutor):
+    global _executor
+    with _lock:
+        if _executor is pool:
+            _executor = None
+    pool.shutdown(wait=False, cancel_futures=True)
+
+
+def crawl(bank_name: str, day: str) -> Dict[str, RateRecord]:
+    """Crawl ``bank_name`` in a worker process and wait for the rates."""
+    pool = executor()
+    try:
+        data = pool.submit(_crawl, bank_name, day).result()
+    except BrokenProcessPool:
+        logger.error(f"{bank_name}: browser worker died, restarting pool")
+        _discard(pool)
+        raise
+    return {
+        code: RateRecord.from_dict(detail) for code, detail in data.items()
+    }
@@ -0,0 +1,116 @@
+"""Cross-rate matrices for currency conversion through MNT.
+
+A bank's matrix is built once per distinct set of rates (keyed by the
+``rates_hash`` of its ``latest_rates`` pointer) and cached per process,
+so a conversion is an array lookup. Converting ``from`` to ``to`` sells
+``from`` to the bank at its buy rate and buys ``to`` at its sell rate::
+
+    matrix[from, to] = buy[from] / sell[to]
+
+MNT is included with a rate of 1; missing rates give NaN.
+"""
+
+import threading
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.currency import CurrencyRate, LatestRate
+
+KINDS = ("cash", "noncash")
+BASE = "mnt"
+
+
+@dataclass(frozen=True)
+class RateMatrix:
+    bank: str
+    date: str
+    rates_hash: str
+    currencies: Tuple[str, ...]
+    index: Dict[str, int]
+    # kind -> (n, n) float64 array
+    matrices: Dict
+
+    def rate(self, kind: str, source: str, target: str) -> Optional[float]:
+        i = self.index.get(source)
+        j = self.index.get(target)
+        if i is None or j is None:
+            return None
+        value = float(self.matrices[kind][i, j])
+        return None if value != value else value  # NaN: no quote
+
+    def as_lists(self, kind: str) -> List[List[Optional[float]]]:
+        import numpy as np
+
+        matrix = self.matrices[kind]
+        return np.where(np.isnan(matrix), None, matrix).tolist()
+
+
+def build_matrix(
+    bank: str, day: str, digest: str, rates: Dict[str, Dict]
+) -> RateMatrix:
+    # Imported here so the crawler and plain API paths do not pay for it
+    import numpy as np
+
+    currencies = (BASE,) + tuple(sorted(c for c in rates if c != BASE))
+    matrices = {}
+    for kind in KINDS:
+        buy = np.full(len(currencies), np.nan)
+        sell = np.full(len(currencies), np.nan)
+        buy[0] = sell[0] = 1.0
+        for i, code in enumerate(currencies[1:], start=1):
+            quote = (rates[code] or {}).get(kind) or {}
+            buy[i] = quote.get("buy") or np.nan
+            sell[i] = quote.get("sell") or np.nan
+        matrix = buy[:, None] / sell[None, :]
+        np.fill_diagonal(matrix, 1.0)
+        matrix.setflags(write=False)
+        matrices[kind] = matrix
+    return RateMatrix(
+        bank=bank,
+        date=day,
+        rates_hash=digest,
+        currencies=currencies,
+        index={code: i for i, code in enumerate(currencies)},
+        matrices=matrices,
+    )
+
+
+class MatrixCache:
+    def __init__(self):
+        self._matrices: Dict[str, RateMatrix] = {}
+        self._lock = threading.Lock()
+
+    def get(self, bank: str, digest: str) -> Optional[RateMatrix]:
+        matrix = self._matrices.get(bank)
+        if matrix is not None and matrix.rates_hash == digest:
+            return matrix
+        return None
+
+    def put(self, matrix: RateMatrix) -> RateMatrix:
+        with self._lock:
+            self._matrices[matrix.bank] = matrix
+        return matrix
+
+
+matrix_cache = MatrixCache()
+
+
+async def latest_matrix(
+    db: AsyncSession, bank_name: str
+) -> Optional[RateMatrix]:
+    """Matrix for the bank's current rates, rebuilt only when they change."""
+    pointer = await db.get(LatestRate, bank_name)
+    if pointer is None:
+        return None
+    key = f"{pointer.rate_id}:{pointer.rates_hash}"
+    matrix = matrix_cache.get(bank_name, key)
+    if matrix is not None:
+        return matrix
+    row = await db.get(CurrencyRate, pointer.rate_id)
+    if row is None:
+        return None
+    return matrix_cache.put(
+        build_matrix(bank_name, row.date.isoformat(), key, row.rates or {})
+    )
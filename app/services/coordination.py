@@ -0,0 +1,119 @@
+"""Crawl leases, so several workers can share the bank list.
+
+With ``CRAWL_LEASES`` on, a worker crawls a bank for a date only after
+inserting its row in ``crawl_leases`` for the current time slot; the
+primary key makes that insert succeed for exactly one worker, on
+PostgreSQL and SQLite alike. Workers started together therefore split
+the banks between them instead of each crawling all of them, and only
+the lease holder saves, so two workers never race on the same
+``save_rates`` call.
+
+A lease is marked done after a successful save and released after a
+failed crawl, so another worker may retry the bank within the slot. A
+worker that dies keeps its lease for ``CRAWL_LEASE_TTL`` seconds, after
+which another worker can take it over.
+"""
+
+import os
+import socket
+import time
+from datetime import date, timedelta
+from typing import Optional
+
+from sqlalchemy import delete, insert, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from app.config import config
+from app.models.currency import CrawlLease, utc_now
+
+OWNER = config.CRAWL_WORKER_ID or f"{socket.gethostname()}:{os.getpid()}"
+
+
+def current_slot(seconds: int, now: Optional[float] = None) -> int:
+    """Start of the slot containing ``now``, in epoch seconds."""
+    now = time.time() if now is None else now
+    return int(now // seconds * seconds)
+
+
+def _key(bank: str, day: date, slot: int):
+    return (
+        CrawlLease.bank_name == bank,
+        CrawlLease.date == day,
+        CrawlLease.slot == slot,
+    )
+
+
+def claim(
+    db: Session,
+    bank: str,
+    day: date,
+    slot: int,
+    owner: Optional[str] = None,
+    ttl: Optional[int] = None,
+) -> bool:
+    """Try to take the lease for ``bank`` on ``day`` in ``slot``."""
+    now = utc_now()
+    expires = now + timedelta(seconds=ttl or config.CRAWL_LEASE_TTL)
+    owner = owner or OWNER
+    try:
+        db.execute(
+            insert(CrawlLease).values(
+                bank_name=bank,
+                date=day,
+                slot=slot,
+                owner=owner,
+                expires_at=expires,
+                done=False,
+            )
+        )
+        db.commit()
+        return True
+    except IntegrityError:
+        db.rollback()
+
+    # Taken: only an unfinished, expired lease can change hands
+    result = db.execute(
+        update(CrawlLease)
+        .where(
+            *_key(bank, day, slot),
+            CrawlLease.done.is_(False),
+            CrawlLease.expires_at < now,
+        )
+        .values(owner=owner, expires_at=expires)
+    )
+    db.commit()
+    return result.rowcount == 1
+
+
+def finish(
+    db: Session, bank: str, day: date, slot: int, owner: Optional[str] = None
+):
+    """Mark the lease done; no one crawls the bank again in this slot."""
+    db.execute(
+        update(CrawlLease)
+        .where(*_key(bank, day, slot), CrawlLease.owner == (owner or OWNER))
+        .values(done=True)
+    )
+    db.commit()
+
+
+def release(
+    db: Session, bank: str, day: date, slot: int, owner: Optional[str] = None
+):
+    """Give up an unfinished lease so another worker may retry."""
+    db.execute(
+        delete(CrawlLease).where(
+            *_key(bank, day, slot),
+            CrawlLease.owner == (owner or OWNER),
+            CrawlLease.done.is_(False),
+        )
+    )
+    db.commit()
+
+
+def prune(db: Session, before: int) -> int:
+    """Delete leases of slots that started before ``before``."""
+    return db.execute(
+        delete(CrawlLease).where(CrawlLease.slot < before)
+    ).rowcount
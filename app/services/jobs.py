@@ -0,0 +1,213 @@
+"""Durable crawl job queue backed by the ``crawl_jobs`` table.
+
+Every crawl attempt is a row, so what was attempted, by which worker,
+how long it took and why it failed stays queryable. With
+``CRAWL_QUEUE`` on, ``run_all``, backfill and refresh only enqueue and
+``scripts/worker.py`` processes run the jobs; otherwise the scraper
+records its inline crawls here as it goes.
+
+Workers claim the oldest due job with ``SELECT ... FOR UPDATE SKIP
+LOCKED`` on PostgreSQL. SQLite has no row locks; there the claim is a
+compare-and-set ``UPDATE ... WHERE status = 'queued'``, which SQLite's
+single writer makes atomic. A failed job is retried as a new row up to
+``CRAWL_JOB_MAX_ATTEMPTS`` times with exponential backoff, and jobs left
+running longer than ``CRAWL_JOB_TIMEOUT`` (a crashed worker) are failed
+and retried by :func:`recover`.
+"""
+
+from datetime import date, timedelta
+from typing import Iterable, List, Optional
+
+from sqlalchemy import delete, select, update
+from sqlalchemy.orm import Session
+
+from app.config import config
+from app.models.currency import CrawlJob, utc_now
+from app.utils.logger import logger
+
+QUEUED = "queued"
+RUNNING = "running"
+DONE = "done"
+FAILED = "failed"
+
+
+def enqueue(
+    db: Session,
+    banks: Iterable[str],
+    day: date,
+    attempt: int = 1,
+    delay: float = 0,
+) -> List[CrawlJob]:
+    """Queue a job per bank, skipping banks already queued or running."""
+    banks = list(banks)
+    pending = set(
+        db.scalars(
+            select(CrawlJob.bank_name).where(
+                CrawlJob.bank_name.in_(banks),
+                CrawlJob.date == day,
+                CrawlJob.status.in_((QUEUED, RUNNING)),
+            )
+        )
+    )
+    now = utc_now()
+    queued = [
+        CrawlJob(
+            bank_name=bank,
+            date=day,
+            attempt=attempt,
+            status=QUEUED,
+            enqueued_at=now,
+            run_after=now + timedelta(seconds=delay),
+        )
+        for bank in banks
+        if bank not in pending
+    ]
+    db.add_all(queued)
+    db.commit()
+    return queued
+
+
+def start(db: Session, banks: Iterable[str], day: date, worker: str) -> dict:
+    """Record inline crawls as running jobs; returns job ids by bank."""
+    now = utc_now()
+    started = {
+        bank: CrawlJob(
+            bank_name=bank,
+            date=day,
+            status=RUNNING,
+            worker=worker,
+            enqueued_at=now,
+            run_after=now,
+            started_at=now,
+        )
+        for bank in banks
+    }
+    db.add_all(started.values())
+    db.commit()
+    return {bank: job.id for bank, job in started.items()}
+
+
+def _due(now):
+    return (
+        select(CrawlJob.id)
+        .where(CrawlJob.status == QUEUED, CrawlJob.run_after <= now)
+        .order_by(CrawlJob.run_after, CrawlJob.id)
+        .limit(1)
+    )
+
+
+def claim(db: Session, worker: str) -> Optional[CrawlJob]:
+    """Take the oldest due job, or None when nothing is due."""
+    now = utc_now()
+    if db.get_bind().dialect.name == "postgresql":
+        job_id = db.scalar(_due(now).with_for_update(skip_locked=True))
+        if job_id is None:
+            db.rollback()
+            return None
+        db.execute(
+            update(CrawlJob)
+            .where(CrawlJob.id == job_id)
+            .values(status=RUNNING, worker=worker, started_at=now)
+        )
+        db.commit()
+        return db.get(CrawlJob, job_id)
+
+    # Another worker may win the update between select and update
+    for _ in range(5):
+        job_id = db.scalar(_due(now))
+        if job_id is None:
+            return None
+        won = db.execute(
+            update(CrawlJob)
+            .where(CrawlJob.id == job_id, CrawlJob.status == QUEUED)
+            .values(status=RUNNING, worker=worker, started_at=now)
+        ).rowcount
+        db.commit()
+        if won:
+            return db.get(CrawlJob, job_id)
+    return None
+
+
+def _finish(db: Session, job: CrawlJob, **values) -> bool:
+    """Close ``job`` unless :func:`recover` already failed it."""
+    won = db.execute(
+        update(CrawlJob)
+        .where(
+            CrawlJob.id == job.id,
+            CrawlJob.status == RUNNING,
+            CrawlJob.worker == job.worker,
+        )
+        .values(finished_at=utc_now(), **values)
+    ).rowcount
+    db.commit()
+    if not won:
+        logger.warning(
+            f"{job.bank_name}: job {job.id} for {job.date} was already "
+            f"taken over, result of {job.worker} dropped"
+        )
+    return bool(won)
+
+
+def complete(db: Session, job: CrawlJob, currencies: int) -> bool:
+    """Mark ``job`` done; False if it was no longer this worker's."""
+    return _finish(db, job, status=DONE, currencies=currencies)
+
+
+def _retry(db: Session, job: CrawlJob):
+    if job.attempt >= config.CRAWL_JOB_MAX_ATTEMPTS:
+        return
+    delay = config.CRAWL_JOB_RETRY_DELAY * 2 ** (job.attempt - 1)
+    enqueue(db, [job.bank_name], job.date, job.attempt + 1, delay)
+    logger.info(
+        f"{job.bank_name}: attempt {job.attempt + 1} for {job.date} "
+        f"in {delay}s"
+    )
+
+
+def fail(db: Session, job: CrawlJob, error: str, retry: bool = True) -> bool:
+    """Mark ``job`` failed and queue the next attempt, if any are left.
+
+    A job :func:`recover` already failed was retried there, so it is
+    left alone.
+    """
+    won = _finish(db, job, status=FAILED, error=error[:1000])
+    if won and retry:
+        _retry(db, job)
+    return won
+
+
+def recover(db: Session, timeout: Optional[int] = None) -> int:
+    """Fail and retry jobs whose worker stopped reporting."""
+    now = utc_now()
+    cutoff = now - timedelta(seconds=timeout or config.CRAWL_JOB_TIMEOUT)
+    stale = db.scalars(
+        select(CrawlJob).where(
+            CrawlJob.status == RUNNING, CrawlJob.started_at < cutoff
+        )
+    ).all()
+    recovered = 0
+    for job in stale:
+        # Several workers may find the same job; one of them retries it
+        won = db.execute(
+            update(CrawlJob)
+            .where(CrawlJob.id == job.id, CrawlJob.status == RUNNING)
+            .values(
+                status=FAILED,
+                finished_at=now,
+                error=f"worker {job.worker} timed out",
+            )
+        ).rowcount
+        db.commit()
+        if won:
+            _retry(db, job)
+            recovered += 1
+    return recovered
+
+
+def prune(db: Session, before: date) -> int:
+    """Delete finished jobs for dates before ``before``."""
+    return db.execute(
+        delete(CrawlJob).where(
+            CrawlJob.date < before, CrawlJob.status.in_((DONE, FAILED))
+        )
+    ).rowcount
@@ -0,0 +1,142 @@
+"""Retention and compaction of the rate tables.
+
+- Intraday detail (``rate_ticks``, ``currency_rate_history``) older than
+  RETENTION_INTRADAY_DAYS is dropped; the daily row in ``currency_rates``
+  already holds each day's final rates.
+- Duplicate (bank, date) rows in ``currency_rates`` collapse to the
+  newest one.
+- Everything older than the current year and the RETENTION_HOT_YEARS
+  before it moves to ``currency_rate_archive``, one compressed row per
+  bank and year, so the hot table and its indexes stop growing.
+- Finished crawl jobs older than RETENTION_INTRADAY_DAYS and crawl
+  leases of slots older than a day are deleted.
+"""
+
+import time
+from collections import defaultdict
+from datetime import date, datetime, timedelta, timezone
+from typing import Dict, Optional
+
+from sqlalchemy import delete, func, select
+from sqlalchemy.orm import Session
+
+from app.config import config
+from app.db import repository
+from app.models.currency import (
+    CurrencyRate,
+    CurrencyRateArchive,
+    CurrencyRateHistory,
+    RateTick,
+)
+from app.services import coordination, jobs
+from app.utils.logger import logger
+
+
+def compact_intraday(db: Session, before: date) -> int:
+    """Delete ticks and superseded snapshots dated before ``before``."""
+    removed = 0
+    for model in (RateTick, CurrencyRateHistory):
+        result = db.execute(delete(model).where(model.date < before))
+        removed += result.rowcount
+    return removed
+
+
+def dedupe_daily(db: Session) -> int:
+    """Keep only the newest row per (bank, date)."""
+    dupes = (
+        select(CurrencyRate.bank_name, CurrencyRate.date)
+        .group_by(CurrencyRate.bank_name, CurrencyRate.date)
+        .having(func.count() > 1)
+    )
+    removed = 0
+    for bank_name, day in db.execute(dupes).all():
+        rows = db.scalars(
+            select(CurrencyRate)
+            .where(
+                CurrencyRate.bank_name == bank_name, CurrencyRate.date == day
+            )
+            .order_by(CurrencyRate.timestamp.desc(), CurrencyRate.id.desc())
+        ).all()
+        for row in rows[1:]:
+            db.delete(row)
+            removed += 1
+    return removed
+
+
+def _archive_entry(row: CurrencyRate) -> Dict:
+    return {
+        "id": row.id,
+        "date": row.date.isoformat(),
+        "rates": row.rates,
+        "rates_hash": row.rates_hash,
+        "timestamp": row.timestamp.isoformat() if row.timestamp else None,
+    }
+
+
+def archive_cold_years(db: Session, before_year: int) -> int:
+    """Move rows dated before ``before_year`` into the archive table.
+
+    Rows that land in an already archived year (e.g. from a re-parse) are
+    merged into its existing archive row.
+    """
+    cold = db.scalars(
+        select(CurrencyRate)
+        .where(CurrencyRate.date < date(before_year, 1, 1))
+        .order_by(CurrencyRate.date)
+    ).all()
+    groups = defaultdict(list)
+    for row in cold:
+        groups[(row.bank_name, row.date.year)].append(row)
+
+    now = datetime.now(timezone.utc)
+    for (bank_name, year), rows in groups.items():
+        archive = db.scalar(
+            select(CurrencyRateArchive).where(
+                CurrencyRateArchive.bank_name == bank_name,
+                CurrencyRateArchive.year == year,
+            )
+        )
+        entries = {}
+        if archive is not None:
+            for entry in repository.unpack_archive(archive.payload):
+                entries[entry["date"]] = entry
+        else:
+            archive = CurrencyRateArchive(bank_name=bank_name, year=year)
+            db.add(archive)
+        for row in rows:
+            entries[row.date.isoformat()] = _archive_entry(row)
+            db.delete(row)
+        archive.payload = repository.pack_archive(
+            [entries[day] for day in sorted(entries)]
+        )
+        archive.rows = len(entries)
+        archive.archived_at = now
+    return len(cold)
+
+
+def compact(db: Session, today: Optional[date] = None) -> Dict[str, int]:
+    """Run every retention step in one transaction."""
+    today = today or date.today()
+    cutoff = today - timedelta(days=config.RETENTION_INTRADAY_DAYS)
+    stats = {
+        "intraday": compact_intraday(db, cutoff),
+        "jobs": jobs.prune(db, cutoff),
+        "duplicates": dedupe_daily(db),
+        # Only the current slot's leases matter
+        "leases": coordination.prune(db, int(time.time()) - 86400),
+    }
+    db.flush()
+    stats["archived"] = archive_cold_years(
+        db, today.year - config.RETENTION_HOT_YEARS
+    )
+    db.flush()
+    # Deleted duplicates or archived rows may have been pointed at
+    repository.rebuild_latest(db)
+    db.commit()
+    logger.info(
+        f"Compaction: {stats['intraday']} intraday rows removed, "
+        f"{stats['duplicates']} duplicates, {stats['jobs']} crawl jobs and "
+        f"{stats['leases']} crawl leases removed, "
+        f"{stats['archived']} rows archived"
+    )
+    return stats
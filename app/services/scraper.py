@@ -2,55 +2,274 @@
 
 import datetime
 from concurrent.futures import ThreadPoolExecutor, as_completed
-from typing import Dict, List, Optional, Tuple
+from typing import Dict, List, Optional, Set, Tuple
 
+from app import crawlers
 from app.config import config
-from app.crawlers import CRAWLER_MAP, HTTP_CRAWLERS, PLAYWRIGHT_CRAWLERS
+from app.crawlers import registry
+from app.crawlers.base import PlaywrightCrawler
+from app.crawlers.registry import CrawlerSpec
 from app.db import repository
 from app.db.database import SessionLocal
-from app.models.exchange_rate import CurrencyDetail, ExchangeRate
+from app.models.currency import CrawlJob
+from app.models.exchange_rate import (
+    BankRates,
+    RateRecord,
+    plain_rates,
+    rates_hash,
+)
+from app.services import browser_pool, coordination, jobs, validation
+from app.utils import metrics
 from app.utils.logger import logger
 
 
+def _in_processes(pool: str) -> bool:
+    return pool == registry.BROWSER and config.PLAYWRIGHT_PROCESSES > 0
+
+
+def _renders(crawler_cls) -> bool:
+    return isinstance(crawler_cls, type) and issubclass(
+        crawler_cls, PlaywrightCrawler
+    )
+
+
+def _pool_size(pool: str) -> int:
+    if _in_processes(pool):
+        # Each thread waits on one worker process
+        return config.PLAYWRIGHT_PROCESSES
+    if pool == registry.BROWSER:
+        return config.PLAYWRIGHT_MAX_WORKERS
+    return config.MAX_WORKERS
+
+
 class ScraperService:
     def __init__(self, date: Optional[str] = None):
         self.date = date or datetime.date.today().isoformat()
 
-    def run_all(self):
-        logger.info(f"Starting crawl on {self.date}")
+    def run_all(self, specs: Optional[List[CrawlerSpec]] = None):
+        """Crawl ``specs`` (default: every bank that can serve the date)."""
+        if specs is None:
+            specs = registry.select(day=self.date)
+        slot = coordination.current_slot(config.CRAWL_SLOT_SECONDS)
+        specs = self._claim(specs, slot)
+        if config.CRAWL_QUEUE:
+            queued = self.enqueue([spec.name for spec in specs])
+            # The queue owns these banks now; its workers retry failures
+            self._settle(specs, slot, {s.name: (0, None) for s in specs})
+            logger.info(f"Queued {queued} crawl jobs for {self.date}")
+            return
+        logger.info(f"Starting crawl on {self.date}: {len(specs)} banks")
+        started = self._record_start([spec.name for spec in specs])
+
+        # One worker pool per concurrency class (http, browser)
+        pools: Dict[str, List] = {}
+        for spec in specs:
+            try:
+                crawler_cls = spec.load()
+            except Exception as e:
+                # A broken plugin must not stop the other banks
+                logger.error(f"{spec.name}: crawler failed to load - {e}")
+                continue
+            pools.setdefault(spec.pool, []).append(crawler_cls)
 
         results = []
         if config.ENABLE_PARALLEL:
-            with ThreadPoolExecutor(max_workers=2) as executor:
+            with ThreadPoolExecutor(max_workers=len(pools) or 1) as executor:
                 futures = [
-                    executor.submit(
-                        self._run_group, HTTP_CRAWLERS, config.MAX_WORKERS
-                    ),
-                    executor.submit(
-                        self._run_group,
-                        PLAYWRIGHT_CRAWLERS,
-                        config.PLAYWRIGHT_MAX_WORKERS,
-                    ),
+                    executor.submit(self._run_group, classes, pool)
+                    for pool, classes in pools.items()
                 ]
                 for f in as_completed(futures):
                     results.extend(f.result())
         else:
-            for crawler_cls in HTTP_CRAWLERS + PLAYWRIGHT_CRAWLERS:
-                results.append(self._execute(crawler_cls))
+            for pool, classes in pools.items():
+                for crawler_cls in classes:
+                    results.append(
+                        self._execute(crawler_cls, _in_processes(pool))
+                    )
 
-        self._save(results)
+        results = self._validate(results)
+        outcomes = self._outcomes(results, self._save(results))
+        self._settle(specs, slot, outcomes)
+        self._record_finish(started, outcomes)
 
         success = len([r for r in results if r[1]])
         failed = len([r for r in results if r[2]])
         logger.info(f"Crawl completed: {success} succeeded, {failed} failed")
 
-    def _run_group(
-        self, crawler_classes: List, max_workers: int
-    ) -> List[Tuple]:
+    def poll(self, last_hashes: Dict[str, str]) -> int:
+        """Crawl the HTTP banks once and save only banks whose rates moved.
+
+        ``last_hashes`` maps bank name to the content hash seen on the
+        previous poll; it is updated in place so unchanged results never
+        reach the database. A bank whose save failed keeps its old hash,
+        so the next poll saves it again.
+        """
+        changed, digests = [], {}
+        specs = registry.select(transport=registry.HTTP, freshness="intraday")
+        slot = coordination.current_slot(config.POLL_INTERVAL)
+        specs = self._claim(specs, slot)
+        # Only the intraday HTTP crawler modules are imported by the poller
+        http_crawlers = [spec.load() for spec in specs]
+        results = self._validate(self._run_group(http_crawlers, registry.HTTP))
+        for result in results:
+            bank_name, rates, error = result
+            if error or not rates:
+                continue
+            digest = rates_hash(plain_rates(rates))
+            if last_hashes.get(bank_name) != digest:
+                digests[bank_name] = digest
+                changed.append(result)
+
+        failed_saves = self._save(changed) if changed else set()
+        for bank_name, digest in digests.items():
+            if bank_name not in failed_saves:
+                last_hashes[bank_name] = digest
+        self._settle(specs, slot, self._outcomes(results, failed_saves))
+        logger.info(f"Poll: {len(changed)} banks changed")
+        return len(changed)
+
+    def _claim(self, specs: List[CrawlerSpec], slot: int) -> List:
+        """The specs this worker leased (all of them without CRAWL_LEASES)."""
+        if not config.CRAWL_LEASES:
+            return specs
+        day = datetime.date.fromisoformat(self.date)
+        db = SessionLocal()
+        try:
+            claimed = [
+                spec
+                for spec in specs
+                if coordination.claim(db, spec.name, day, slot)
+            ]
+        finally:
+            db.close()
+        if len(claimed) < len(specs):
+            logger.info(
+                f"{len(specs) - len(claimed)} banks leased by other workers"
+            )
+        return claimed
+
+    def enqueue(self, banks: List[str]) -> int:
+        """Queue crawl jobs for ``banks`` on this date (CRAWL_QUEUE mode)."""
+        db = SessionLocal()
+        try:
+            day = datetime.date.fromisoformat(self.date)
+            return len(jobs.enqueue(db, banks, day))
+        finally:
+            db.close()
+
+    def refresh(self, bank_name: str) -> Optional[str]:
+        """Re-crawl one bank on demand: queued, or inline without a queue.
+
+        Returns the error of an inline crawl, None when it succeeded or
+        was queued. A bank without past rates is refused for past dates,
+        so today's rates are not stored under the wrong date.
+        """
+        spec = registry.get(bank_name)
+        if not spec.serves(self.date):
+            return f"{spec.name} has no rates for past date {self.date}"
+        name = spec.load().BANK_NAME
+        if config.CRAWL_QUEUE:
+            self.enqueue([name])
+            return None
+        started = self._record_start([name])
+        outcome = self.run_bank(name)
+        self._record_finish(started, {name: outcome})
+        return outcome[1]
+
+    def run_bank(self, bank_name: str) -> Tuple[int, Optional[str]]:
+        """Crawl and save one bank; returns (currencies, error message)."""
+        try:
+            spec = registry.get(bank_name)
+        except KeyError:
+            return 0, f"unknown bank {bank_name}"
+        if not spec.serves(self.date):
+            return 0, f"{spec.name} has no rates for past date {self.date}"
+        crawler_cls = spec.load()
+        (result,) = self._validate([self._execute(crawler_cls)])
+        outcomes = self._outcomes([result], self._save([result]))
+        return outcomes[result[0]]
+
+    @staticmethod
+    def _outcomes(
+        results: List[Tuple], failed_saves: Set[str]
+    ) -> Dict[str, Tuple[int, Optional[str]]]:
+        """Currencies crawled and error message (None if saved) per bank."""
+        outcomes = {}
+        for bank_name, rates, error in results:
+            if error:
+                message = f"{type(error).__name__}: {error}"
+            elif not rates:
+                message = "no rates"
+            elif bank_name in failed_saves:
+                message = "save failed"
+            else:
+                message = None
+            outcomes[bank_name] = (len(rates or {}), message)
+        return outcomes
+
+    def _record_start(self, banks: List[str]) -> Dict:
+        """Record an inline crawl in ``crawl_jobs``."""
+        db = SessionLocal()
+        try:
+            day = datetime.date.fromisoformat(self.date)
+            return jobs.start(db, banks, day, coordination.OWNER)
+        except Exception as e:
+            logger.error(f"Failed to record crawl jobs - {e}")
+            return {}
+        finally:
+            db.close()
+
+    def _record_finish(self, started: Dict, outcomes: Dict):
+        if not started:
+            return
+        db = SessionLocal()
+        try:
+            for bank_name, job_id in started.items():
+                job = db.get(CrawlJob, job_id)
+                count, error = outcomes.get(
+                    bank_name, (0, "crawler failed to load")
+                )
+                if error:
+                    # The next scheduled run is the retry
+                    jobs.fail(db, job, error, retry=False)
+                else:
+                    jobs.complete(db, job, count)
+        except Exception as e:
+            logger.error(f"Failed to record crawl jobs - {e}")
+        finally:
+            db.close()
+
+    def _settle(
+        self,
+        specs: List[CrawlerSpec],
+        slot: int,
+        outcomes: Dict[str, Tuple[int, Optional[str]]],
+    ):
+        """Finish the leases of banks that went through, release the rest."""
+        if not config.CRAWL_LEASES:
+            return
+        done = {bank for bank, (_, error) in outcomes.items() if not error}
+        day = datetime.date.fromisoformat(self.date)
+        db = SessionLocal()
+        try:
+            for spec in specs:
+                if spec.name in done:
+                    coordination.finish(db, spec.name, day, slot)
+                else:
+                    coordination.release(db, spec.name, day, slot)
+        except Exception as e:
+            # Unreleased leases expire after CRAWL_LEASE_TTL
+            logger.error(f"Failed to settle crawl leases - {e}")
+        finally:
+            db.close()
+
+    def _run_group(self, crawler_classes: List, pool: str) -> List[Tuple]:
         results = []
-        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        remote = _in_processes(pool)
+        with ThreadPoolExecutor(max_workers=_pool_size(pool)) as executor:
             futures = {
-                executor.submit(self._execute, cls): cls
+                executor.submit(self._execute, cls, remote): cls
                 for cls in crawler_classes
             }
             for f in as_completed(futures):
@@ -58,45 +277,76 @@ class ScraperService:
         return results
 
     def _execute(
-        self, crawler_cls
+        self, crawler_cls, remote: bool = False
     ) -> Tuple[str, Optional[Dict], Optional[Exception]]:
+        """Crawl one bank, in a browser worker process if ``remote``.
+
+        Only Playwright crawlers go to the worker processes; anything
+        else in a browser group still runs in this thread.
+        """
         bank_name = crawler_cls.BANK_NAME
+        remote = remote and _renders(crawler_cls)
         try:
-            crawler = crawler_cls(self.date)
-            rates = crawler.crawl()
-            logger.info(
-                f"{bank_name}: crawled {len(rates) if rates else 0} currencies"
-            )
+            with metrics.timed(metrics.CRAWL_DURATION, bank=bank_name):
+                if remote:
+                    rates = browser_pool.crawl(bank_name, self.date)
+                else:
+                    rates = crawler_cls(self.date).crawl()
+            count = len(rates) if rates else 0
+            metrics.CRAWL_SUCCESS.labels(bank=bank_name).inc()
+            metrics.CRAWL_CURRENCIES.labels(bank=bank_name).set(count)
+            logger.info(f"{bank_name}: crawled {count} currencies")
             return bank_name, rates, None
         except Exception as e:
+            metrics.CRAWL_FAILURES.labels(
+                bank=bank_name, exception=type(e).__name__
+            ).inc()
             logger.error(f"{bank_name}: crawl failed - {e}")
             return bank_name, None, e
 
-    def _save(self, results: List[Tuple]):
+    def _validate(self, results: List[Tuple]) -> List[Tuple]:
+        """Hold back suspicious currencies before they are saved."""
+        if not config.VALIDATE_RATES:
+            return results
+        db = SessionLocal()
+        try:
+            return validation.screen(db, self.date, results)
+        except Exception as e:
+            # Checks are a safeguard; an outage must not stop the saves
+            logger.error(f"Rate validation failed, saving unchecked - {e}")
+            return results
+        finally:
+            db.close()
+
+    def _save(self, results: List[Tuple]) -> Set[str]:
+        """Save the crawled rates; returns the banks that failed to save."""
         db = SessionLocal()
         saved = 0
+        failed = set()
         try:
             for bank_name, rates, error in results:
                 if error or not rates:
                     continue
                 try:
-                    data = ExchangeRate(
-                        date=self.date, bank=bank_name, rates=rates
+                    repository.save_rates(
+                        db, BankRates(self.date, bank_name, rates)
                     )
-                    repository.save_rates(db, data)
                     saved += 1
                 except Exception as e:
+                    # Leaves the session usable for the next bank
+                    db.rollback()
+                    failed.add(bank_name)
                     logger.error(f"{bank_name}: failed to save - {e}")
         finally:
             db.close()
             logger.info(f"Saved {saved} bank rates to database")
+        return failed
 
-    def scrape_bank(
-        self, bank_name: str
-    ) -> Optional[Dict[str, CurrencyDetail]]:
+    def scrape_bank(self, bank_name: str) -> Optional[Dict[str, RateRecord]]:
         """Scrape a single bank by name."""
-        crawler_cls = CRAWLER_MAP.get(bank_name.lower())
-        if not crawler_cls:
+        try:
+            crawler_cls = crawlers.load(bank_name)
+        except KeyError:
             logger.warning(f"Unknown bank: {bank_name}")
             return None
 
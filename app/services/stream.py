@@ -0,0 +1,164 @@
+"""Fan-out of rate changes to streaming API clients.
+
+``rate_ticks`` doubles as the notification table: every saved change
+appends rows with increasing ids. One broadcaster per API worker tails
+that table and pushes new ticks to all subscribed clients, so the DB
+sees one query per interval regardless of the number of clients. On
+PostgreSQL the save path also issues ``NOTIFY rate_ticks`` and the
+broadcaster wakes up immediately instead of waiting for the interval.
+
+Ids are assigned at insert but become visible at commit, so on
+PostgreSQL a concurrent save can commit a lower id after a higher one
+was already sent. Ids skipped over are kept as gaps and looked up again
+on every poll until they show up or fall ``STREAM_GAP_WINDOW`` ids
+behind (a rolled back insert never shows up).
+"""
+
+import asyncio
+import select
+from typing import Dict, Iterable, List, Optional, Set
+
+from sqlalchemy import or_
+from starlette.concurrency import run_in_threadpool
+
+from app.config import config
+from app.db.database import SessionLocal, engine
+from app.models.currency import RateTick
+from app.utils.logger import logger
+
+CHANNEL = "rate_ticks"
+
+
+def tick_event(tick: RateTick) -> Dict:
+    return {
+        "id": tick.id,
+        "bank": tick.bank_name,
+        "date": tick.date.isoformat(),
+        "currency": tick.currency,
+        "rates": tick.rates,
+        "timestamp": tick.timestamp.isoformat(),
+    }
+
+
+def fetch_ticks(
+    session_factory, after_id: int, gaps: Iterable[int] = (), limit: int = 500
+) -> List:
+    """Ticks after ``after_id``, plus the earlier ids in ``gaps``."""
+    db = session_factory()
+    try:
+        ticks = (
+            db.query(RateTick)
+            .filter(or_(RateTick.id > after_id, RateTick.id.in_(list(gaps))))
+            .order_by(RateTick.id)
+            .limit(limit)
+            .all()
+        )
+        return [tick_event(t) for t in ticks]
+    finally:
+        db.close()
+
+
+def _last_tick_id(session_factory) -> int:
+    db = session_factory()
+    try:
+        last = db.query(RateTick.id).order_by(RateTick.id.desc()).first()
+        return last[0] if last else 0
+    finally:
+        db.close()
+
+
+class _PgListener:
+    """Blocking LISTEN on a dedicated PostgreSQL connection."""
+
+    def __init__(self):
+        self._raw = engine.raw_connection()
+        self._conn = self._raw.driver_connection
+        self._conn.autocommit = True
+        with self._conn.cursor() as cursor:
+            cursor.execute(f"LISTEN {CHANNEL}")
+
+    def wait(self, timeout: float):
+        if select.select([self._conn], [], [], timeout)[0]:
+            self._conn.poll()
+            self._conn.notifies.clear()
+
+    def close(self):
+        self._raw.close()
+
+
+class RateBroadcaster:
+    def __init__(self, session_factory=SessionLocal, interval: float = 2.0):
+        self.session_factory = session_factory
+        self.interval = interval
+        self._subscribers: Set[asyncio.Queue] = set()
+        self._task: Optional[asyncio.Task] = None
+        self._listener: Optional[_PgListener] = None
+        self._last_id: Optional[int] = None
+        self._gaps: Set[int] = set()
+
+    def subscribe(self) -> asyncio.Queue:
+        queue: asyncio.Queue = asyncio.Queue(maxsize=1000)
+        self._subscribers.add(queue)
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+        return queue
+
+    def unsubscribe(self, queue: asyncio.Queue):
+        self._subscribers.discard(queue)
+
+    async def poll_once(self):
+        if self._last_id is None:
+            self._last_id = await run_in_threadpool(
+                _last_tick_id, self.session_factory
+            )
+        events = await run_in_threadpool(
+            fetch_ticks, self.session_factory, self._last_id, self._gaps
+        )
+        window = config.STREAM_GAP_WINDOW
+        for event in events:
+            tick_id = event["id"]
+            if tick_id > self._last_id:
+                start = max(self._last_id + 1, tick_id - window)
+                self._gaps.update(range(start, tick_id))
+                self._last_id = tick_id
+            else:
+                self._gaps.discard(tick_id)
+            for queue in self._subscribers:
+                if queue.full():
+                    # Slow client: drop its oldest event; it can catch up
+                    # by reconnecting with Last-Event-ID
+                    queue.get_nowait()
+                queue.put_nowait(event)
+        floor = self._last_id - window
+        self._gaps = {gap for gap in self._gaps if gap > floor}
+
+    async def _wait(self):
+        if self._listener:
+            await run_in_threadpool(self._listener.wait, self.interval)
+        else:
+            await asyncio.sleep(self.interval)
+
+    async def _run(self):
+        if engine.dialect.name == "postgresql":
+            try:
+                self._listener = await run_in_threadpool(_PgListener)
+            except Exception as e:
+                logger.warning(f"LISTEN unavailable, polling instead - {e}")
+        while self._subscribers:
+            try:
+                await self.poll_once()
+            except Exception as e:
+                logger.error(f"Rate stream poll failed - {e}")
+            await self._wait()
+        self.close()
+
+    def close(self):
+        # The next subscriber starts from the current end of the table
+        self._last_id = None
+        self._gaps.clear()
+        if self._listener:
+            self._listener.close()
+            self._listener = None
+
+
+broadcaster = RateBroadcaster(interval=config.STREAM_POLL_INTERVAL)
@@ -0,0 +1,225 @@
+"""Validation of crawled rates before they are saved.
+
+A layout change at a bank usually still parses: columns shift, a footer
+row becomes a currency, a scale changes. :func:`screen` checks every
+crawled currency of a run at once, before ``save_rates``:
+
+- ``code``: the key is an ISO 4217 currency code;
+- ``spread``: buy is not above sell, for cash and non-cash;
+- ``official``: every rate is within ``RATE_MAX_OFFICIAL_DEVIATION`` of
+  the MongolBank official rate;
+- ``previous``: every rate is within ``RATE_MAX_DAY_CHANGE`` of the
+  bank's last saved rate before the date.
+
+The reference rates are loaded with one query each for the whole run.
+Failing currencies are left out of the save and kept in
+``rate_quarantine`` with their reasons; a bank with nothing left fails
+its crawl with :class:`Quarantined`.
+
+A real move larger than ``RATE_MAX_DAY_CHANGE`` (a devaluation, a bank
+changing its quote) would otherwise be held forever, since the previous
+rate only changes on a save. A currency that failed nothing but the
+``previous`` check is therefore accepted once ``RATE_RELEASE_AFTER``
+crawls in a row, the held ones since the last save included, agree
+with each other within ``RATE_MAX_DAY_CHANGE``.
+"""
+
+from datetime import date, timedelta
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from app.config import config
+from app.db import repository
+from app.models.currency import QuarantinedRate
+from app.models.exchange_rate import plain_rates
+from app.utils import metrics
+from app.utils.logger import logger
+
+OFFICIAL_BANK = "MongolBank"
+
+# Active ISO 4217 codes, including precious metals (XAU, XAG, ...)
+ISO_4217 = frozenset("""
+    aed afn all amd ang aoa ars aud awg azn bam bbd bdt bgn bhd bif bmd
+    bnd bob brl bsd btn bwp byn bzd cad cdf chf clp cny cop crc cuc cup
+    cve czk djf dkk dop dzd egp ern etb eur fjd fkp gbp gel ghs gip gmd
+    gnf gtq gyd hkd hnl htg huf idr ils inr iqd irr isk jmd jod jpy kes
+    kgs khr kmf kpw krw kwd kyd kzt lak lbp lkr lrd lsl lyd mad mdl mga
+    mkd mmk mnt mop mru mur mvr mwk mxn myr mzn nad ngn nio nok npr nzd
+    omr pab pen pgk php pkr pln pyg qar ron rsd rub rwf sar sbd scr sdg
+    sek sgd shp sle sll sos srd ssp stn svc syp szl thb tjs tmt tnd top
+    try ttd twd tzs uah ugx usd uyu uzs ves vnd vuv wst xaf xag xau xcd
+    xdr xof xpd xpf xpt yer zar zmw zwl
+    """.split())
+
+SIDES = (
+    ("cash", "buy"),
+    ("cash", "sell"),
+    ("noncash", "buy"),
+    ("noncash", "sell"),
+)
+
+
+class Quarantined(Exception):
+    """Every crawled currency of a bank failed validation."""
+
+
+def _deviation(value: float, reference: float) -> float:
+    return abs(value / reference - 1)
+
+
+def check(
+    code: str,
+    rates: dict,
+    official: Optional[float] = None,
+    previous: Optional[dict] = None,
+) -> Dict[str, str]:
+    """Failed checks of one currency's plain rates, by check name.
+
+    Each check reports the first rate that failed it.
+    """
+    if code not in ISO_4217:
+        return {"code": f"{code!r} is not an ISO 4217 code"}
+
+    failed = {}
+    for kind in ("cash", "noncash"):
+        buy, sell = rates[kind]["buy"], rates[kind]["sell"]
+        if buy is not None and sell is not None and buy > sell:
+            failed.setdefault("spread", f"{kind} buy {buy} > sell {sell}")
+
+    for kind, side in SIDES:
+        value = rates[kind][side]
+        if value is None:
+            continue
+        if official and (
+            _deviation(value, official) > config.RATE_MAX_OFFICIAL_DEVIATION
+        ):
+            failed.setdefault(
+                "official", f"{kind} {side} {value} vs official {official}"
+            )
+        last = ((previous or {}).get(kind) or {}).get(side)
+        if last and _deviation(value, last) > config.RATE_MAX_DAY_CHANGE:
+            failed.setdefault(
+                "previous", f"{kind} {side} {value} vs last {last}"
+            )
+    return failed
+
+
+def _official(
+    db: Session, day: date, crawled: Dict[str, dict]
+) -> Dict[str, float]:
+    """Official rate per currency, preferring the saved (validated) one."""
+    row = repository.get_rate_as_of(db, OFFICIAL_BANK, day)
+    rates = row.rates if row is not None else crawled.get(OFFICIAL_BANK, {})
+    official = {}
+    for code, detail in rates.items():
+        value = (detail.get("noncash") or {}).get("buy")
+        if value:
+            official[code] = value
+    return official
+
+
+def _held_since(
+    db: Session, day: date, saved: Dict[str, date]
+) -> Dict[str, List[dict]]:
+    """Rates quarantined after each bank's last saved date, newest first."""
+    if not saved or config.RATE_RELEASE_AFTER < 2:
+        return {}
+    rows = db.scalars(
+        select(QuarantinedRate)
+        .where(
+            QuarantinedRate.bank_name.in_(saved),
+            QuarantinedRate.date > min(saved.values()),
+            QuarantinedRate.date <= day,
+        )
+        .order_by(QuarantinedRate.id.desc())
+    )
+    held: Dict[str, List[dict]] = {}
+    for row in rows:
+        if row.date > saved[row.bank_name]:
+            held.setdefault(row.bank_name, []).append(row.rates)
+    return held
+
+
+def _settled(code: str, rates: dict, held: List[dict]) -> bool:
+    """Whether the last held crawls of ``code`` agree with ``rates``."""
+    if config.RATE_RELEASE_AFTER < 1:
+        return False
+    earlier = [h[code] for h in held if code in h]
+    earlier = earlier[: config.RATE_RELEASE_AFTER - 1]
+    return len(earlier) == config.RATE_RELEASE_AFTER - 1 and all(
+        "previous" not in check(code, rates, previous=last) for last in earlier
+    )
+
+
+def screen(db: Session, day: str, results: List[Tuple]) -> List[Tuple]:
+    """Drop suspicious currencies from crawl ``results`` and quarantine them.
+
+    ``results`` are the scraper's ``(bank, rates, error)`` tuples; the
+    returned list has the same banks in the same order.
+    """
+    crawled = {
+        bank: plain_rates(rates)
+        for bank, rates, error in results
+        if rates and not error
+    }
+    if not crawled:
+        return results
+
+    target = date.fromisoformat(day)
+    official = _official(db, target, crawled)
+    saved = {
+        row.bank_name: row
+        for row in repository.get_rates_as_of(db, target - timedelta(days=1))
+        if row.bank_name in crawled
+    }
+    previous = {bank: row.rates or {} for bank, row in saved.items()}
+    held_before = _held_since(
+        db, target, {bank: row.date for bank, row in saved.items()}
+    )
+
+    screened = []
+    for bank, rates, error in results:
+        if bank not in crawled:
+            screened.append((bank, rates, error))
+            continue
+        kept, held, reasons = {}, {}, {}
+        last = previous.get(bank, {})
+        for code, detail in crawled[bank].items():
+            failed = check(code, detail, official.get(code), last.get(code))
+            if list(failed) == ["previous"] and _settled(
+                code, detail, held_before.get(bank, [])
+            ):
+                logger.info(
+                    f"{bank}: {code} accepted after "
+                    f"{config.RATE_RELEASE_AFTER} consistent crawls - "
+                    f"{failed['previous']}"
+                )
+                failed = {}
+            if not failed:
+                kept[code] = rates[code]
+                continue
+            held[code] = detail
+            reasons[code] = list(failed.values())
+            for name in failed:
+                metrics.RATES_QUARANTINED.labels(bank=bank, check=name).inc()
+
+        if held:
+            db.add(
+                QuarantinedRate(
+                    bank_name=bank, date=target, rates=held, reasons=reasons
+                )
+            )
+            logger.warning(
+                f"{bank}: quarantined {len(held)} currencies - "
+                + "; ".join(f"{c}: {', '.join(r)}" for c, r in reasons.items())
+            )
+        if kept:
+            screened.append((bank, kept, None))
+        else:
+            screened.append(
+                (bank, None, Quarantined(f"{len(held)} currencies held back"))
+            )
+    db.commit()
+    return screened
@@ -0,0 +1,69 @@
+"""Crawl job worker: claims ``crawl_jobs`` rows and runs them one by one.
+
+Run several of these as processes (``scripts/worker.py``) to crawl
+Playwright banks on more than one core.
+"""
+
+import time
+from typing import Optional
+
+from app.config import config
+from app.db.database import SessionLocal
+from app.services import coordination, jobs
+from app.services.scraper import ScraperService
+from app.utils.logger import logger
+
+RECOVER_INTERVAL = 60
+
+
+def run_next(worker: str) -> bool:
+    """Claim and run one due job; False when none was due."""
+    db = SessionLocal()
+    try:
+        job = jobs.claim(db, worker)
+        if job is None:
+            return False
+        logger.info(f"{worker}: {job.bank_name} {job.date} #{job.attempt}")
+        count, error = ScraperService(job.date.isoformat()).run_bank(
+            job.bank_name
+        )
+        if error:
+            jobs.fail(db, job, error)
+        else:
+            jobs.complete(db, job, count)
+        return True
+    finally:
+        db.close()
+
+
+def _recover():
+    db = SessionLocal()
+    try:
+        recovered = jobs.recover(db)
+        if recovered:
+            logger.warning(f"Requeued {recovered} jobs of lost workers")
+    finally:
+        db.close()
+
+
+def work(worker: Optional[str] = None, drain: bool = False) -> int:
+    """Process jobs until stopped (or, with ``drain``, until none is due).
+
+    Returns the number of jobs run.
+    """
+    worker = worker or coordination.OWNER
+    processed = 0
+    recovered_at = 0.0
+    while True:
+        try:
+            if time.monotonic() - recovered_at > RECOVER_INTERVAL:
+                _recover()
+                recovered_at = time.monotonic()
+            if run_next(worker):
+                processed += 1
+                continue
+        except Exception as e:
+            logger.error(f"{worker}: job loop failed - {e}")
+        if drain:
+            return processed
+        time.sleep(config.CRAWL_QUEUE_POLL)
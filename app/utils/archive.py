@@ -0,0 +1,100 @@
+"""Content-addressed archive of raw crawler responses.
+
+Layout under ``ARCHIVE_DIR``::
+
+    objects/ab/abcdef....zst   zstd-compressed payload, named by sha256
+    refs/<bank>/<date>         "<sha256> <format>" of the payload last
+                               used for that bank and date
+
+Identical payloads are stored once; refs are overwritten so they always
+point at the response the crawler actually parsed.
+"""
+
+import hashlib
+import os
+from dataclasses import dataclass
+from datetime import date
+from pathlib import Path
+from typing import Iterator, Optional
+
+try:
+    from compression import zstd
+
+    def compress(raw: bytes) -> bytes:
+        return zstd.compress(raw, level=10)
+
+    def decompress(data: bytes) -> bytes:
+        return zstd.decompress(data)
+
+except ImportError:  # Python < 3.14
+    import zstandard
+
+    def compress(raw: bytes) -> bytes:
+        return zstandard.ZstdCompressor(level=10).compress(raw)
+
+    def decompress(data: bytes) -> bytes:
+        return zstandard.ZstdDecompressor().decompress(data)
+
+
+@dataclass(frozen=True)
+class ArchivedPayload:
+    bank: str
+    date: str
+    digest: str
+    format: str
+
+
+def _write_atomic(path: Path, data: bytes):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+    tmp.write_bytes(data)
+    os.replace(tmp, path)
+
+
+def _object_path(root: Path, digest: str) -> Path:
+    return root / "objects" / digest[:2] / f"{digest}.zst"
+
+
+def store(root: str, bank: str, day: str, raw: bytes, fmt: str) -> str:
+    """Archive ``raw`` for ``bank`` on ``day`` and return its digest."""
+    base = Path(root)
+    digest = hashlib.sha256(raw).hexdigest()
+    obj = _object_path(base, digest)
+    if not obj.exists():
+        _write_atomic(obj, compress(raw))
+    _write_atomic(base / "refs" / bank / day, f"{digest} {fmt}\n".encode())
+    return digest
+
+
+def load(root: str, digest: str) -> bytes:
+    return decompress(_object_path(Path(root), digest).read_bytes())
+
+
+def refs(
+    root: str,
+    start: Optional[date] = None,
+    end: Optional[date] = None,
+    bank: Optional[str] = None,
+) -> Iterator[ArchivedPayload]:
+    """Archived payloads, optionally filtered by date range and bank."""
+    refs_dir = Path(root) / "refs"
+    if not refs_dir.is_dir():
+        return
+    for bank_dir in sorted(refs_dir.iterdir()):
+        if not bank_dir.is_dir():
+            continue
+        if bank and bank_dir.name.lower() != bank.lower():
+            continue
+        for ref in sorted(bank_dir.iterdir()):
+            # Only date-named refs are ours (not temp files, editor backups)
+            try:
+                day = date.fromisoformat(ref.name)
+            except ValueError:
+                continue
+            if (start and day < start) or (end and day > end):
+                continue
+            try:
+                digest, fmt = ref.read_text().split()
+            except (OSError, ValueError):
+                continue
+            yield ArchivedPayload(bank_dir.name, ref.name, digest, fmt)
@@ -0,0 +1,160 @@
+"""Prometheus metrics for crawls, database access and the API."""
+
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Dict, Optional
+
+from prometheus_client import (
+    REGISTRY,
+    Counter,
+    Gauge,
+    Histogram,
+    generate_latest,
+    push_to_gateway,
+)
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from app.config import config
+from app.utils.logger import logger
+
+CRAWL_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 20, 30, 60, 120)
+API_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1)
+
+CRAWL_DURATION = Histogram(
+    "crawl_duration_seconds",
+    "Total crawl duration per bank",
+    ["bank"],
+    buckets=CRAWL_BUCKETS,
+)
+CRAWL_PHASE_DURATION = Histogram(
+    "crawl_phase_duration_seconds",
+    "Crawl duration per bank and phase "
+    "(connect, fetch, parse, browser_launch)",
+    ["bank", "phase"],
+    buckets=CRAWL_BUCKETS,
+)
+CRAWL_SUCCESS = Counter(
+    "crawl_success_total", "Successful crawls per bank", ["bank"]
+)
+CRAWL_FAILURES = Counter(
+    "crawl_failures_total",
+    "Failed crawls per bank and exception type",
+    ["bank", "exception"],
+)
+CRAWL_CURRENCIES = Gauge(
+    "crawl_currencies", "Currencies parsed in the last crawl", ["bank"]
+)
+CRAWL_THROTTLE_WAIT = Histogram(
+    "crawl_throttle_wait_seconds",
+    "Time a crawl request waited for its host's rate limit and slots",
+    ["host"],
+    buckets=CRAWL_BUCKETS,
+)
+CRAWL_CIRCUIT_OPEN = Counter(
+    "crawl_circuit_open_total",
+    "Times a host was backed off (failures or Retry-After)",
+    ["host"],
+)
+RATES_QUARANTINED = Counter(
+    "rates_quarantined_total",
+    "Crawled currencies held back by validation, per failed check",
+    ["bank", "check"],
+)
+BROWSER_START_SECONDS = Gauge(
+    "playwright_browser_start_seconds",
+    "Chromium launch time of the latest browser crawl in this process",
+)
+
+API_REQUEST_DURATION = Histogram(
+    "api_request_duration_seconds",
+    "API request latency per route",
+    ["method", "route", "status"],
+    buckets=API_BUCKETS,
+)
+API_DB_DURATION = Histogram(
+    "api_db_query_duration_seconds",
+    "Time spent in database queries per API request",
+    ["route"],
+    buckets=API_BUCKETS,
+)
+API_SERIALIZATION_DURATION = Histogram(
+    "api_serialization_duration_seconds",
+    "Time spent validating and serializing API responses",
+    ["route"],
+    buckets=API_BUCKETS,
+)
+
+DB_POOL_SIZE = Gauge(
+    "db_pool_size", "Configured connections per pool", ["pool"]
+)
+DB_POOL_CHECKED_OUT = Gauge(
+    "db_pool_checked_out", "Connections currently in use", ["pool"]
+)
+DB_POOL_OVERFLOW = Gauge(
+    "db_pool_overflow", "Connections open beyond the pool size", ["pool"]
+)
+DB_REPLICA_FALLBACKS = Counter(
+    "db_replica_fallbacks_total",
+    "API reads sent to the primary because the replica failed",
+)
+
+# Per-request timing accumulator, set by the API middleware. The dict is
+# shared by reference so threadpool-run endpoints can add to it.
+request_timings: ContextVar[Optional[Dict[str, float]]] = ContextVar(
+    "request_timings", default=None
+)
+
+
+@contextmanager
+def timed(histogram: Histogram, **labels):
+    """Observe the duration of the block on ``histogram``."""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        histogram.labels(**labels).observe(time.perf_counter() - start)
+
+
+@event.listens_for(Engine, "before_cursor_execute")
+def _before_cursor_execute(conn, cursor, statement, params, context, many):
+    # Kept on the execution context rather than conn.info: a failing
+    # statement never reaches after_cursor_execute, so nothing is left
+    # behind on the pooled connection.
+    if context is not None:
+        context._query_start = time.perf_counter()
+
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _after_cursor_execute(conn, cursor, statement, params, context, many):
+    start = getattr(context, "_query_start", None)
+    if start is None:
+        return
+    elapsed = time.perf_counter() - start
+    timings = request_timings.get()
+    if timings is not None:
+        timings["db"] = timings.get("db", 0.0) + elapsed
+
+
+def watch_pool(name: str, pool):
+    """Report a connection pool's usage on every scrape."""
+    DB_POOL_SIZE.labels(pool=name).set_function(pool.size)
+    DB_POOL_CHECKED_OUT.labels(pool=name).set_function(pool.checkedout)
+    DB_POOL_OVERFLOW.labels(pool=name).set_function(
+        lambda: max(pool.overflow(), 0)
+    )
+
+
+def latest() -> bytes:
+    return generate_latest(REGISTRY)
+
+
+def push_metrics(job: str):
+    """Push the registry to the Pushgateway, if one is configured."""
+    if not config.PUSHGATEWAY_URL:
+        return
+    try:
+        push_to_gateway(config.PUSHGATEWAY_URL, job=job, registry=REGISTRY)
+    except Exception as e:
+        logger.warning(f"Failed to push metrics - {e}")
@@ -1,15 +1,117 @@
+"""Check that Chromium is ready before the first Playwright crawl.
+
+Running ``playwright install`` on every start costs a subprocess and
+seconds of disk or network work even when the browser is present. The
+resolved executable is instead recorded in a marker next to the
+browsers, together with the Playwright version and the executable's
+size and mtime. A matching marker is enough on the next start; asking
+the driver for the path and installing are the fallback. No browser is
+launched here: :func:`launch` exports the start latency when a crawl
+first needs Chromium.
+"""
+
+import json
+import os
 import subprocess
 import sys
+import time
+from importlib.metadata import PackageNotFoundError, version
+from pathlib import Path
+from typing import Dict, Optional
+
+from app.config import config
+from app.utils import metrics
+from app.utils.logger import logger
+
+MARKER_NAME = ".chromium-ready.json"
+
+
+def marker_path() -> Path:
+    if config.PLAYWRIGHT_READY_MARKER:
+        return Path(config.PLAYWRIGHT_READY_MARKER)
+    # Same lookup as Playwright; "0" means inside the package itself
+    browsers = os.getenv("PLAYWRIGHT_BROWSERS_PATH")
+    if browsers and browsers != "0":
+        return Path(browsers) / MARKER_NAME
+    return Path.home() / ".cache" / "ms-playwright" / MARKER_NAME
+
+
+def fingerprint(executable: str) -> Optional[Dict]:
+    """What the marker records for ``executable``; None if it is missing."""
+    try:
+        stat = os.stat(executable)
+        playwright = version("playwright")
+    except (OSError, PackageNotFoundError):
+        return None
+    return {
+        "playwright": playwright,
+        "executable": executable,
+        "size": stat.st_size,
+        "mtime": stat.st_mtime_ns,
+    }
+
+
+def is_ready(marker: Path) -> bool:
+    """Whether ``marker`` still describes an installed browser."""
+    try:
+        recorded = json.loads(marker.read_text())
+        return fingerprint(recorded["executable"]) == recorded
+    except (OSError, ValueError, KeyError, TypeError):
+        return False
 
 
-def ensure_playwright_browsers():
-    """Install Playwright browsers if not already installed."""
+def _install():
     try:
         subprocess.run(
             [sys.executable, "-m", "playwright", "install", "chromium"],
             check=True,
             capture_output=True,
         )
-    except subprocess.CalledProcessError:
-        # Browsers already installed or restricted environment
-        pass
+    except subprocess.CalledProcessError as e:
+        # Restricted environment; the launch below reports the outcome
+        logger.warning(f"playwright install failed - {e.stderr!r}")
+
+
+def _write_marker(marker: Path, executable: str):
+    current = fingerprint(executable)
+    if current is None:
+        raise FileNotFoundError(executable)
+    try:
+        marker.parent.mkdir(parents=True, exist_ok=True)
+        tmp = marker.with_name(f".{marker.name}.{os.getpid()}.tmp")
+        tmp.write_text(json.dumps(current))
+        os.replace(tmp, marker)
+    except OSError as e:
+        logger.warning(f"Cannot write {marker} - {e}")
+
+
+def launch(chromium):
+    """Launch headless Chromium, exporting how long it took to start."""
+    start = time.perf_counter()
+    browser = chromium.launch(headless=True)
+    metrics.BROWSER_START_SECONDS.set(time.perf_counter() - start)
+    return browser
+
+
+def ensure_playwright_browsers() -> bool:
+    """Make sure Chromium is installed, installing it only if missing.
+
+    Returns False when Chromium is not usable; HTTP crawlers still run.
+    """
+    marker = marker_path()
+    if is_ready(marker):
+        return True
+
+    from playwright.sync_api import sync_playwright
+
+    try:
+        with sync_playwright() as p:
+            executable = p.chromium.executable_path
+            if not os.path.exists(executable):
+                logger.info("Chromium not found, installing")
+                _install()
+            _write_marker(marker, executable)
+    except Exception as e:
+        logger.warning(f"Chromium not ready - {e}")
+        return False
+    return True
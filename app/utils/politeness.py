@@ -0,0 +1,193 @@
+"""Per-host politeness for crawler requests.
+
+Every request a crawler sends goes through :data:`scheduler`:
+
+- a token bucket per host (``CRAWL_HOST_RPM``, ``CRAWL_HOST_BURST``)
+  spreads bursts such as range backfills over time;
+- at most ``CRAWL_HOST_MAX_IN_FLIGHT`` requests per host and
+  ``CRAWL_MAX_IN_FLIGHT`` overall are open at once;
+- a per-host circuit opens for ``CRAWL_CIRCUIT_COOLDOWN`` seconds after
+  ``CRAWL_CIRCUIT_FAILURES`` consecutive failures, or for as long as a
+  429/503 ``Retry-After`` asks. Requests to an open host wait when it
+  reopens within ``CRAWL_MAX_WAIT`` seconds and fail fast otherwise.
+
+Once the cooldown ends the next request is let through; if it fails the
+circuit opens again straight away, since the failure count is only
+reset by a success.
+"""
+
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Dict, Optional
+from urllib.parse import urlsplit
+
+from app.config import config
+from app.utils import metrics
+from app.utils.logger import logger
+
+
+class HostBlocked(Exception):
+    """The host's circuit stays open longer than a request may wait."""
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """Seconds to wait from a ``Retry-After`` header (delay or date)."""
+    if not value:
+        return None
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+    try:
+        until = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if until.tzinfo is None:
+        until = until.replace(tzinfo=timezone.utc)
+    return max(0.0, (until - datetime.now(timezone.utc)).total_seconds())
+
+
+class TokenBucket:
+    """Token bucket that hands out reservations instead of blocking.
+
+    ``reserve`` always takes a token, letting the balance go negative,
+    and returns how long the caller has to wait before using it; the
+    lock is never held while sleeping.
+    """
+
+    def __init__(self, rate: float, burst: int, clock=time.monotonic):
+        self.rate = rate
+        self.burst = burst
+        self.clock = clock
+        self.tokens = float(burst)
+        self.updated = clock()
+
+    def reserve(self) -> float:
+        now = self.clock()
+        self.tokens = min(
+            self.burst, self.tokens + (now - self.updated) * self.rate
+        )
+        self.updated = now
+        self.tokens -= 1
+        return 0.0 if self.tokens >= 0 else -self.tokens / self.rate
+
+
+class _Host:
+    def __init__(self, bucket: Optional[TokenBucket], max_in_flight: int):
+        self.bucket = bucket
+        self.in_flight = threading.BoundedSemaphore(max_in_flight)
+        self.lock = threading.Lock()
+        self.failures = 0
+        self.open_until = 0.0
+
+
+class HostScheduler:
+    def __init__(
+        self,
+        rpm: int = 60,
+        burst: int = 5,
+        host_in_flight: int = 2,
+        max_in_flight: int = 16,
+        failures: int = 3,
+        cooldown: float = 300,
+        max_wait: float = 60,
+        clock=time.monotonic,
+        sleep=time.sleep,
+    ):
+        # rpm <= 0 turns the rate limit off (in-flight caps still apply)
+        self.rate = rpm / 60
+        self.burst = burst
+        self.host_in_flight = host_in_flight
+        self.failures = failures
+        self.cooldown = cooldown
+        self.max_wait = max_wait
+        self.clock = clock
+        self.sleep = sleep
+        self._global = threading.BoundedSemaphore(max_in_flight)
+        self._hosts: Dict[str, _Host] = {}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_config(cls) -> "HostScheduler":
+        return cls(
+            rpm=config.CRAWL_HOST_RPM,
+            burst=config.CRAWL_HOST_BURST,
+            host_in_flight=config.CRAWL_HOST_MAX_IN_FLIGHT,
+            max_in_flight=config.CRAWL_MAX_IN_FLIGHT,
+            failures=config.CRAWL_CIRCUIT_FAILURES,
+            cooldown=config.CRAWL_CIRCUIT_COOLDOWN,
+            max_wait=config.CRAWL_MAX_WAIT,
+        )
+
+    def _host(self, url: str):
+        name = urlsplit(url).netloc.lower()
+        with self._lock:
+            host = self._hosts.get(name)
+            if host is None:
+                bucket = (
+                    TokenBucket(self.rate, self.burst, self.clock)
+                    if self.rate > 0
+                    else None
+                )
+                host = self._hosts[name] = _Host(bucket, self.host_in_flight)
+        return name, host
+
+    def blocked_for(self, url: str) -> float:
+        """Seconds until the host's circuit closes (0 when closed)."""
+        _, host = self._host(url)
+        return max(0.0, host.open_until - self.clock())
+
+    @contextmanager
+    def slot(self, url: str):
+        """Hold a request slot for ``url``'s host for the block."""
+        name, host = self._host(url)
+        blocked = self.blocked_for(url)
+        if blocked > self.max_wait:
+            raise HostBlocked(f"{name} is blocked for {blocked:.0f}s")
+
+        start = self.clock()
+        if blocked:
+            self.sleep(blocked)
+        with host.in_flight:
+            if host.bucket is not None:
+                with host.lock:
+                    delay = host.bucket.reserve()
+                if delay:
+                    self.sleep(delay)
+            with self._global:
+                metrics.CRAWL_THROTTLE_WAIT.labels(host=name).observe(
+                    self.clock() - start
+                )
+                yield
+
+    def record(
+        self,
+        url: str,
+        status: Optional[int] = None,
+        retry_after: Optional[str] = None,
+    ):
+        """Report how a request went; ``status=None`` for a network error."""
+        name, host = self._host(url)
+        if status is not None and status != 429 and status < 500:
+            with host.lock:
+                host.failures = 0
+            return
+
+        hold = parse_retry_after(retry_after)
+        with host.lock:
+            host.failures += 1
+            if hold is None and host.failures >= self.failures:
+                hold = self.cooldown
+            if not hold:
+                return
+            until = self.clock() + hold
+            if until <= host.open_until:
+                return
+            host.open_until = until
+        metrics.CRAWL_CIRCUIT_OPEN.labels(host=name).inc()
+        logger.warning(f"{name}: backing off for {hold:.0f}s")
+
+
+scheduler = HostScheduler.from_config()
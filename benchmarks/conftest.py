@@ -0,0 +1,114 @@
+"""Shared fixtures for the offline benchmark suite.
+
+Run with ``pytest benchmarks``; see README for saving and comparing
+baselines.
+"""
+
+import datetime
+import json
+from pathlib import Path
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, insert
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import NullPool
+
+from app.api.api import app
+from app.crawlers import ALL_CRAWLERS, KhanBank
+from app.db import repository
+from app.db.database import get_async_db, get_db
+from app.models.currency import Base, CurrencyRate
+from app.models.exchange_rate import plain_rates
+
+FIXTURES_DIR = Path(__file__).parent.parent / "tests" / "fixtures"
+ROW_COUNTS = [1_000, 10_000, 100_000]
+
+
+def load_payload(bank_name: str):
+    """Recorded payload for a bank, decoded the way its crawler sees it."""
+    path = next(FIXTURES_DIR.glob(f"{bank_name.lower()}.*"))
+    text = path.read_text(encoding="utf-8")
+    return json.loads(text) if path.suffix == ".json" else text
+
+
+@pytest.fixture(scope="session")
+def payloads():
+    return {c.BANK_NAME: load_payload(c.BANK_NAME) for c in ALL_CRAWLERS}
+
+
+@pytest.fixture(scope="session")
+def sample_rates():
+    crawler = KhanBank("2026-02-06")
+    return plain_rates(crawler._parse(load_payload("KhanBank")))
+
+
+def _seed(engine, rows: int, rates: dict):
+    banks = [c.BANK_NAME for c in ALL_CRAWLERS]
+    start = datetime.date(2000, 1, 1)
+    batch = []
+    with engine.begin() as conn:
+        for i in range(rows):
+            day = start + datetime.timedelta(days=i // len(banks))
+            batch.append(
+                {
+                    "bank_name": banks[i % len(banks)],
+                    "date": day,
+                    "rates": rates,
+                    "timestamp": datetime.datetime.combine(
+                        day, datetime.time(1, i % 60)
+                    ),
+                }
+            )
+            if len(batch) == 10_000:
+                conn.execute(insert(CurrencyRate), batch)
+                batch = []
+        if batch:
+            conn.execute(insert(CurrencyRate), batch)
+
+
+@pytest.fixture(scope="session", params=ROW_COUNTS, ids=lambda n: f"{n}rows")
+def seeded_session(request, tmp_path_factory, sample_rates):
+    path = tmp_path_factory.mktemp("bench") / "rates.db"
+    engine = create_engine(
+        f"sqlite:///{path}", connect_args={"check_same_thread": False}
+    )
+    Base.metadata.create_all(bind=engine)
+    _seed(engine, request.param, sample_rates)
+    Session = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+    with Session() as db:
+        repository.rebuild_latest(db)
+        db.commit()
+    yield Session
+    engine.dispose()
+
+
+@pytest.fixture
+def db(seeded_session):
+    session = seeded_session()
+    yield session
+    session.close()
+
+
+@pytest.fixture
+def client(seeded_session):
+    url = seeded_session.kw["bind"].url.set(drivername="sqlite+aiosqlite")
+    async_engine = create_async_engine(url, poolclass=NullPool)
+    AsyncSession = async_sessionmaker(bind=async_engine, autoflush=False)
+
+    def override():
+        session = seeded_session()
+        try:
+            yield session
+        finally:
+            session.close()
+
+    async def override_async():
+        async with AsyncSession() as session:
+            yield session
+
+    app.dependency_overrides[get_db] = override
+    app.dependency_overrides[get_async_db] = override_async
+    yield TestClient(app)
+    app.dependency_overrides.clear()
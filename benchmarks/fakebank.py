@@ -0,0 +1,182 @@
+"""Local stand-in for the bank endpoints, serving recorded payloads.
+
+Serves the files in ``tests/fixtures`` under the paths in
+``app.config.REPLAY_PATHS`` with configurable latency, error rate and
+payload size, so the crawl pipeline can be load-tested offline.
+
+Usage:
+    python -m benchmarks.fakebank --port 8765 --latency 0.2 --error-rate 0.05
+    CRAWL_REPLAY=http://127.0.0.1:8765 python main.py
+"""
+
+import argparse
+import json
+import random
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+
+from app.utils.logger import logger
+
+FIXTURES_DIR = Path(__file__).parent.parent / "tests" / "fixtures"
+CONTENT_TYPES = {
+    ".json": "application/json",
+    ".xml": "application/xml",
+    ".html": "text/html; charset=utf-8",
+}
+ENTRIES = {
+    ".xml": re.compile(r"(<Ccy>.*?</Ccy>)", re.S),
+    # Page body between <main> tags: rate tables and blocks
+    ".html": re.compile(
+        r'(?<=<main class="container">)(.*?)(?=</main>)', re.S
+    ),
+}
+
+
+def _scale(text: str, suffix: str, factor: int) -> str:
+    """Repeat the rate entries of a payload ``factor`` times."""
+    if factor <= 1:
+        return text
+    if suffix == ".json":
+
+        def grow(node):
+            if isinstance(node, list):
+                return [grow(item) for item in node] * factor
+            if isinstance(node, dict):
+                return {k: grow(v) for k, v in node.items()}
+            return node
+
+        return json.dumps(grow(json.loads(text)), ensure_ascii=False)
+    return ENTRIES[suffix].sub(lambda m: m.group(1) * factor, text)
+
+
+def load_payloads(scale: int = 1) -> Dict[str, Tuple[bytes, str]]:
+    """Map request path to (body, content type) for every bank fixture."""
+    payloads = {}
+    for path in FIXTURES_DIR.iterdir():
+        if path.suffix not in CONTENT_TYPES:
+            continue
+        text = _scale(path.read_text(encoding="utf-8"), path.suffix, scale)
+        payloads[f"/{path.stem}"] = (
+            text.encode("utf-8"),
+            CONTENT_TYPES[path.suffix],
+        )
+    # MBank logs in first, then queries /api?name=getCurrencyList
+    payloads["/mbank/api"] = payloads.pop("/mbank")
+    payloads["/mbank/api/login"] = (b"{}", CONTENT_TYPES[".json"])
+    return payloads
+
+
+class FakeBankServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(
+        self,
+        host: str = "127.0.0.1",
+        port: int = 0,
+        latency: float = 0.0,
+        jitter: float = 0.0,
+        error_rate: float = 0.0,
+        scale: int = 1,
+        seed: Optional[int] = None,
+    ):
+        super().__init__((host, port), _Handler)
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.payloads = load_payloads(scale)
+        self.random = random.Random(seed)
+        self.requests = 0
+        self._thread = None
+
+    @property
+    def url(self) -> str:
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> "FakeBankServer":
+        self._thread = threading.Thread(target=self.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.shutdown()
+        self.server_close()
+
+
+class _Handler(BaseHTTPRequestHandler):
+    server: FakeBankServer
+
+    def _respond(self):
+        path = self.path.split("?", 1)[0].rstrip("/") or "/"
+        payload = self.server.payloads.get(path)
+        if payload is None:
+            self.send_error(404)
+            return
+
+        server = self.server
+        server.requests += 1
+        delay = server.latency + server.random.uniform(0, server.jitter)
+        if delay:
+            time.sleep(delay)
+        if server.random.random() < server.error_rate:
+            self.send_error(503)
+            return
+
+        body, content_type = payload
+        self.send_response(200)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        self._respond()
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        self.rfile.read(length)
+        self._respond()
+
+    def log_message(self, format, *args):
+        pass
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument(
+        "--latency", type=float, default=0.0, help="seconds per request"
+    )
+    parser.add_argument(
+        "--jitter", type=float, default=0.0, help="extra random seconds"
+    )
+    parser.add_argument(
+        "--error-rate", type=float, default=0.0, help="share of 503s (0-1)"
+    )
+    parser.add_argument(
+        "--scale", type=int, default=1, help="repeat rate entries N times"
+    )
+    args = parser.parse_args()
+
+    server = FakeBankServer(
+        args.host,
+        args.port,
+        latency=args.latency,
+        jitter=args.jitter,
+        error_rate=args.error_rate,
+        scale=args.scale,
+    )
+    logger.info(f"Fake banks on {server.url} (CRAWL_REPLAY={server.url})")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
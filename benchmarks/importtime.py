@@ -0,0 +1,59 @@
+"""Import-time audit based on ``python -X importtime``.
+
+Usage:
+    python -m benchmarks.importtime                  # app.api.api
+    python -m benchmarks.importtime scripts.poll 30  # Module, top N
+"""
+
+import subprocess
+import sys
+from pathlib import Path
+from typing import Dict
+
+ROOT = Path(__file__).parent.parent
+
+# Never needed to serve the API (the bank registry is; crawlers are not)
+API_FORBIDDEN = (
+    "playwright",
+    "lxml",
+    "requests",
+    "numpy",
+    "app.crawlers.base",
+)
+
+
+def import_times(module: str) -> Dict[str, int]:
+    """Cumulative import time in microseconds per module, measured in a
+    fresh interpreter."""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=ROOT,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    times = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "[us]" in line:
+            continue
+        _, cumulative, name = line[len("import time:") :].split("|")
+        times[name.strip()] = int(cumulative)
+    return times
+
+
+def loaded(times: Dict[str, int], package: str) -> bool:
+    return any(n == package or n.startswith(package + ".") for n in times)
+
+
+def main():
+    module = sys.argv[1] if len(sys.argv) > 1 else "app.api.api"
+    top = int(sys.argv[2]) if len(sys.argv) > 2 else 20
+    times = import_times(module)
+    print(f"{module}: {times.get(module, 0) / 1000:.1f} ms")
+    top_level = {n: t for n, t in times.items() if "." not in n}
+    for name, us in sorted(top_level.items(), key=lambda i: -i[1])[:top]:
+        print(f"{us / 1000:9.1f} ms  {name}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,28 @@
+"""End-to-end API latency through the ASGI stack."""
+
+
+def test_rates(benchmark, client):
+    response = benchmark(client.get, "/rates", params={"limit": 100})
+    assert response.status_code == 200
+
+
+def test_rates_latest(benchmark, client):
+    response = benchmark(client.get, "/rates/latest")
+    assert response.status_code == 200
+
+
+def test_convert(benchmark, client):
+    params = {"bank": "KhanBank", "from": "eur", "to": "cny", "amount": 100}
+    response = benchmark(client.get, "/convert", params=params)
+    assert response.status_code == 200
+
+
+def test_rates_batch(benchmark, client):
+    banks = ["KhanBank", "TDBM", "XacBank", "GolomtBank"]
+    body = [
+        {"bank": bank, "date": f"2000-01-{day:02d}", "currency": "usd"}
+        for bank in banks
+        for day in range(1, 26)
+    ]
+    response = benchmark(client.post, "/rates/batch", json=body)
+    assert response.status_code == 200
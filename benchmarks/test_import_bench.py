@@ -0,0 +1,29 @@
+"""Cold-start cost of the process entry points."""
+
+import subprocess
+import sys
+
+import pytest
+
+from benchmarks.importtime import API_FORBIDDEN, ROOT, import_times, loaded
+
+
+def _cold_import(module: str):
+    subprocess.run(
+        [sys.executable, "-c", f"import {module}"], cwd=ROOT, check=True
+    )
+
+
+@pytest.mark.parametrize("module", ["app.api.api", "app.services.scraper"])
+def test_cold_import(benchmark, module):
+    benchmark.pedantic(_cold_import, args=(module,), rounds=5, iterations=1)
+
+
+def test_api_does_not_import_crawler_stack():
+    times = import_times("app.api.api")
+    assert [p for p in API_FORBIDDEN if loaded(times, p)] == []
+
+
+def test_poller_does_not_import_playwright():
+    times = import_times("scripts.poll")
+    assert not loaded(times, "playwright")
@@ -0,0 +1,37 @@
+"""Crawler parser and numeric helper throughput on recorded payloads."""
+
+import pytest
+
+from app.crawlers import ALL_CRAWLERS
+from app.crawlers.base import BaseCrawler
+
+CELLS = ["3,562.00", " 3 540.63 ", "3583.37\xa0", "-", "0", "", None, 23.41]
+
+
+@pytest.mark.parametrize(
+    "crawler_cls", ALL_CRAWLERS, ids=lambda c: c.BANK_NAME
+)
+def test_parse(benchmark, crawler_cls, payloads):
+    crawler = crawler_cls("2026-02-06")
+    rates = benchmark(crawler._parse, payloads[crawler_cls.BANK_NAME])
+    assert rates
+
+
+def test_parse_float(benchmark):
+    def run():
+        for value in CELLS * 125:
+            BaseCrawler.parse_float(value)
+
+    benchmark(run)
+
+
+def test_parse_floats(benchmark):
+    benchmark(BaseCrawler.parse_floats, CELLS * 125)
+
+
+def test_make_rate(benchmark):
+    def run():
+        for _ in range(1000):
+            BaseCrawler.make_rate(3540.63, 3583.37, 3551.31, 3572.69)
+
+    benchmark(run)
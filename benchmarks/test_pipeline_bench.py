@@ -0,0 +1,86 @@
+"""Crawl pipeline throughput against the local fake-bank server."""
+
+import datetime
+import importlib.util
+from pathlib import Path
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app import crawlers
+from app.config import REPLAY_PATHS, config
+from app.models.currency import Base
+from app.services import scraper
+from app.services.scraper import ScraperService
+from app.utils import politeness
+from benchmarks.fakebank import FakeBankServer
+
+LATENCY = 0.05
+
+
+def _browser_available() -> bool:
+    try:
+        from playwright.sync_api import sync_playwright
+
+        with sync_playwright() as p:
+            p.chromium.launch(headless=True).close()
+        return True
+    except Exception:
+        return False
+
+
+@pytest.fixture(scope="module")
+def fake_bank():
+    server = FakeBankServer(latency=LATENCY, seed=0).start()
+    yield server
+    server.stop()
+
+
+@pytest.fixture
+def replay(fake_bank, monkeypatch, tmp_path):
+    for attr, path in REPLAY_PATHS.items():
+        monkeypatch.setattr(config, attr, fake_bank.url + path)
+    monkeypatch.setattr(config, "ARIGBANK_BEARER_TOKEN", "replay")
+    # Every fake bank shares one host; measure the pipeline, not the limiter
+    monkeypatch.setattr(
+        politeness,
+        "scheduler",
+        politeness.HostScheduler(rpm=0, host_in_flight=64, max_in_flight=64),
+    )
+
+    engine = create_engine(f"sqlite:///{tmp_path / 'replay.db'}")
+    Base.metadata.create_all(bind=engine)
+    monkeypatch.setattr(scraper, "SessionLocal", sessionmaker(bind=engine))
+    yield fake_bank
+    engine.dispose()
+
+
+@pytest.fixture
+def http_only(monkeypatch):
+    monkeypatch.setattr(config, "CRAWL_BANKS", crawlers.HTTP_BANKS)
+
+
+def test_run_all_http(benchmark, replay, http_only):
+    # Today: banks without historical rates are skipped for past dates
+    service = ScraperService()
+    benchmark.pedantic(service.run_all, rounds=5)
+
+
+def test_backfill_http(benchmark, replay, http_only):
+    path = Path(__file__).parent.parent / "scripts" / "backfill.py"
+    spec = importlib.util.spec_from_file_location("backfill", path)
+    backfill = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(backfill)
+
+    start = datetime.date(2026, 2, 1)
+    end = datetime.date(2026, 2, 7)
+    benchmark.pedantic(backfill.backfill, args=(start, end), rounds=1)
+
+
+@pytest.mark.skipif(not _browser_available(), reason="Chromium missing")
+def test_run_all_browser(benchmark, replay, monkeypatch):
+    monkeypatch.setattr(config, "CRAWL_BANKS", crawlers.PLAYWRIGHT_BANKS)
+    service = ScraperService()
+    benchmark.pedantic(service.run_all, rounds=1)
+    assert replay.requests >= len(crawlers.PLAYWRIGHT_BANKS)
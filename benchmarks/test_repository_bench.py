@@ -0,0 +1,50 @@
+"""Repository write and read paths against SQLite of growing size."""
+
+import datetime
+import itertools
+
+from app.db import repository
+from app.models.exchange_rate import ExchangeRate
+
+
+def test_save_rates_update(benchmark, db, sample_rates):
+    data = ExchangeRate(date="2000-01-01", bank="KhanBank", rates=sample_rates)
+    benchmark(repository.save_rates, db, data)
+
+
+def test_save_rates_insert(benchmark, db, sample_rates):
+    days = itertools.count()
+    start = datetime.date(2100, 1, 1)
+
+    def run():
+        day = start + datetime.timedelta(days=next(days))
+        data = ExchangeRate(
+            date=day.isoformat(), bank="KhanBank", rates=sample_rates
+        )
+        repository.save_rates(db, data)
+
+    benchmark(run)
+
+
+def test_get_all_rates(benchmark, db):
+    assert len(benchmark(repository.get_all_rates, db, limit=100)) == 100
+
+
+def test_get_rates_by_bank(benchmark, db):
+    rows = benchmark(repository.get_rates_by_bank, db, "KhanBank", limit=100)
+    assert rows
+
+
+def test_get_rates_by_date(benchmark, db):
+    day = datetime.date(2000, 1, 2)
+    assert benchmark(repository.get_rates_by_date, db, day)
+
+
+def test_get_rates_by_bank_and_date(benchmark, db):
+    day = datetime.date(2000, 1, 2)
+    row = benchmark(repository.get_rates_by_bank_and_date, db, "TDBM", day)
+    assert row is not None
+
+
+def test_get_latest_rates(benchmark, db):
+    assert benchmark(repository.get_latest_rates, db)
@@ -1,10 +1,14 @@
+from app.db.database import init_db
 from app.services.scraper import ScraperService
+from app.utils.metrics import push_metrics
 from app.utils.playwright_setup import ensure_playwright_browsers
 
 
 def main():
     ensure_playwright_browsers()
+    init_db()
     ScraperService().run_all()
+    push_metrics("crawler")
 
 
 if __name__ == "__main__":
@@ -10,6 +10,7 @@ Usage:
 import sys
 from datetime import date, timedelta
 
+from app.db.database import init_db
 from app.services.scraper import ScraperService
 from app.utils.logger import logger
 
@@ -45,6 +46,7 @@ def main():
         logger.error("Start date must be <= end date")
         sys.exit(1)
 
+    init_db()
     backfill(start, end)
 
 
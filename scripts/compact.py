@@ -0,0 +1,26 @@
+#!/usr/bin/env python3
+"""Compact the rate tables (see app/services/retention.py).
+
+Drops intraday ticks and snapshots older than RETENTION_INTRADAY_DAYS,
+removes duplicate daily rows and moves years older than
+RETENTION_HOT_YEARS into the compressed archive table.
+
+Usage:
+    python scripts/compact.py
+"""
+
+from app.db.database import SessionLocal, init_db
+from app.services.retention import compact
+
+
+def main():
+    init_db()
+    db = SessionLocal()
+    try:
+        compact(db)
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
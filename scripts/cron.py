@@ -7,9 +7,11 @@ import time
 
 import schedule
 
-from app.db.database import init_db
+from app.db.database import SessionLocal, init_db
+from app.services.retention import compact
 from app.services.scraper import ScraperService
 from app.utils.logger import logger
+from app.utils.metrics import push_metrics
 from app.utils.playwright_setup import ensure_playwright_browsers
 
 
@@ -20,6 +22,17 @@ def job():
         logger.info("Crawl completed")
     except Exception as e:
         logger.error(f"Crawl failed: {e}")
+    push_metrics("crawler")
+
+
+def compact_job():
+    db = SessionLocal()
+    try:
+        compact(db)
+    except Exception as e:
+        logger.error(f"Compaction failed: {e}")
+    finally:
+        db.close()
 
 
 def main():
@@ -29,6 +42,7 @@ def main():
     # Run hourly to handle Heroku dyno restarts (every 24h)
     schedule.every().hour.do(job)
     logger.info("Scheduled hourly crawl job")
+    schedule.every().day.at("03:00").do(compact_job)
 
     logger.info("Running initial crawl")
     job()
@@ -0,0 +1,36 @@
+"""Intraday polling of the HTTP bank APIs.
+
+Crawls the HTTP banks registered with intraday freshness every
+POLL_INTERVAL seconds (default 300) and writes only the currencies whose
+rates changed to the intraday tick store. Playwright and daily banks are
+left to the hourly cron.
+"""
+
+import time
+
+from app.config import config
+from app.db.database import init_db
+from app.services.scraper import ScraperService
+from app.utils.logger import logger
+from app.utils.metrics import push_metrics
+
+
+def main():
+    init_db()
+    last_hashes = {}
+    logger.info(f"Polling HTTP banks every {config.POLL_INTERVAL}s")
+
+    while True:
+        started = time.monotonic()
+        try:
+            ScraperService().poll(last_hashes)
+        except Exception as e:
+            logger.error(f"Poll failed: {e}")
+        push_metrics("poller")
+        time.sleep(
+            max(0.0, config.POLL_INTERVAL - (time.monotonic() - started))
+        )
+
+
+if __name__ == "__main__":
+    main()
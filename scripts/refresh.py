@@ -0,0 +1,37 @@
+#!/usr/bin/env python3
+"""Re-crawl one bank now.
+
+Queues a job when CRAWL_QUEUE is on, otherwise crawls and saves inline.
+
+Usage:
+    python scripts/refresh.py KhanBank              # Today
+    python scripts/refresh.py KhanBank 2026-02-06   # A past date
+"""
+
+import sys
+
+from app.db.database import init_db
+from app.services.scraper import ScraperService
+from app.utils.logger import logger
+
+
+def main():
+    if len(sys.argv) < 2:
+        print(__doc__)
+        sys.exit(1)
+    bank = sys.argv[1]
+    day = sys.argv[2] if len(sys.argv) > 2 else None
+
+    init_db()
+    try:
+        error = ScraperService(date=day).refresh(bank)
+    except KeyError:
+        logger.error(f"Unknown bank: {bank}")
+        sys.exit(1)
+    if error:
+        logger.error(f"{bank}: refresh failed - {error}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+"""Re-run the current parsers over archived raw responses.
+
+Repairs stored rates after a parser fix without re-crawling. Requires
+ARCHIVE_DIR to point at the archive written by the crawlers. Re-parsed
+rates pass the same validation as crawled ones (VALIDATE_RATES), so a
+parser regression is quarantined instead of overwriting history;
+--no-validate saves them unchecked.
+
+Usage:
+    python scripts/reparse.py                          # Everything archived
+    python scripts/reparse.py 2026-01-01               # From date onwards
+    python scripts/reparse.py 2026-01-01 2026-01-15    # Date range
+    python scripts/reparse.py 2026-01-01 2026-01-15 TDBM  # One bank
+    python scripts/reparse.py --no-validate 2026-01-01    # Skip validation
+"""
+
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date
+from typing import Dict, List, Optional, Tuple
+
+from app import crawlers
+from app.config import config
+from app.db import repository
+from app.db.database import SessionLocal, init_db
+from app.models.exchange_rate import BankRates, plain_rates
+from app.services import validation
+from app.utils import archive
+from app.utils.logger import logger
+
+
+def parse_archived(
+    ref: archive.ArchivedPayload,
+) -> Tuple[archive.ArchivedPayload, Optional[Dict]]:
+    """Worker: decompress and parse one payload into plain dicts."""
+    crawler = crawlers.load(ref.bank)(ref.date)
+    try:
+        rates = crawler.parse_payload(
+            archive.load(config.ARCHIVE_DIR, ref.digest)
+        )
+    except Exception as e:
+        logger.error(f"{ref.bank} {ref.date}: re-parse failed - {e}")
+        return ref, None
+    return ref, plain_rates(rates)
+
+
+def screen(db, batch: List[BankRates]) -> List[BankRates]:
+    """Validate a batch day by day, as a crawl run would be."""
+    by_day: Dict[str, List[BankRates]] = {}
+    for item in batch:
+        by_day.setdefault(item.date, []).append(item)
+    kept = []
+    for day, items in by_day.items():
+        results = validation.screen(
+            db, day, [(item.bank, item.rates, None) for item in items]
+        )
+        kept += [
+            BankRates(day, name, rates)
+            for name, rates, error in results
+            if rates and not error
+        ]
+    return kept
+
+
+def reparse(
+    start: Optional[date] = None,
+    end: Optional[date] = None,
+    bank: Optional[str] = None,
+    batch_size: int = 500,
+    validate: bool = True,
+):
+    refs = list(archive.refs(config.ARCHIVE_DIR, start, end, bank))
+    logger.info(f"Re-parse: {len(refs)} archived payloads")
+
+    validate = validate and config.VALIDATE_RATES
+    db = SessionLocal()
+    saved = failed = held = 0
+    batch = []
+
+    def flush(batch: List[BankRates]) -> int:
+        nonlocal held
+        if validate:
+            kept = screen(db, batch)
+            held += len(batch) - len(kept)
+            batch = kept
+        return repository.save_rates_bulk(db, batch)
+
+    try:
+        with ProcessPoolExecutor() as executor:
+            for ref, rates in executor.map(parse_archived, refs, chunksize=16):
+                if not rates:
+                    failed += 1
+                    continue
+                batch.append(BankRates(ref.date, ref.bank, rates))
+                if len(batch) >= batch_size:
+                    saved += flush(batch)
+                    batch = []
+        if batch:
+            saved += flush(batch)
+    finally:
+        db.close()
+
+    logger.info(
+        f"Re-parse done: {saved} changed, {held} held back by validation, "
+        f"{failed} failed or empty"
+    )
+
+
+def main():
+    if not config.ARCHIVE_DIR:
+        logger.error("ARCHIVE_DIR is not configured")
+        sys.exit(1)
+
+    args = [arg for arg in sys.argv[1:] if arg != "--no-validate"]
+    validate = len(args) == len(sys.argv) - 1
+    start = date.fromisoformat(args[0]) if len(args) >= 1 else None
+    end = date.fromisoformat(args[1]) if len(args) >= 2 else None
+    bank = args[2] if len(args) >= 3 else None
+
+    init_db()
+    reparse(start, end, bank, validate=validate)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,47 @@
+#!/usr/bin/env python3
+"""Run crawl job workers (see app/services/jobs.py).
+
+With CRAWL_QUEUE=true, cron, backfill and refresh only enqueue jobs in
+``crawl_jobs``; these processes claim and run them. Each process crawls
+one bank at a time, so N processes run up to N browsers on N cores.
+
+Usage:
+    python scripts/worker.py            # CRAWL_QUEUE_WORKERS processes
+    python scripts/worker.py 4          # 4 processes
+    python scripts/worker.py 1 --drain  # Run what is due, then exit
+"""
+
+import multiprocessing
+import sys
+
+from app.config import config
+from app.db.database import init_db
+from app.services.worker import work
+from app.utils.logger import logger
+
+
+def main():
+    args = [a for a in sys.argv[1:] if not a.startswith("--")]
+    drain = "--drain" in sys.argv
+    processes = int(args[0]) if args else config.CRAWL_QUEUE_WORKERS
+
+    init_db()
+    if processes <= 1:
+        work(drain=drain)
+        return
+
+    logger.info(f"Starting {processes} crawl workers")
+    # Fresh interpreters: no engine or Playwright state crosses a fork
+    ctx = multiprocessing.get_context("spawn")
+    workers = [
+        ctx.Process(target=work, kwargs={"drain": drain})
+        for _ in range(processes)
+    ]
+    for process in workers:
+        process.start()
+    for process in workers:
+        process.join()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,22 +1,32 @@
+from pathlib import Path
+
 import pytest
 from fastapi.testclient import TestClient
 from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
 from sqlalchemy.orm import sessionmaker
-from sqlalchemy.pool import StaticPool
+from sqlalchemy.pool import NullPool
 
 from app.api.api import app
-from app.db.database import get_db
+from app.db.database import get_async_db, get_db
 from app.models.currency import Base
 
+FIXTURES_DIR = Path(__file__).parent / "fixtures"
+
 
 @pytest.fixture(scope="function")
-def test_db():
+def test_db(tmp_path):
+    # A file database, so the API's async engine sees the same data
+    path = tmp_path / "test.db"
     engine = create_engine(
-        "sqlite:///:memory:",
-        connect_args={"check_same_thread": False},
-        poolclass=StaticPool,
+        f"sqlite:///{path}", connect_args={"check_same_thread": False}
+    )
+    # Each TestClient request runs on its own event loop
+    async_engine = create_async_engine(
+        f"sqlite+aiosqlite:///{path}", poolclass=NullPool
     )
     TestSession = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+    AsyncTestSession = async_sessionmaker(bind=async_engine, autoflush=False)
     Base.metadata.create_all(bind=engine)
 
     def override():
@@ -26,11 +36,16 @@ def test_db():
         finally:
             db.close()
 
+    async def override_async():
+        async with AsyncTestSession() as db:
+            yield db
+
     app.dependency_overrides[get_db] = override
+    app.dependency_overrides[get_async_db] = override_async
     db = TestSession()
     yield db
     db.close()
-    Base.metadata.drop_all(bind=engine)
+    engine.dispose()
     app.dependency_overrides.clear()
 
 
@@ -85,3 +100,13 @@ def sample_golomt_response():
             },
         }
     }
+
+
+@pytest.fixture
+def load_fixture():
+    """Read a recorded bank payload from tests/fixtures."""
+
+    def load(name: str) -> str:
+        return (FIXTURES_DIR / name).read_text(encoding="utf-8")
+
+    return load
@@ -1,6 +1,12 @@
 import datetime
+from unittest.mock import patch
 
+from sqlalchemy.orm import sessionmaker
+
+from app.db import repository
 from app.models.currency import CurrencyRate
+from app.models.exchange_rate import ExchangeRate
+from app.services.stream import RateBroadcaster
 
 
 class TestRootEndpoint:
@@ -84,6 +90,22 @@ class TestRatesByBankEndpoints:
         response = client.get("/rates/bank/NonExistent")
         assert response.status_code == 404
 
+    def test_bank_name_is_case_insensitive(
+        self, client, test_db, sample_rate_data
+    ):
+        test_db.add(
+            CurrencyRate(
+                bank_name="KhanBank",
+                date=datetime.date.today(),
+                rates=sample_rate_data,
+            )
+        )
+        test_db.commit()
+
+        response = client.get("/rates/bank/khanbank")
+        assert response.json()[0]["bank_name"] == "KhanBank"
+        assert "бүртгэлгүй" in client.get("/rates/bank/NoBank").text
+
 
 class TestRatesByDateEndpoints:
     def test_get_rates_by_date(self, client, test_db, sample_rate_data):
@@ -123,3 +145,206 @@ class TestRatesByBankAndDate:
     def test_get_rate_not_found(self, client):
         response = client.get("/rates/bank/KhanBank/date/2020-01-01")
         assert response.status_code == 404
+
+
+class TestIntradayEndpoint:
+    def test_intraday_returns_changed_currencies(
+        self, client, test_db, sample_rate_data
+    ):
+        day = "2026-02-06"
+        data = ExchangeRate(date=day, bank="KhanBank", rates=sample_rate_data)
+        repository.save_rates(test_db, data)
+        moved = dict(sample_rate_data)
+        moved["usd"] = {
+            "cash": {"buy": 3421.0, "sell": 3451.0},
+            "noncash": {"buy": 3416.0, "sell": 3456.0},
+        }
+        data = ExchangeRate(date=day, bank="KhanBank", rates=moved)
+        repository.save_rates(test_db, data)
+
+        response = client.get(f"/rates/bank/KhanBank/intraday?date={day}")
+        assert response.status_code == 200
+        ticks = response.json()
+        assert [t["currency"] for t in ticks] == ["usd", "eur", "usd"]
+        assert ticks[-1]["rates"]["cash"]["buy"] == 3421.0
+
+    def test_intraday_not_found(self, client):
+        response = client.get("/rates/bank/KhanBank/intraday?date=2020-01-01")
+        assert response.status_code == 404
+
+
+class TestConversionEndpoints:
+    def _save(self, test_db, sample_rate_data):
+        data = ExchangeRate(
+            date="2026-02-06", bank="KhanBank", rates=sample_rate_data
+        )
+        repository.save_rates(test_db, data)
+
+    def test_convert_through_mnt(self, client, test_db, sample_rate_data):
+        self._save(test_db, sample_rate_data)
+
+        response = client.get(
+            "/convert",
+            params={"bank": "KhanBank", "from": "EUR", "to": "usd"},
+        )
+
+        assert response.status_code == 200
+        data = response.json()
+        # Bank buys EUR cash at 3720 and sells USD cash at 3450
+        assert data["rate"] == 3720.0 / 3450.0
+        assert data["from"] == "eur"
+        assert data["date"] == "2026-02-06"
+
+    def test_convert_amount_and_kind(self, client, test_db, sample_rate_data):
+        self._save(test_db, sample_rate_data)
+
+        data = client.get(
+            "/convert",
+            params={
+                "bank": "KhanBank",
+                "from": "usd",
+                "to": "mnt",
+                "amount": 10,
+                "kind": "noncash",
+            },
+        ).json()
+
+        assert data["result"] == 34150.0
+
+    def test_convert_unknown_currency(self, client, test_db, sample_rate_data):
+        self._save(test_db, sample_rate_data)
+
+        response = client.get(
+            "/convert", params={"bank": "KhanBank", "from": "usd", "to": "xyz"}
+        )
+
+        assert response.status_code == 404
+
+    def test_matrix_has_mnt_row(self, client, test_db, sample_rate_data):
+        self._save(test_db, sample_rate_data)
+
+        data = client.get("/rates/matrix/KhanBank").json()
+
+        assert data["currencies"] == ["mnt", "eur", "usd"]
+        assert data["matrix"][0][0] == 1.0
+        assert data["matrix"][2][0] == 3420.5
+
+    def test_matrix_unknown_bank(self, client):
+        assert client.get("/rates/matrix/NoBank").status_code == 404
+
+
+class TestAsOfLookup:
+    def _save(self, test_db, rates, bank, day):
+        data = ExchangeRate(date=day, bank=bank, rates=rates)
+        repository.save_rates(test_db, data)
+
+    def test_weekend_returns_previous_business_day(
+        self, client, test_db, sample_rate_data
+    ):
+        self._save(test_db, sample_rate_data, "KhanBank", "2026-02-05")
+        self._save(test_db, sample_rate_data, "KhanBank", "2026-02-06")
+        self._save(test_db, sample_rate_data, "KhanBank", "2026-02-09")
+
+        url = "/rates/bank/KhanBank/date/2026-02-08"
+        assert client.get(url).status_code == 404
+        response = client.get(url, params={"as_of": True})
+
+        assert response.status_code == 200
+        assert response.json()["date"] == "2026-02-06"
+
+    def test_as_of_for_all_banks(self, client, test_db, sample_rate_data):
+        self._save(test_db, sample_rate_data, "KhanBank", "2026-02-06")
+        self._save(test_db, sample_rate_data, "TDBM", "2026-02-04")
+        self._save(test_db, sample_rate_data, "XacBank", "2026-02-10")
+
+        response = client.get("/rates/date/2026-02-08", params={"as_of": 1})
+
+        assert response.status_code == 200
+        dates = {r["bank_name"]: r["date"] for r in response.json()}
+        assert dates == {"KhanBank": "2026-02-06", "TDBM": "2026-02-04"}
+
+    def test_as_of_before_any_data(self, client, test_db, sample_rate_data):
+        self._save(test_db, sample_rate_data, "KhanBank", "2026-02-06")
+
+        response = client.get(
+            "/rates/bank/KhanBank/date/2026-01-01", params={"as_of": True}
+        )
+
+        assert response.status_code == 404
+
+
+class TestBatchEndpoint:
+    def test_results_in_request_order_with_misses(
+        self, client, test_db, sample_rate_data
+    ):
+        for bank in ("KhanBank", "TDBM"):
+            data = ExchangeRate(
+                date="2026-02-06", bank=bank, rates=sample_rate_data
+            )
+            repository.save_rates(test_db, data)
+
+        response = client.post(
+            "/rates/batch",
+            json=[
+                {"bank": "TDBM", "date": "2026-02-06", "currency": "USD"},
+                {"bank": "KhanBank", "date": "2026-02-05"},
+                {"bank": "KhanBank", "date": "2026-02-06"},
+                {"bank": "TDBM", "date": "2026-02-06", "currency": "xyz"},
+            ],
+        )
+
+        assert response.status_code == 200
+        results = response.json()
+        assert [r["found"] for r in results] == [True, False, True, False]
+        assert list(results[0]["rates"]) == ["usd"]
+        assert results[1]["rates"] is None
+        assert set(results[2]["rates"]) == {"usd", "eur"}
+
+    def test_bank_names_are_normalised(
+        self, client, test_db, sample_rate_data
+    ):
+        data = ExchangeRate(
+            date="2026-02-06", bank="KhanBank", rates=sample_rate_data
+        )
+        repository.save_rates(test_db, data)
+
+        response = client.post(
+            "/rates/batch", json=[{"bank": "khanbank", "date": "2026-02-06"}]
+        )
+        assert response.json()[0]["found"] is True
+        assert response.json()[0]["bank"] == "KhanBank"
+
+        unknown = [{"bank": "NoBank", "date": "2026-02-06"}]
+        assert client.post("/rates/batch", json=unknown).status_code == 404
+
+    def test_rejects_empty_batch(self, client):
+        assert client.post("/rates/batch", json=[]).status_code == 422
+
+
+class TestMetricsEndpoint:
+    def test_metrics_exposes_route_latency(self, client):
+        client.get("/rates")
+        response = client.get("/metrics")
+        assert response.status_code == 200
+        body = response.text
+        assert 'api_request_duration_seconds_count{method="GET"' in body
+        assert 'route="/rates"' in body
+        assert "api_db_query_duration_seconds" in body
+        assert "api_serialization_duration_seconds" in body
+
+    def test_metrics_exposes_pool_usage(self, client):
+        body = client.get("/metrics").text
+        assert 'db_pool_checked_out{pool="primary"}' in body
+
+
+class TestRatesWebSocket:
+    def test_unsubscribes_on_disconnect(self, client, test_db):
+        factory = sessionmaker(bind=test_db.get_bind())
+        broadcaster = RateBroadcaster(session_factory=factory, interval=0.05)
+
+        with patch("app.api.api.broadcaster", broadcaster):
+            with client.websocket_connect("/rates/ws") as websocket:
+                assert len(broadcaster._subscribers) == 1
+                websocket.close()
+
+        assert not broadcaster._subscribers
@@ -0,0 +1,75 @@
+import json
+from datetime import date
+from unittest.mock import MagicMock, patch
+
+from app.crawlers import TDBM, KhanBank
+from app.utils import archive
+
+
+class TestArchiveStore:
+    def test_duplicate_payloads_stored_once(self, tmp_path):
+        d1 = archive.store(
+            str(tmp_path), "KhanBank", "2026-01-01", b"{}", "json"
+        )
+        d2 = archive.store(
+            str(tmp_path), "KhanBank", "2026-01-02", b"{}", "json"
+        )
+
+        assert d1 == d2
+        assert len(list((tmp_path / "objects").rglob("*.zst"))) == 1
+        assert archive.load(str(tmp_path), d1) == b"{}"
+
+    def test_ref_points_at_last_payload(self, tmp_path):
+        root = str(tmp_path)
+        archive.store(root, "XacBank", "2026-01-01", b'{"docs": []}', "json")
+        last = archive.store(root, "XacBank", "2026-01-01", b"{}", "json")
+
+        refs = list(archive.refs(root))
+        assert len(refs) == 1
+        assert refs[0].digest == last
+
+    def test_refs_filtered_by_date_and_bank(self, tmp_path):
+        root = str(tmp_path)
+        archive.store(root, "KhanBank", "2026-01-01", b"a", "json")
+        archive.store(root, "KhanBank", "2026-02-01", b"b", "json")
+        archive.store(root, "TDBM", "2026-02-01", b"c", "html")
+
+        refs = list(archive.refs(root, start=date(2026, 1, 15)))
+        assert {r.bank for r in refs} == {"KhanBank", "TDBM"}
+        assert list(archive.refs(root, bank="tdbm"))[0].format == "html"
+
+    def test_refs_skip_stray_files(self, tmp_path):
+        root = str(tmp_path)
+        archive.store(root, "KhanBank", "2026-01-01", b"a", "json")
+        bank_dir = tmp_path / "refs" / "KhanBank"
+        (bank_dir / "2026-01-01~").write_text("backup")
+        (bank_dir / ".2026-01-02.123.tmp").write_text("")
+        (bank_dir / "2026-01-03").write_text("truncated")
+        (tmp_path / "refs" / "README").write_text("notes")
+
+        assert [r.date for r in archive.refs(root)] == ["2026-01-01"]
+
+
+class TestCrawlerArchive:
+    @patch("app.crawlers.base.config")
+    @patch("app.crawlers.base.requests.get")
+    def test_crawl_archives_and_reparses(
+        self, mock_get, mock_config, tmp_path, sample_khanbank_response
+    ):
+        mock_config.ARCHIVE_DIR = str(tmp_path)
+        raw = json.dumps(sample_khanbank_response).encode()
+        mock_resp = MagicMock(ok=True, status_code=200, content=raw)
+        mock_resp.json.return_value = sample_khanbank_response
+        mock_resp.elapsed.total_seconds.return_value = 0.1
+        mock_get.return_value = mock_resp
+
+        rates = KhanBank("2026-01-01").crawl()
+
+        (ref,) = archive.refs(str(tmp_path))
+        payload = archive.load(str(tmp_path), ref.digest)
+        assert KhanBank(ref.date).parse_payload(payload) == rates
+
+    def test_html_payload_reparse(self, load_fixture):
+        raw = load_fixture("tdbm.html").encode("utf-8")
+        rates = TDBM("2026-02-06").parse_payload(raw)
+        assert rates["usd"].cash.buy == 3540.63
@@ -0,0 +1,94 @@
+import os
+from concurrent.futures import Future, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from app.models.exchange_rate import RatePair, RateRecord
+from app.services import browser_pool
+from app.services.scraper import ScraperService
+
+USD = RateRecord(cash=RatePair(3400.0, 3450.0))
+
+
+@pytest.mark.skipif(not os.path.isdir("/proc"), reason="needs /proc")
+def test_rss_counts_this_process():
+    assert browser_pool.rss_mb() > 0
+
+
+class TestParent:
+    def test_rates_return_as_plain_dicts(self, monkeypatch):
+        monkeypatch.setattr(
+            browser_pool, "_crawl", lambda bank, day: {"usd": USD.to_dict()}
+        )
+        with ThreadPoolExecutor(1) as pool:
+            monkeypatch.setattr(browser_pool, "executor", lambda: pool)
+            rates = browser_pool.crawl("TDBM", "2026-02-06")
+
+        assert rates == {"usd": USD}
+
+    def test_dead_worker_discards_pool(self, monkeypatch):
+        future = Future()
+        future.set_exception(BrokenProcessPool("worker died"))
+        pool = MagicMock()
+        pool.submit.return_value = future
+        monkeypatch.setattr(browser_pool, "_executor", pool)
+
+        with pytest.raises(BrokenProcessPool):
+            browser_pool.crawl("TDBM", "2026-02-06")
+
+        assert browser_pool._executor is None
+        pool.shutdown.assert_called_once()
+
+
+class TestWorker:
+    def test_browser_reused_and_relaunched_over_memory_cap(self, monkeypatch):
+        browser = MagicMock()
+        browser.is_connected.return_value = True
+        crawler_cls = MagicMock()
+        crawler_cls.return_value.crawl.return_value = {"usd": USD}
+        spec = MagicMock()
+        spec.load.return_value = crawler_cls
+        monkeypatch.setattr(browser_pool, "_browser", browser)
+        monkeypatch.setattr(
+            browser_pool.config, "PLAYWRIGHT_PROCESS_MAX_MB", 0
+        )
+
+        with patch("app.crawlers.registry.get", return_value=spec):
+            data = browser_pool._crawl("TDBM", "2026-02-06")
+
+        assert data == {"usd": USD.to_dict()}
+        crawler_cls.return_value.crawl.assert_called_once_with(browser=browser)
+        browser.close.assert_called_once()
+        assert browser_pool._browser is None
+
+
+@patch.object(ScraperService, "_save", return_value=set())
+@patch.object(ScraperService, "_validate", side_effect=lambda r: r)
+@patch.object(ScraperService, "_record_start", return_value={})
+def test_browser_banks_run_in_processes(_, __, ___, monkeypatch):
+    monkeypatch.setattr(browser_pool.config, "PLAYWRIGHT_PROCESSES", 2)
+    monkeypatch.setattr(browser_pool.config, "CRAWL_BANKS", ["TDBM"])
+
+    with patch.object(
+        browser_pool, "crawl", return_value={"usd": USD}
+    ) as remote:
+        ScraperService().run_all()
+
+    remote.assert_called_once()
+    assert remote.call_args.args[0] == "TDBM"
+
+
+def test_http_crawlers_stay_in_threads():
+    from app.crawlers import MBank, registry
+
+    with (
+        patch.object(browser_pool, "crawl") as remote,
+        patch.object(MBank, "crawl", return_value={"usd": USD}),
+    ):
+        _, rates, error = ScraperService()._execute(MBank, remote=True)
+
+    remote.assert_not_called()
+    assert rates == {"usd": USD} and error is None
+    assert registry.get("MBank").transport == registry.HTTP
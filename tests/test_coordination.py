@@ -0,0 +1,61 @@
+from datetime import date, timedelta
+from unittest.mock import patch
+
+from sqlalchemy.orm import sessionmaker
+
+from app.models.currency import CrawlLease, utc_now
+from app.models.exchange_rate import CurrencyDetail
+from app.services import coordination, scraper
+from app.services.scraper import ScraperService
+
+DAY = date(2026, 2, 6)
+SLOT = coordination.current_slot(3600, now=1_770_000_000)
+
+
+class TestLeases:
+    def test_only_one_worker_gets_a_lease(self, test_db):
+        assert coordination.claim(test_db, "KhanBank", DAY, SLOT, "a")
+        assert not coordination.claim(test_db, "KhanBank", DAY, SLOT, "b")
+        assert coordination.claim(test_db, "KhanBank", DAY, SLOT + 3600, "b")
+        assert coordination.claim(test_db, "TDBM", DAY, SLOT, "b")
+
+    def test_released_lease_can_be_retried(self, test_db):
+        coordination.claim(test_db, "KhanBank", DAY, SLOT, "a")
+        coordination.release(test_db, "KhanBank", DAY, SLOT, "a")
+
+        assert coordination.claim(test_db, "KhanBank", DAY, SLOT, "b")
+
+    def test_expired_lease_taken_over_unless_done(self, test_db):
+        coordination.claim(test_db, "KhanBank", DAY, SLOT, "a")
+        coordination.claim(test_db, "TDBM", DAY, SLOT, "a")
+        coordination.finish(test_db, "TDBM", DAY, SLOT, "a")
+        for lease in test_db.query(CrawlLease):
+            lease.expires_at = utc_now() - timedelta(seconds=1)
+        test_db.commit()
+
+        assert coordination.claim(test_db, "KhanBank", DAY, SLOT, "b")
+        assert not coordination.claim(test_db, "TDBM", DAY, SLOT, "b")
+        assert test_db.get(CrawlLease, ("KhanBank", DAY, SLOT)).owner == "b"
+
+
+class TestShardedCrawl:
+    @patch.object(ScraperService, "_save", return_value=set())
+    @patch.object(ScraperService, "_execute")
+    def test_second_worker_skips_leased_banks(
+        self, mock_execute, mock_save, test_db, monkeypatch
+    ):
+        monkeypatch.setattr(scraper.config, "CRAWL_LEASES", True)
+        monkeypatch.setattr(scraper.config, "CRAWL_BANKS", ["KhanBank"])
+        monkeypatch.setattr(
+            scraper, "SessionLocal", sessionmaker(bind=test_db.get_bind())
+        )
+        usd = {"usd": CurrencyDetail()}
+        mock_execute.return_value = ("KhanBank", usd, None)
+
+        ScraperService(DAY.isoformat()).run_all()
+        with patch.object(coordination, "OWNER", "other-worker"):
+            ScraperService(DAY.isoformat()).run_all()
+
+        mock_execute.assert_called_once()
+        lease = test_db.query(CrawlLease).one()
+        assert lease.done
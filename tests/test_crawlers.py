@@ -1,6 +1,8 @@
 import datetime
 from unittest.mock import MagicMock, patch
 
+import pytest
+
 from app.crawlers import (
     ArigBank,
     CapitronBank,
@@ -195,6 +197,37 @@ class TestBaseCrawler:
         assert BaseCrawler.parse_float(" 3420.5 ") == 3420.5
         assert BaseCrawler.parse_float("3 420.5") == 3420.5
 
+    def test_parse_floats_column(self):
+        column = ["3,420.5", "3\xa0450", "\u2014", "0.00", "n/a", 23, None]
+        assert BaseCrawler.parse_floats(column) == [
+            3420.5,
+            3450.0,
+            None,
+            None,
+            None,
+            23.0,
+            None,
+        ]
+
+    def test_parse_floats_lxml_text(self):
+        from lxml import html
+
+        # xpath text() returns str subclasses (_ElementUnicodeResult)
+        column = html.fromstring("<td>3,450.50</td>").xpath("//td/text()")
+        assert BaseCrawler.parse_floats(column) == [3450.5]
+
+    def test_make_rates_parses_rows_together(self):
+        rates = BaseCrawler.make_rates(
+            [
+                ("usd", "3,420.5", "3,450", None, "-"),
+                ("eur", "3720", "3780", "3715", "3785"),
+                ("usd", "3,421", "3,451", "3416", "3456"),
+            ]
+        )
+        assert list(rates) == ["usd", "eur"]
+        assert rates["usd"].cash.buy == 3421.0
+        assert rates["eur"].noncash.sell == 3785.0
+
     def test_make_rate(self):
         rate = BaseCrawler.make_rate(
             cash_buy=3420.5,
@@ -251,6 +284,145 @@ class TestAllCrawlersImport:
         for bank in expected_banks:
             assert bank in CRAWLER_MAP
 
+    def test_registry_names_match_classes(self):
+        from app import crawlers
+
+        for name in crawlers.ALL_BANKS:
+            assert crawlers.load(name.lower()).BANK_NAME == name
+
+    def test_unknown_bank_raises(self):
+        from app import crawlers
+
+        with pytest.raises(KeyError):
+            crawlers.load("NoBank")
+
+
+class TestRegistry:
+    def test_past_date_skips_banks_without_history(self):
+        from app.crawlers import registry
+
+        past = {s.name for s in registry.select(day="2020-01-01")}
+        assert "KhanBank" in past
+        assert "StateBank" not in past
+        assert len(registry.select()) == 13
+
+    def test_crawl_banks_and_freshness_filters(self, monkeypatch):
+        from app.config import config
+        from app.crawlers import registry
+
+        polled = registry.select(transport="http", freshness="intraday")
+        assert "MongolBank" not in {s.name for s in polled}
+
+        monkeypatch.setattr(config, "CRAWL_BANKS", ["tdbm", "KhanBank"])
+        assert [s.name for s in registry.select()] == ["KhanBank", "TDBM"]
+
+    def test_entry_point_plugin(self):
+        from app.crawlers import registry
+
+        plugin = registry.CrawlerSpec("SomeMFI", "some_mfi.crawler")
+        ep = MagicMock()
+        ep.load.return_value = plugin
+        registry.specs.cache_clear()
+        try:
+            with patch.object(registry, "entry_points", return_value=[ep]):
+                assert registry.get("somemfi") is plugin
+                assert registry.names()[-1] == "SomeMFI"
+        finally:
+            registry.specs.cache_clear()
+
+
+class TestPlaywrightParsers:
+    """Parse recorded pages the way the crawler sees rendered HTML."""
+
+    def test_tdbm_parse(self, load_fixture):
+        from app.crawlers import TDBM
+
+        rates = TDBM("2026-02-06")._parse(load_fixture("tdbm.html"))
+        assert len(rates) == 18
+        assert rates["usd"].cash.buy == 3540.63
+        assert rates["usd"].noncash.sell == 3572.69
+
+    def test_bogdbank_parse(self, load_fixture):
+        from app.crawlers import BogdBank
+
+        rates = BogdBank("2026-02-06")._parse(load_fixture("bogdbank.html"))
+        assert rates["usd"].cash.sell == 3583.37
+
+    def test_ckbank_parse(self, load_fixture):
+        from app.crawlers import CKBank
+
+        rates = CKBank("2026-02-06")._parse(load_fixture("ckbank.html"))
+        assert rates["eur"].noncash.buy is not None
+        assert "usd" in rates
+
+    def test_nibank_parse(self, load_fixture):
+        from app.crawlers import NIBank
+
+        rates = NIBank("2026-02-06")._parse(load_fixture("nibank.html"))
+        assert rates["usd"].cash.buy == 3540.63
+        assert rates["usd"].noncash.sell == 3572.69
+
+    @pytest.mark.parametrize(
+        "bank, fixture",
+        [
+            ("TDBM", "tdbm.html"),
+            ("BogdBank", "bogdbank.html"),
+            ("CKBank", "ckbank.html"),
+            ("NIBank", "nibank.html"),
+            ("TransBank", "transbank.html"),
+        ],
+    )
+    def test_crawl_with_browser(self, bank, fixture, load_fixture):
+        from app import crawlers
+
+        browser = MagicMock()
+        page = browser.new_context.return_value.new_page.return_value
+        page.content.return_value = load_fixture(fixture)
+
+        rates = crawlers.load(bank)("2026-02-06").crawl(browser=browser)
+
+        assert rates["usd"].cash.buy is not None
+        browser.new_context.return_value.close.assert_called_once()
+
+    def test_nibank_value_split_over_spans(self):
+        from app.crawlers import NIBank
+
+        rows = "".join(
+            f"<div><div>{label}</div><div><span>3,5</span>40.63</div></div>"
+            for label in ("Бэлэн авах", "Бэлэн зарах", "Бэлэн бус авах")
+        )
+        content = (
+            '<div class="exchange-block"><div>USD - US Dollar</div>'
+            f"{rows}<div hidden>Бэлэн бус зарах</div><div>1</div></div>"
+        )
+        rates = NIBank("2026-02-06")._parse(content)
+        assert rates["usd"].cash.buy == 3540.63
+        assert rates["usd"].noncash.sell is None
+
+    def test_inner_text_lines(self):
+        from app.crawlers.base import PlaywrightCrawler
+
+        element = PlaywrightCrawler.document(
+            "<div><p>USD <b>3,540</b>.63</p><script>x()</script>"
+            "a<br>b<span style='display: none'>c</span></div>"
+        )
+        assert PlaywrightCrawler.inner_text(element) == "USD 3,540.63\na\nb"
+
+    def test_transbank_parse_next_data(self, load_fixture):
+        from app.crawlers import TransBank
+
+        content = load_fixture("transbank.html")
+        rates = TransBank("2026-02-06")._parse(content)
+        assert rates["usd"].cash.buy == 3540.63
+
+    def test_transbank_parse_table_fallback(self, load_fixture):
+        from app.crawlers import TransBank
+
+        content = load_fixture("transbank.html")
+        content = content.replace('id="__NEXT_DATA__"', 'id="other"')
+        rates = TransBank("2026-02-06")._parse(content)
+        assert rates["usd"].noncash.sell == 3572.69
+
 
 class TestPlaywrightCrawlersExist:
     """Test Playwright crawlers can be instantiated."""
@@ -290,3 +462,25 @@ class TestPlaywrightCrawlersExist:
 
         crawler = MBank(datetime.date.today().isoformat())
         assert crawler.BANK_NAME == "MBank"
+
+    @patch("app.crawlers.base.politeness.scheduler")
+    @patch("app.crawlers.mbank.requests.Session")
+    def test_mbank_requests_go_through_scheduler(self, session, scheduler):
+        from app.crawlers import MBank
+
+        resp = session.return_value.get.return_value
+        resp.ok, resp.status_code = True, 200
+        resp.json.return_value = {
+            "success": True,
+            "data": [
+                {"fxd_crncy_code": "USD", "buy_rate": 3420, "sale_rate": 3450}
+            ],
+        }
+        for sent in (resp, session.return_value.post.return_value):
+            sent.elapsed = datetime.timedelta(milliseconds=80)
+
+        rates = MBank(datetime.date.today().isoformat()).crawl()
+
+        assert rates["usd"].cash.sell == 3450.0
+        assert scheduler.slot.call_count == 2
+        assert scheduler.record.call_count == 2
@@ -0,0 +1,127 @@
+import asyncio
+
+import pytest
+from sqlalchemy import create_engine, inspect, text
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from app.db import database
+from app.utils.metrics import request_timings
+
+
+def _first_session():
+    async def run():
+        sessions = database.get_async_db()
+        db = await anext(sessions)
+        await sessions.aclose()
+        return db.bind
+
+    return asyncio.run(run())
+
+
+class TestReadReplicaRouting:
+    def test_reads_use_healthy_replica(self, tmp_path, monkeypatch):
+        replica = create_async_engine(
+            f"sqlite+aiosqlite:///{tmp_path / 'replica.db'}"
+        )
+        monkeypatch.setattr(
+            database, "AsyncReadSessionLocal", async_sessionmaker(replica)
+        )
+        monkeypatch.setattr(
+            database, "replica_health", database.ReplicaHealth(30)
+        )
+
+        assert _first_session() is replica
+
+    def test_failed_replica_falls_back_to_primary(self, tmp_path, monkeypatch):
+        missing = tmp_path / "missing" / "replica.db"
+        replica = create_async_engine(f"sqlite+aiosqlite:///{missing}")
+        health = database.ReplicaHealth(30)
+        monkeypatch.setattr(
+            database, "AsyncReadSessionLocal", async_sessionmaker(replica)
+        )
+        monkeypatch.setattr(database, "replica_health", health)
+
+        primary = database.async_sessions()[0].kw["bind"]
+        assert _first_session() is primary
+        assert not health.available
+        # Stays on the primary without retrying until the window passes
+        assert _first_session() is primary
+
+
+class TestAsyncUrl:
+    def test_maps_sync_drivers(self):
+        url = database.async_url("postgresql://u@db/rates?sslmode=require")
+        assert url.drivername == "postgresql+asyncpg"
+        assert url.query == {"ssl": "require"}
+
+    def test_keeps_async_driver(self):
+        url = database.async_url("mysql+aiomysql://u@db/rates")
+        assert url.drivername == "mysql+aiomysql"
+
+    def test_unknown_backend_is_explained(self):
+        with pytest.raises(ValueError, match="No asyncio driver"):
+            database.async_url("mysql://u@db/rates")
+
+
+class TestSqliteProfile:
+    def _engine(self, tmp_path, read_only):
+        engine = create_engine(f"sqlite:///{tmp_path / 'rates.db'}")
+        database._configure_sqlite(engine, read_only=read_only)
+        return engine
+
+    def test_writer_uses_wal(self, tmp_path):
+        engine = self._engine(tmp_path, read_only=False)
+        with engine.connect() as conn:
+            mode = conn.execute(text("PRAGMA journal_mode")).scalar()
+            sync = conn.execute(text("PRAGMA synchronous")).scalar()
+
+        assert mode == "wal"
+        assert sync == 1  # NORMAL
+
+    def test_reader_is_query_only(self, tmp_path):
+        engine = self._engine(tmp_path, read_only=True)
+        with engine.connect() as conn:
+            with pytest.raises(OperationalError):
+                conn.execute(text("CREATE TABLE t (x INTEGER)"))
+
+
+class TestSchemaUpgrade:
+    def test_adds_known_columns_and_indexes_once(self, tmp_path, monkeypatch):
+        engine = create_engine(f"sqlite:///{tmp_path / 'old.db'}")
+        with engine.begin() as conn:
+            conn.execute(
+                text(
+                    "CREATE TABLE currency_rates (id INTEGER PRIMARY KEY, "
+                    "bank_name VARCHAR, date DATE, rates JSON, "
+                    "timestamp DATETIME)"
+                )
+            )
+        monkeypatch.setattr(database, "engine", engine)
+
+        database._upgrade_schema()
+        database._upgrade_schema()
+
+        inspector = inspect(engine)
+        columns = {c["name"] for c in inspector.get_columns("currency_rates")}
+        indexes = {i["name"] for i in inspector.get_indexes("currency_rates")}
+        assert "rates_hash" in columns
+        assert "ix_currency_rates_bank_date" in indexes
+
+
+class TestQueryTiming:
+    def test_failed_statement_leaves_no_timing_state(self):
+        engine = create_engine("sqlite://")
+        timings = {}
+        token = request_timings.set(timings)
+        try:
+            with engine.connect() as conn:
+                with pytest.raises(OperationalError):
+                    conn.execute(text("SELECT * FROM missing"))
+                conn.execute(text("SELECT 1"))
+                info = dict(conn.info)
+        finally:
+            request_timings.reset(token)
+
+        assert "query_start" not in info
+        assert timings["db"] > 0
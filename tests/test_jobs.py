@@ -0,0 +1,107 @@
+from datetime import date, timedelta
+from unittest.mock import patch
+
+import pytest
+from sqlalchemy.orm import sessionmaker
+
+from app.models.currency import CrawlJob, utc_now
+from app.models.exchange_rate import CurrencyDetail
+from app.services import jobs, scraper, worker
+from app.services.scraper import ScraperService
+
+DAY = date(2026, 2, 6)
+
+
+@pytest.fixture
+def sessions(test_db, monkeypatch):
+    factory = sessionmaker(bind=test_db.get_bind())
+    monkeypatch.setattr(scraper, "SessionLocal", factory)
+    monkeypatch.setattr(worker, "SessionLocal", factory)
+    monkeypatch.setattr(scraper.config, "CRAWL_BANKS", ["KhanBank", "XacBank"])
+    return factory
+
+
+class TestQueue:
+    def test_enqueue_skips_pending_and_claims_in_order(self, test_db):
+        assert len(jobs.enqueue(test_db, ["KhanBank", "TDBM"], DAY)) == 2
+        assert jobs.enqueue(test_db, ["KhanBank"], DAY) == []
+
+        first = jobs.claim(test_db, "w1")
+        second = jobs.claim(test_db, "w2")
+        assert (first.bank_name, first.status) == ("KhanBank", jobs.RUNNING)
+        assert (second.bank_name, second.worker) == ("TDBM", "w2")
+        assert jobs.claim(test_db, "w3") is None
+
+    def test_failure_retries_with_backoff_until_max(self, test_db):
+        jobs.enqueue(test_db, ["KhanBank"], DAY)
+        job = jobs.claim(test_db, "w1")
+        jobs.fail(test_db, job, "HTTPError: 503")
+
+        retry = test_db.query(CrawlJob).filter_by(status=jobs.QUEUED).one()
+        assert retry.attempt == 2
+        # Not due yet
+        assert jobs.claim(test_db, "w1") is None
+
+        retry.run_after = utc_now()
+        retry.attempt = 3
+        test_db.commit()
+        jobs.fail(test_db, jobs.claim(test_db, "w1"), "again")
+        assert (
+            test_db.query(CrawlJob).filter_by(status=jobs.QUEUED).count() == 0
+        )
+
+    def test_recover_requeues_lost_jobs(self, test_db):
+        jobs.enqueue(test_db, ["KhanBank"], DAY)
+        job = jobs.claim(test_db, "dead")
+        job.started_at = utc_now() - timedelta(hours=1)
+        test_db.commit()
+
+        assert jobs.recover(test_db, timeout=60) == 1
+        assert jobs.recover(test_db, timeout=60) == 0
+        statuses = [j.status for j in test_db.query(CrawlJob).order_by("id")]
+        assert statuses == [jobs.FAILED, jobs.QUEUED]
+
+    def test_recovered_job_ignores_late_result(self, test_db):
+        jobs.enqueue(test_db, ["KhanBank"], DAY)
+        job = jobs.claim(test_db, "slow")
+        job.started_at = utc_now() - timedelta(hours=1)
+        test_db.commit()
+        jobs.recover(test_db, timeout=60)
+
+        assert not jobs.complete(test_db, job, 3)
+        assert not jobs.fail(test_db, job, "late")
+        statuses = [j.status for j in test_db.query(CrawlJob).order_by("id")]
+        assert statuses == [jobs.FAILED, jobs.QUEUED]
+
+
+class TestScraperJobs:
+    @patch.object(ScraperService, "_save", return_value=set())
+    @patch.object(ScraperService, "_execute")
+    def test_inline_crawl_is_recorded(
+        self, mock_execute, _, test_db, sessions
+    ):
+        mock_execute.side_effect = lambda cls, remote=False: (
+            (cls.BANK_NAME, {"usd": CurrencyDetail()}, None)
+            if cls.BANK_NAME == "KhanBank"
+            else (cls.BANK_NAME, None, TimeoutError("slow"))
+        )
+
+        ScraperService(DAY.isoformat()).run_all()
+
+        recorded = {j.bank_name: j for j in test_db.query(CrawlJob)}
+        assert recorded["KhanBank"].status == jobs.DONE
+        assert recorded["KhanBank"].currencies == 1
+        assert recorded["XacBank"].error == "TimeoutError: slow"
+
+    @patch.object(ScraperService, "run_bank", return_value=(3, None))
+    def test_queue_mode_enqueues_and_worker_runs(
+        self, mock_run_bank, test_db, sessions, monkeypatch
+    ):
+        monkeypatch.setattr(scraper.config, "CRAWL_QUEUE", True)
+
+        ScraperService(DAY.isoformat()).run_all()
+        mock_run_bank.assert_not_called()
+        assert test_db.query(CrawlJob).filter_by(status=jobs.QUEUED).count()
+
+        assert worker.work("w1", drain=True) == 2
+        assert {j.status for j in test_db.query(CrawlJob)} == {jobs.DONE}
@@ -0,0 +1,71 @@
+import json
+from unittest.mock import MagicMock, patch
+
+from app.utils import playwright_setup as setup
+
+
+def _chromium(tmp_path):
+    exe = tmp_path / "chrome"
+    exe.write_bytes(b"elf")
+    return str(exe)
+
+
+class TestReadyMarker:
+    def test_marker_matches_unchanged_executable(self, tmp_path):
+        marker = tmp_path / "ready.json"
+        setup._write_marker(marker, _chromium(tmp_path))
+
+        assert setup.is_ready(marker)
+
+    def test_changed_executable_or_version_invalidates(self, tmp_path):
+        marker = tmp_path / "ready.json"
+        exe = _chromium(tmp_path)
+        setup._write_marker(marker, exe)
+
+        recorded = json.loads(marker.read_text())
+        marker.write_text(json.dumps({**recorded, "playwright": "0.0.1"}))
+        assert not setup.is_ready(marker)
+
+        setup._write_marker(marker, exe)
+        (tmp_path / "chrome").write_bytes(b"newer build")
+        assert not setup.is_ready(marker)
+
+    def test_missing_or_corrupt_marker(self, tmp_path):
+        marker = tmp_path / "ready.json"
+        assert not setup.is_ready(marker)
+        marker.write_text("{")
+        assert not setup.is_ready(marker)
+
+
+class TestEnsureBrowsers:
+    def test_valid_marker_skips_driver(self, tmp_path, monkeypatch):
+        marker = tmp_path / "ready.json"
+        setup._write_marker(marker, _chromium(tmp_path))
+        monkeypatch.setattr(setup.config, "PLAYWRIGHT_READY_MARKER", marker)
+
+        with patch("playwright.sync_api.sync_playwright") as driver:
+            assert setup.ensure_playwright_browsers()
+        driver.assert_not_called()
+
+    def test_installs_only_when_missing(self, tmp_path, monkeypatch):
+        marker = tmp_path / "ready.json"
+        monkeypatch.setattr(setup.config, "PLAYWRIGHT_READY_MARKER", marker)
+        exe = tmp_path / "chrome"
+        p = MagicMock()
+        p.chromium.executable_path = str(exe)
+
+        def install():
+            exe.write_bytes(b"elf")
+
+        with (
+            patch("playwright.sync_api.sync_playwright") as driver,
+            patch.object(setup, "_install", side_effect=install) as inst,
+        ):
+            driver.return_value.__enter__.return_value = p
+            assert setup.ensure_playwright_browsers()
+            assert setup.ensure_playwright_browsers()
+
+        inst.assert_called_once()
+        assert setup.is_ready(marker)
+        # Start latency is measured by the first crawl, not here
+        p.chromium.launch.assert_not_called()
@@ -0,0 +1,95 @@
+from unittest.mock import MagicMock, patch
+
+import pytest
+import requests
+
+from app.utils import politeness
+from app.utils.politeness import HostBlocked, HostScheduler, TokenBucket
+
+URL = "https://bank.example/api/rates"
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+        self.slept = []
+
+    def __call__(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.slept.append(seconds)
+        self.now += seconds
+
+
+def _scheduler(clock, **kwargs):
+    return HostScheduler(clock=clock, sleep=clock.sleep, **kwargs)
+
+
+class TestTokenBucket:
+    def test_burst_then_spaced(self):
+        clock = FakeClock()
+        bucket = TokenBucket(rate=1.0, burst=2, clock=clock)
+
+        assert [bucket.reserve() for _ in range(4)] == [0.0, 0.0, 1.0, 2.0]
+        clock.now = 10
+        assert bucket.reserve() == 0.0
+
+
+class TestHostScheduler:
+    def test_rate_limit_is_per_host(self):
+        clock = FakeClock()
+        scheduler = _scheduler(clock, rpm=60, burst=1)
+
+        for url in (URL, URL, "https://other.example/"):
+            with scheduler.slot(url):
+                pass
+
+        assert clock.slept == [1.0]
+
+    def test_retry_after_opens_circuit(self):
+        clock = FakeClock()
+        scheduler = _scheduler(clock, rpm=0, max_wait=60)
+
+        scheduler.record(URL, 429, "30")
+        assert scheduler.blocked_for(URL) == 30
+        with scheduler.slot(URL):
+            pass
+        assert clock.slept == [30]
+
+        scheduler.record(URL, 503, "600")
+        with pytest.raises(HostBlocked):
+            with scheduler.slot(URL):
+                pass
+
+    def test_consecutive_failures_trip_and_success_resets(self):
+        clock = FakeClock()
+        scheduler = _scheduler(clock, failures=2, cooldown=120)
+
+        scheduler.record(URL)
+        scheduler.record(URL, 200)
+        scheduler.record(URL, 500)
+        assert scheduler.blocked_for(URL) == 0
+
+        scheduler.record(URL, 502)
+        assert scheduler.blocked_for(URL) == 120
+
+    def test_crawler_requests_report_back(self, monkeypatch):
+        from app.crawlers import KhanBank
+
+        clock = FakeClock()
+        scheduler = _scheduler(clock, rpm=0)
+        monkeypatch.setattr(politeness, "scheduler", scheduler)
+        resp = MagicMock(ok=False, status_code=429)
+        resp.headers = {"Retry-After": "45"}
+        resp.elapsed.total_seconds.return_value = 0.1
+
+        with patch("app.crawlers.base.requests.get", return_value=resp):
+            KhanBank("2026-01-01").get(URL)
+        assert scheduler.blocked_for(URL) == 45
+
+        error = requests.ConnectionError("reset")
+        with patch("app.crawlers.base.requests.get", side_effect=error):
+            with pytest.raises(requests.ConnectionError):
+                KhanBank("2026-01-01").get("https://down.example/")
+        assert scheduler._host("https://down.example/")[1].failures == 1
@@ -0,0 +1,166 @@
+import asyncio
+import datetime
+
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+
+from app.db import async_repository, repository
+from app.models.currency import CurrencyRate, CurrencyRateHistory, LatestRate
+from app.models.exchange_rate import (
+    BankRates,
+    ExchangeRate,
+    RateRecord,
+    rates_hash,
+)
+
+
+def _data(rates, date="2026-02-06", bank="KhanBank"):
+    return ExchangeRate(date=date, bank=bank, rates=rates)
+
+
+class TestSaveRatesChangeDetection:
+    def test_unchanged_rates_are_not_rewritten(
+        self, test_db, sample_rate_data
+    ):
+        first = repository.save_rates(test_db, _data(sample_rate_data))
+        stamp = first.timestamp
+
+        second = repository.save_rates(test_db, _data(sample_rate_data))
+
+        assert second.id == first.id
+        assert second.timestamp == stamp
+        assert test_db.query(CurrencyRateHistory).count() == 0
+
+    def test_changed_rates_keep_intraday_history(
+        self, test_db, sample_rate_data
+    ):
+        repository.save_rates(test_db, _data(sample_rate_data))
+        changed = dict(sample_rate_data)
+        changed["usd"] = {
+            "cash": {"buy": 3421.0, "sell": 3451.0},
+            "noncash": {"buy": 3416.0, "sell": 3456.0},
+        }
+
+        row = repository.save_rates(test_db, _data(changed))
+
+        assert row.rates["usd"]["cash"]["buy"] == 3421.0
+        (history,) = test_db.query(CurrencyRateHistory).all()
+        assert history.rates["usd"]["cash"]["buy"] == 3420.5
+        assert history.rates_hash != row.rates_hash
+        assert test_db.query(CurrencyRate).count() == 1
+
+    def test_rates_hash_ignores_key_order(self, sample_rate_data):
+        reordered = dict(reversed(list(sample_rate_data.items())))
+        assert rates_hash(sample_rate_data) == rates_hash(reordered)
+
+    def test_crawler_records_save_like_models(self, test_db, sample_rate_data):
+        records = {
+            code: RateRecord.from_dict(detail)
+            for code, detail in sample_rate_data.items()
+        }
+        first = repository.save_rates(test_db, _data(sample_rate_data))
+
+        row = repository.save_rates(
+            test_db, BankRates("2026-02-06", "KhanBank", records)
+        )
+
+        assert row.id == first.id
+        assert row.timestamp == first.timestamp
+        assert row.rates == sample_rate_data
+
+    def test_bulk_counts_only_written_rows(self, test_db, sample_rate_data):
+        items = [
+            _data(sample_rate_data, date="2026-02-05"),
+            _data(sample_rate_data, date="2026-02-06"),
+        ]
+        assert repository.save_rates_bulk(test_db, items) == 2
+        assert repository.save_rates_bulk(test_db, items) == 0
+
+
+class TestLatestPointer:
+    def test_older_date_does_not_move_pointer(self, test_db, sample_rate_data):
+        current = repository.save_rates(test_db, _data(sample_rate_data))
+        repository.save_rates(test_db, _data(sample_rate_data, "2026-02-01"))
+        repository.save_rates(
+            test_db, _data(sample_rate_data, bank="GolomtBank")
+        )
+
+        latest = repository.get_latest_rates(test_db)
+
+        assert [r.bank_name for r in latest] == ["GolomtBank", "KhanBank"]
+        assert latest[1].id == current.id
+        assert test_db.query(LatestRate).count() == 2
+
+    def test_bulk_save_and_rebuild_agree(self, test_db, sample_rate_data):
+        repository.save_rates_bulk(
+            test_db,
+            [
+                _data(sample_rate_data, "2026-02-05"),
+                _data(sample_rate_data, "2026-02-06"),
+            ],
+        )
+        (pointer,) = test_db.query(LatestRate).all()
+        saved = (pointer.rate_id, pointer.date)
+
+        repository.rebuild_latest(test_db)
+        test_db.commit()
+
+        (pointer,) = test_db.query(LatestRate).all()
+        assert (pointer.rate_id, pointer.date) == saved
+        assert saved[1] == datetime.date(2026, 2, 6)
+
+
+class TestAsOf:
+    def test_includes_banks_without_pointer(self, test_db, sample_rate_data):
+        repository.save_rates(test_db, _data(sample_rate_data, "2026-02-05"))
+        # Written outside save_rates, so latest_rates has no row for it
+        test_db.add(
+            CurrencyRate(
+                bank_name="GolomtBank",
+                date=datetime.date(2026, 2, 4),
+                rates=sample_rate_data,
+            )
+        )
+        test_db.commit()
+        day = datetime.date(2026, 2, 6)
+
+        async def read():
+            url = test_db.get_bind().url.set(drivername="sqlite+aiosqlite")
+            engine = create_async_engine(url)
+            try:
+                async with AsyncSession(engine) as db:
+                    return await async_repository.get_rates_as_of(db, day)
+            finally:
+                await engine.dispose()
+
+        as_of = repository.get_rates_as_of(test_db, day)
+
+        assert [r.bank_name for r in as_of] == ["GolomtBank", "KhanBank"]
+        assert [r.id for r in asyncio.run(read())] == [r.id for r in as_of]
+        assert repository.get_rates_as_of(test_db, day.replace(day=3)) == []
+
+
+class TestAsyncReads:
+    def test_async_reads_match_sync(self, test_db, sample_rate_data):
+        repository.save_rates(test_db, _data(sample_rate_data))
+        repository.save_rates(
+            test_db, _data(sample_rate_data, bank="GolomtBank")
+        )
+        url = test_db.get_bind().url.set(drivername="sqlite+aiosqlite")
+
+        async def read():
+            engine = create_async_engine(url)
+            try:
+                async with AsyncSession(engine) as db:
+                    latest = await async_repository.get_latest_rates(db)
+                    one = await async_repository.get_rates_by_bank_and_date(
+                        db, "KhanBank", datetime.date(2026, 2, 6)
+                    )
+                    return latest, one
+            finally:
+                await engine.dispose()
+
+        latest, one = asyncio.run(read())
+
+        expected = repository.get_latest_rates(test_db)
+        assert {r.id for r in latest} == {r.id for r in expected}
+        assert one.rates == sample_rate_data
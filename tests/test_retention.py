@@ -0,0 +1,98 @@
+import datetime
+
+from app.db import repository
+from app.models.currency import (
+    CurrencyRate,
+    CurrencyRateArchive,
+    CurrencyRateHistory,
+    RateTick,
+)
+from app.services.retention import compact
+
+
+def _row(day, bank="KhanBank", rates=None, hour=9):
+    return CurrencyRate(
+        bank_name=bank,
+        date=day,
+        rates=rates or {"usd": {"cash": {"buy": 3420.0, "sell": None}}},
+        timestamp=datetime.datetime.combine(day, datetime.time(hour)),
+    )
+
+
+class TestCompaction:
+    today = datetime.date(2026, 2, 6)
+
+    def test_cold_years_move_to_archive(self, test_db):
+        old = datetime.date(2020, 3, 1)
+        test_db.add_all([_row(old), _row(old, bank="TDBM"), _row(self.today)])
+        test_db.commit()
+
+        stats = compact(test_db, today=self.today)
+
+        assert stats["archived"] == 2
+        assert test_db.query(CurrencyRate).count() == 1
+        assert test_db.query(CurrencyRateArchive).count() == 2
+        # Point lookups still find archived days
+        rate = repository.get_rates_by_bank_and_date(test_db, "KhanBank", old)
+        assert rate.rates["usd"]["cash"]["buy"] == 3420.0
+        by_date = repository.get_rates_by_date(test_db, old)
+        assert {r.bank_name for r in by_date} == {"KhanBank", "TDBM"}
+        pairs = [("TDBM", old), ("TDBM", self.today)]
+        found = repository.get_rates_for_pairs(test_db, pairs)
+        assert list(found) == [("TDBM", old)]
+        sunday = datetime.date(2020, 3, 8)
+        nearest = repository.get_rate_as_of(test_db, "TDBM", sunday)
+        assert nearest.date == old
+        as_of = repository.get_rates_as_of(test_db, sunday)
+        assert [r.bank_name for r in as_of] == ["KhanBank", "TDBM"]
+
+    def test_late_rows_merge_into_existing_archive(self, test_db):
+        test_db.add(_row(datetime.date(2020, 3, 1)))
+        test_db.commit()
+        compact(test_db, today=self.today)
+        test_db.add(_row(datetime.date(2020, 3, 2)))
+        test_db.commit()
+
+        compact(test_db, today=self.today)
+
+        (archive,) = test_db.query(CurrencyRateArchive).all()
+        assert archive.rows == 2
+
+    def test_duplicates_and_old_intraday_are_removed(self, test_db):
+        test_db.add_all([_row(self.today, hour=9), _row(self.today, hour=10)])
+        old = self.today - datetime.timedelta(days=365)
+        test_db.add(
+            RateTick(
+                bank_name="KhanBank",
+                date=old,
+                currency="usd",
+                rates={},
+                timestamp=datetime.datetime.combine(old, datetime.time(9)),
+            )
+        )
+        test_db.add(
+            CurrencyRateHistory(bank_name="KhanBank", date=old, rates={})
+        )
+        test_db.commit()
+
+        stats = compact(test_db, today=self.today)
+
+        assert stats == {
+            "intraday": 2,
+            "jobs": 0,
+            "duplicates": 1,
+            "leases": 0,
+            "archived": 0,
+        }
+        (kept,) = test_db.query(CurrencyRate).all()
+        assert kept.timestamp.hour == 10
+
+    def test_api_serves_archived_day(self, client, test_db):
+        test_db.add(_row(datetime.date(2020, 3, 1)))
+        test_db.commit()
+        compact(test_db, today=self.today)
+
+        response = client.get("/rates/bank/KhanBank/date/2020-03-01")
+
+        assert response.status_code == 200
+        assert response.json()["bank_name"] == "KhanBank"
@@ -1,6 +1,11 @@
 import datetime
 from unittest.mock import MagicMock, patch
 
+from sqlalchemy.orm import sessionmaker
+
+from app.db import repository
+from app.models.currency import CurrencyRate, QuarantinedRate
+from app.services import scraper
 from app.services.scraper import ScraperService
 
 
@@ -54,3 +59,103 @@ class TestScrapeBankMethod:
         service = ScraperService()
         result = service.scrape_bank("unknown_bank")
         assert result is None
+
+
+class TestSave:
+    def test_failed_save_does_not_fail_later_banks(
+        self, test_db, sample_rate_data, monkeypatch
+    ):
+        factory = sessionmaker(bind=test_db.get_bind())
+        monkeypatch.setattr(scraper, "SessionLocal", factory)
+        save_rates = repository.save_rates
+
+        def save(db, data):
+            if data.bank == "KhanBank":
+                # A failed flush, like a concurrent latest_rates insert
+                db.add(QuarantinedRate(bank_name="KhanBank"))
+                db.flush()
+            return save_rates(db, data)
+
+        results = [
+            ("KhanBank", sample_rate_data, None),
+            ("GolomtBank", sample_rate_data, None),
+        ]
+        with patch.object(repository, "save_rates", side_effect=save):
+            failed = ScraperService("2026-02-06")._save(results)
+
+        assert failed == {"KhanBank"}
+        (row,) = test_db.query(CurrencyRate).all()
+        assert row.bank_name == "GolomtBank"
+
+
+class TestSingleBank:
+    @patch.object(ScraperService, "_execute")
+    def test_run_bank_refuses_past_date_without_history(self, mock_execute):
+        service = ScraperService(date="2020-01-01")
+
+        count, error = service.run_bank("StateBank")
+
+        assert count == 0
+        assert "past date" in error
+        mock_execute.assert_not_called()
+
+    @patch.object(ScraperService, "enqueue")
+    def test_refresh_refuses_past_date_without_history(self, mock_enqueue):
+        error = ScraperService(date="2020-01-01").refresh("statebank")
+
+        assert "StateBank" in error
+        mock_enqueue.assert_not_called()
+
+
+class TestPoll:
+    @patch.object(ScraperService, "_save")
+    @patch.object(ScraperService, "_validate", side_effect=lambda r: r)
+    @patch.object(ScraperService, "_run_group")
+    def test_poll_saves_only_changed_banks(self, mock_run, _, mock_save):
+        from app.models.exchange_rate import CurrencyDetail
+
+        usd = {"usd": CurrencyDetail()}
+        mock_run.return_value = [("KhanBank", usd, None)]
+        last_hashes = {}
+        service = ScraperService()
+
+        assert service.poll(last_hashes) == 1
+        assert service.poll(last_hashes) == 0
+        mock_save.assert_called_once()
+
+    @patch.object(ScraperService, "_save", return_value={"KhanBank"})
+    @patch.object(ScraperService, "_validate", side_effect=lambda r: r)
+    @patch.object(ScraperService, "_run_group")
+    def test_poll_retries_failed_save(self, mock_run, _, mock_save):
+        from app.models.exchange_rate import CurrencyDetail
+
+        usd = {"usd": CurrencyDetail()}
+        mock_run.return_value = [("KhanBank", usd, None)]
+        last_hashes = {}
+        service = ScraperService()
+
+        assert service.poll(last_hashes) == 1
+        assert service.poll(last_hashes) == 1
+        assert last_hashes == {}
+        assert mock_save.call_count == 2
+
+
+class TestCrawlMetrics:
+    def test_execute_failure_counts_exception_type(self):
+        from prometheus_client import REGISTRY
+
+        labels = {"bank": "MetricsBank", "exception": "ValueError"}
+
+        def failures():
+            value = REGISTRY.get_sample_value("crawl_failures_total", labels)
+            return value or 0
+
+        service = ScraperService()
+        mock_crawler_cls = MagicMock()
+        mock_crawler_cls.BANK_NAME = "MetricsBank"
+        mock_crawler_cls.return_value.crawl.side_effect = ValueError("bad")
+        before = failures()
+
+        service._execute(mock_crawler_cls)
+
+        assert failures() - before == 1
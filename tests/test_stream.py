@@ -0,0 +1,77 @@
+import asyncio
+import datetime
+
+from sqlalchemy.orm import sessionmaker
+
+from app.models.currency import RateTick
+from app.services.stream import RateBroadcaster, fetch_ticks
+
+
+def _tick(currency, buy, **fields):
+    return RateTick(
+        bank_name="KhanBank",
+        date=datetime.date(2026, 2, 6),
+        currency=currency,
+        rates={"cash": {"buy": buy, "sell": None}, "noncash": {}},
+        timestamp=datetime.datetime(2026, 2, 6, 9, 0),
+        **fields,
+    )
+
+
+class TestRateBroadcaster:
+    def test_fans_out_new_ticks_only(self, test_db):
+        factory = sessionmaker(bind=test_db.get_bind())
+        test_db.add(_tick("usd", 3420.0))
+        test_db.commit()
+        broadcaster = RateBroadcaster(session_factory=factory)
+
+        async def run():
+            first = asyncio.Queue()
+            second = asyncio.Queue()
+            broadcaster._subscribers.update({first, second})
+            await broadcaster.poll_once()
+            test_db.add(_tick("eur", 3720.0))
+            test_db.commit()
+            await broadcaster.poll_once()
+            return first, second
+
+        first, second = asyncio.run(run())
+
+        assert first.qsize() == second.qsize() == 1
+        event = first.get_nowait()
+        assert event["currency"] == "eur"
+        assert event["bank"] == "KhanBank"
+
+    def test_late_commit_of_lower_id_is_sent(self, test_db):
+        factory = sessionmaker(bind=test_db.get_bind())
+        test_db.add(_tick("usd", 3420.0))
+        test_db.commit()
+        broadcaster = RateBroadcaster(session_factory=factory)
+
+        async def run():
+            queue = asyncio.Queue()
+            broadcaster._subscribers.add(queue)
+            await broadcaster.poll_once()
+            # Id 2 belongs to a save that commits after the one of id 3
+            test_db.add(_tick("eur", 3720.0, id=3))
+            test_db.commit()
+            await broadcaster.poll_once()
+            test_db.add(_tick("cny", 495.0, id=2))
+            test_db.commit()
+            await broadcaster.poll_once()
+            await broadcaster.poll_once()
+            return [
+                queue.get_nowait()["currency"] for _ in range(queue.qsize())
+            ]
+
+        assert asyncio.run(run()) == ["eur", "cny"]
+        assert not broadcaster._gaps
+
+    def test_fetch_ticks_after_id(self, test_db):
+        factory = sessionmaker(bind=test_db.get_bind())
+        test_db.add_all([_tick("usd", 3420.0), _tick("eur", 3720.0)])
+        test_db.commit()
+
+        events = fetch_ticks(factory, after_id=1)
+
+        assert [e["currency"] for e in events] == ["eur"]
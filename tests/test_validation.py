@@ -0,0 +1,80 @@
+from app.db import repository
+from app.models.currency import QuarantinedRate
+from app.models.exchange_rate import BankRates, RatePair, RateRecord
+from app.services import validation
+
+DAY = "2026-02-06"
+
+
+def _rate(buy, sell):
+    return RateRecord(RatePair(buy, sell), RatePair(buy, sell))
+
+
+def _plain(buy, sell):
+    return _rate(buy, sell).to_dict()
+
+
+class TestCheck:
+    def test_clean_rate_passes(self):
+        assert validation.check("usd", _plain(3420, 3450), 3435.0) == {}
+
+    def test_each_check_reports(self):
+        assert "code" in validation.check("usd1", _plain(3420, 3450))
+        assert "spread" in validation.check("usd", _plain(3450, 3420))
+        assert "official" in validation.check(
+            "usd", _plain(3.42, 3.45), official=3435.0
+        )
+        assert "previous" in validation.check(
+            "usd", _plain(4420, 4450), previous=_plain(3420, 3450)
+        )
+
+
+class TestScreen:
+    def test_suspicious_currencies_are_quarantined(self, test_db):
+        repository.save_rates(
+            test_db,
+            BankRates(
+                "2026-02-05",
+                "MongolBank",
+                {"usd": _rate(3435, 3435), "eur": _rate(3750, 3750)},
+            ),
+        )
+        results = [
+            (
+                "KhanBank",
+                {
+                    "usd": _rate(3420, 3450),
+                    "usd1": _rate(3420, 3450),
+                    "eur": _rate(3.72, 3.78),
+                },
+                None,
+            ),
+            ("TDBM", {"usd": _rate(3450, 3420)}, None),
+            ("XacBank", None, TimeoutError("slow")),
+        ]
+
+        khan, tdbm, xac = validation.screen(test_db, DAY, results)
+
+        assert khan == ("KhanBank", {"usd": _rate(3420, 3450)}, None)
+        assert tdbm[1] is None
+        assert isinstance(tdbm[2], validation.Quarantined)
+        assert xac == results[2]
+        held = {q.bank_name: q for q in test_db.query(QuarantinedRate)}
+        assert set(held["KhanBank"].rates) == {"usd1", "eur"}
+        assert "official" in held["KhanBank"].reasons["eur"][0]
+        assert held["TDBM"].reasons["usd"] == ["cash buy 3450 > sell 3420"]
+
+    def test_consistent_day_change_is_released(self, test_db):
+        repository.save_rates(
+            test_db,
+            BankRates("2026-02-05", "KhanBank", {"usd": _rate(3420, 3450)}),
+        )
+        jumped = [("KhanBank", {"usd": _rate(4420, 4450)}, None)]
+
+        first = validation.screen(test_db, DAY, jumped)
+        second = validation.screen(test_db, DAY, jumped)
+        third = validation.screen(test_db, DAY, jumped)
+
+        assert first[0][1] is None and second[0][1] is None
+        assert third == jumped
+        assert test_db.query(QuarantinedRate).count() == 2